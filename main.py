@@ -3,18 +3,19 @@ DOC:START
 Main orchestrator for the Daily Reflection personalized morning radio show.
 
 Purpose:
-- Coordinates data fetching (weather, news), script generation (LLM), and audio synthesis (TTS)
+- Coordinates data fetching (weather, news, context — concurrently), script generation (LLM), and audio synthesis (TTS)
 - Supports plan-based generation (from weekly planner) or freeform generation
-- CLI: --plan, --dry-run, --kokoro, --voicebox, --voice, --input-file
+- CLI: --plan, --dry-run, --kokoro, --voicebox, --voice, --input-file, --stream, --resume, --hedge, --prerender, --listeners, --from/--to, --scripts-dir, --daemon, --stats, --cache-stats
 
 Inputs/Outputs:
 - Inputs: API keys from .env, optional --input-file for existing scripts
-- Outputs: Script files to output/scripts/, audio files to output/audio/
+- Outputs: Script files to output/scripts/, audio files to output/audio/, stage checkpoints to output/runs/<date>/,
+  night-before body renders to output/prerender/<date>/
 
 Side effects:
 - Network calls to Open-Meteo, NewsAPI, OpenAI, ElevenLabs/Voicebox/Kokoro
 - Writes files to output/ directory
-- Logs show metadata to data/reflections.db
+- Logs show metadata and per-stage metrics to data/reflections.db
 
 Run: ./run_show.sh or python main.py [--plan] [--dry-run] [--kokoro] [--voicebox] [--voice bf_emma]
 See: README.md, modules/modules.md
@@ -26,11 +27,24 @@ import re
 import json
 import argparse
 import random
+import shutil
+import time
+import queue
 import datetime
-from modules import weather, news, content, tts_kokoro, tts_voicebox, tts_elevenlabs, tts_mlx, notify, context
-from modules.db import init_db, get_plan_for_date, mark_plan_generated, save_history, get_recent_hosts
+import threading
+from dotenv import load_dotenv
+# Before the modules import: encode, postprocess, scheduler, kokoro_pool and audio_cache read their settings at import
+load_dotenv()
+from modules import batch, checkpoint, content, encode, gather, listeners, metrics, postprocess, resynth, scheduler, stream, tts_registry, notify
+# TTS backends (torch, kokoro, mlx-audio) are imported by tts_registry when used, so dry
+# runs and runs on other backends don't pay their startup — see scripts/bench_import_time.py
+from modules.db import init_db, get_plan_for_date, mark_plan_generated, save_history, get_recent_hosts, get_history_for_date, set_history_audio
 import sys
 
+# Batch mode generates several shows at once; serialize profile read-modify-write
+_CANON_LOCK = threading.Lock()
+
+
 def extract_and_strip_canon(script_text, host_name):
     """Extract [NEW_CANON: ...] tags from script, write to persona profile, return cleaned script.
 
@@ -40,7 +54,7 @@ def extract_and_strip_canon(script_text, host_name):
     2. Appends them to the persona's improvised_canon in profiles/*.json
     3. Returns the script with tags removed (so TTS doesn't read them)
     """
-    pattern = r'\[NEW_CANON:\s*"([^"]+)"\]'
+    pattern = content.CANON_PATTERN
     matches = re.findall(pattern, script_text)
     if not matches:
         return script_text
@@ -61,6 +75,14 @@ def extract_and_strip_canon(script_text, host_name):
         print(f"   Warning: No profile found at {profile_path}, skipping canon capture")
         return cleaned
 
+    with _CANON_LOCK:
+        _append_canon(profile_path, matches)
+
+    return cleaned
+
+
+def _append_canon(profile_path, matches):
+    """Append improvised canon entries to a persona profile and rebuild hosts.json."""
     try:
         with open(profile_path, "r", encoding="utf-8") as f:
             profile = json.load(f)
@@ -92,8 +114,6 @@ def extract_and_strip_canon(script_text, host_name):
     except Exception as e:
         print(f"   Warning: Failed to capture canon: {e}")
 
-    return cleaned
-
 
 def load_random_quote(quotes_file):
     """Parses quotes.md and returns a random quote."""
@@ -191,26 +211,337 @@ def select_host(manual_host=None):
     return random.choice(ROTATION_HOSTS)
 
 
+def _chunk_synth(tts_config):
+    """Return (synth_fn, file_extension, max_chars) for backends that render chunk-by-chunk, else (None, None, None)."""
+    synth = tts_registry.synth_fn(tts_config)
+    if not synth:
+        return None, None, None
+    backend = tts_config["backend"]
+    return synth, tts_registry.get(backend)["format"], tts_registry.chunk_chars(backend, stream.MAX_PARAGRAPH_CHARS)
+
+
+def _render_chunked(script, tts_config, audio_dir, timestamp, run_dir, run_id=None, show_date=None,
+                    cancel=None, on_first=None):
+    """Render a script chunk-by-chunk into run_dir, then join. Returns (audio_path, success).
+
+    cancel: threading.Event checked between chunks (hedged mode stops the loser with it)
+    on_first: called as chunks finish (hedged mode waits for the first one)
+    """
+    backend = tts_config["backend"]
+    synth, ext, _ = _chunk_synth(tts_config)
+    audio_path = os.path.join(audio_dir, f"daily_reflection_{backend}_{timestamp}.{ext}")
+    recorders = {}
+
+    def on_chunk(index, text, result, seconds, chunk_backend=backend):
+        if chunk_backend not in recorders:
+            recorders[chunk_backend] = metrics.chunk_recorder(run_id, show_date, chunk_backend)
+        recorders[chunk_backend](index, text, result, seconds)
+        if on_first:
+            on_first()
+
+    # Several workers (same voice, plus helpers for routine chunks) when the backend and cores allow
+    workers = scheduler.plan_workers(tts_config, synth)
+    # The script is finished: pack paragraphs up to the request limit (remote backends), not one per request
+    chunks = scheduler.chunk_script(script, workers, tts_registry.pack_chars(backend, stream.MAX_PARAGRAPH_CHARS))
+    key = f"{backend}:{tts_config.get('voice', '')}"
+
+    # WAV renders keep a span manifest; a rerun of the same date only re-renders edited sentences (or chunks)
+    recorder = resynth.SpanRecorder(synth) if ext == "wav" and show_date else None
+    previous = resynth.find_previous(audio_dir, show_date, key) if recorder else None
+    if previous:
+        unit = previous.get("unit", "sentence")
+        lengths = resynth.rerender(previous, resynth.units_for(chunks, unit), synth, audio_path, on_sentence=on_chunk)
+        if lengths:
+            resynth.write_manifest(audio_path, show_date, key, previous["sample_rate"], lengths,
+                                   target_lufs=previous.get("target_lufs"), unit=unit)
+            print(f"Audio saved to {audio_path}")
+            return audio_path, True
+
+    if len(workers) > 1:
+        if recorder:
+            for worker in workers:
+                worker.synth = recorder.wrap(worker.synth)
+        paths = scheduler.render_chunks(run_dir, chunks, workers, ext, key, on_chunk=on_chunk, cancel=cancel)
+    else:
+        paths = checkpoint.render_chunks(run_dir, chunks, recorder or synth, ext, key, on_chunk=on_chunk, cancel=cancel)
+    if not paths:
+        print(f"No audio generated by {backend}.")
+        return audio_path, False
+
+    # Crossfades, loudness normalization and silence capping happen in the join
+    remap = checkpoint.join_chunks(paths, audio_path)
+    unit, lengths = recorder.spans(chunks) if recorder else (None, None)
+    if lengths:
+        resynth.write_manifest(audio_path, show_date, key, recorder.sample_rate, lengths, remap=remap,
+                               target_lufs=postprocess.TARGET_LUFS if remap else None, unit=unit)
+    print(f"Audio saved to {audio_path}")
+    return audio_path, True
+
+
+def _render_backend(script, tts_config, audio_dir, timestamp, run_dir, run_id=None, show_date=None,
+                    cancel=None, on_first=None):
+    """Render with exactly one backend, no fallback. Returns (audio_path, success).
+
+    Holds one of the backend's concurrency slots (tts_registry) while rendering.
+    """
+    backend = tts_config["backend"]
+    try:
+        spec = tts_registry.get(backend)
+    except ValueError as e:
+        print(f"   {e}")
+        return None, False
+
+    print(f"   >>> MODE: {tts_registry.label(tts_config)} <<<")
+    with tts_registry.slot(backend):
+        if spec["chunked"]:
+            return _render_chunked(script, tts_config, audio_dir, timestamp, run_dir, run_id, show_date,
+                                   cancel=cancel, on_first=on_first)
+
+        audio_path = os.path.join(audio_dir, f"daily_reflection_{backend}_{timestamp}.{spec['format']}")
+        success = tts_registry.render_whole(tts_config, script, audio_path)
+        if success:
+            postprocess.process_file(audio_path)
+        return audio_path, success
+
+
+def _hedged_render(script, tts_config, fallback, audio_dir, timestamp, run_dir, run_id, show_date, hedge_seconds):
+    """
+    Race the primary backend against its fallback (Kokoro, per tts_registry).
+
+    If the primary hasn't produced its first chunk within hedge_seconds,
+    the fallback starts in parallel. The first complete result wins and the other
+    render is cancelled between chunks (mlx can't be interrupted; its result
+    is just ignored). A primary that fails before the hedge started (no API
+    key, server down, a chunk failing later) hands over to the fallback
+    straight away, like the non-hedged path. Returns (audio_path, success, winning_backend).
+    """
+    results = queue.Queue()
+    # Ends the wait early: the primary's first successful chunk, or the primary finishing either way
+    wake = threading.Event()
+    cancels = {"primary": threading.Event(), "hedge": threading.Event()}
+
+    def _run(role, config, on_first=None):
+        start = time.perf_counter()
+        try:
+            audio_path, success = _render_backend(script, config, audio_dir, timestamp, run_dir, run_id,
+                                                   show_date, cancel=cancels[role], on_first=on_first)
+        except Exception as e:
+            print(f"   {config['backend']} render crashed: {e}")
+            audio_path, success = None, False
+        results.put((role, config["backend"], audio_path, success, time.perf_counter() - start))
+        if role == "primary":
+            wake.set()
+
+    def _start_hedge():
+        threading.Thread(target=_run, args=("hedge", fallback), daemon=True).start()
+
+    threading.Thread(target=_run, args=("primary", tts_config, wake.set), daemon=True).start()
+    running = 1
+    hedged = False
+
+    if not wake.wait(hedge_seconds):
+        print(f"   No audio from {tts_config['backend']} after {hedge_seconds}s — hedging with {tts_registry.label(fallback)}...")
+        _start_hedge()
+        running += 1
+        hedged = True
+
+    winner = (None, tts_config["backend"], None, False, 0)
+    while running:
+        role, backend, audio_path, success, elapsed = results.get()
+        running -= 1
+        fields = metrics.file_audio_fields(audio_path, elapsed) if success else {"ok": 0}
+        metrics.record(run_id, show_date, "tts", elapsed, backend=backend, chars=len(script), **fields)
+        if success:
+            winner = (role, backend, audio_path, success, elapsed)
+            other = "hedge" if role == "primary" else "primary"
+            cancels[other].set()
+            if running:
+                print(f"   {backend} finished first — cancelling the other render")
+            break
+        if role == "primary" and not hedged:
+            print(f"   WARNING: {backend} failed — falling back to {tts_registry.label(fallback)}...")
+            _start_hedge()
+            running += 1
+            hedged = True
+
+    _, backend, audio_path, success, _ = winner
+    return audio_path, success, backend
+
+
+def synthesize_audio(script, tts_config, audio_dir, timestamp, run_dir, run_id=None, show_date=None,
+                     hedge_seconds=None):
+    """Render the script with the configured backend, falling back per tts_registry (Kokoro).
+
+    Returns (audio_path, success, backend) — backend is the engine that actually produced the audio.
+    With hedge_seconds, a slow primary is raced against its fallback instead of waiting for it to fail.
+    With a run_id, each chunk and the whole render are recorded to the metrics table.
+    """
+    backend = tts_config["backend"]
+    fallback = tts_registry.fallback_config(backend) if backend in tts_registry.BACKENDS else None
+
+    if hedge_seconds and fallback:
+        audio_path, success, backend = _hedged_render(script, tts_config, fallback, audio_dir, timestamp, run_dir,
+                                                      run_id, show_date, hedge_seconds)
+        if success:
+            return audio_path, success, backend
+        print("   WARNING: hedged render failed on both backends")
+        return audio_path, False, backend
+
+    start = time.perf_counter()
+    audio_path, success = _render_backend(script, tts_config, audio_dir, timestamp, run_dir, run_id, show_date)
+
+    if not success and fallback:
+        metrics.record(run_id, show_date, "tts", time.perf_counter() - start, backend=backend, chars=len(script), ok=0)
+        print(f"   WARNING: {backend} failed — falling back to {tts_registry.label(fallback)}...")
+        backend = fallback["backend"]
+        start = time.perf_counter()
+        audio_path, success = _render_backend(script, fallback, audio_dir, timestamp, run_dir, run_id, show_date)
+
+    elapsed = time.perf_counter() - start
+    fields = metrics.file_audio_fields(audio_path, elapsed) if success else {"ok": 0}
+    metrics.record(run_id, show_date, "tts", elapsed, backend=backend, chars=len(script), **fields)
+
+    return audio_path, success, backend
+
+
+def _deliverable(audio_path, run_id=None, show_date=None):
+    """Compressed copy of audio_path to send and keep (encode.py); audio_path itself if encoding is off or fails."""
+    encoded = encode.encode(audio_path)
+    if not encoded:
+        return audio_path
+    encoded_path, stats = encoded
+    metrics.record(run_id, show_date, "encode", stats["seconds"], backend=encode.FORMAT,
+                   bytes=stats["bytes"], bytes_in=stats["bytes_in"])
+    encode.prune_masters(os.path.dirname(audio_path))
+    return encoded_path
+
+
+def _record_gather(run_id, show_date, inputs):
+    """Record per-source and wall-clock gather timings (timeouts count their full deadline)."""
+    for source, seconds in inputs["timings"].items():
+        if source in gather.SOURCES:
+            limit = gather.DEFAULT_DEADLINES[source]
+            metrics.record(run_id, show_date, source, seconds if seconds is not None else limit, ok=int(seconds is not None))
+    metrics.record(run_id, show_date, "gather", inputs["timings"]["wall"])
+
+
+def _save_script(script, output_dir, show_date, run_dir, **extra):
+    """Write output/scripts/script_<date>.txt and the script checkpoint. Returns the script path."""
+    scripts_dir = os.path.join(output_dir, "scripts")
+    os.makedirs(scripts_dir, exist_ok=True)
+
+    script_path = os.path.join(scripts_dir, f"script_{show_date}.txt")
+    with open(script_path, "w") as f:
+        f.write(script)
+    print(f"   Script saved to {script_path}")
+    checkpoint.save(run_dir, "script", {"text": script, "path": script_path, **extra})
+    return script_path
+
+
+def _tts_config_for(host_name, tts_backend=None, voice=None):
+    """The host's TTS config, unless a CLI backend override (--kokoro, --mlx, etc.) takes precedence."""
+    if tts_backend:
+        tts_config = {"backend": tts_backend}
+        if voice:
+            tts_config["voice"] = voice
+        return tts_config
+    return HOST_TTS_CONFIG.get(host_name, {"backend": "kokoro", "voice": "bf_emma"})
+
+
+def _load_prerender(output_dir, show_date, manual_host=None, tts_backend=None):
+    """The night-before body render for show_date, or None if missing or it doesn't match this run's host/backend."""
+    body = checkpoint.load(checkpoint.prerender_path(output_dir, show_date), "body")
+    if not body or not os.path.exists(body["audio_path"]):
+        return None
+    if manual_host and select_host(manual_host) != body["host"]:
+        print(f"   Pre-render is for {body['host']}, not {manual_host} — ignoring it")
+        return None
+    if tts_backend and tts_backend != body["backend"]:
+        print(f"   Pre-render used {body['backend']}, not {tts_backend} — ignoring it")
+        return None
+    return body
+
+
+def _opening_lines(text, max_chars=300):
+    """First paragraph of text, trimmed to roughly max_chars at a sentence end."""
+    first = text.strip().split("\n\n", 1)[0]
+    if len(first) <= max_chars:
+        return first
+    cut = max(first.rfind(". ", 0, max_chars), first.rfind("? ", 0, max_chars), first.rfind("! ", 0, max_chars))
+    return first[:cut + 1] if cut > 0 else first[:max_chars]
+
+
+def _splice_wakeup(wakeup, prerendered, tts_config, audio_dir, timestamp, run_dir, run_id=None, show_date=None,
+                   hedge_seconds=None):
+    """
+    Render only the wake-up and splice it in front of the pre-rendered body.
+
+    Returns (audio_path, success, backend). Fails (so the caller renders the
+    whole script) if the wake-up came out of a different engine than the body —
+    a voice change mid-show, or a WAV/MP3 mix that can't be joined.
+    """
+    body_path = prerendered["audio_path"]
+    ext = os.path.splitext(body_path)[1]
+    wake_path, success, backend = synthesize_audio(wakeup, tts_config, audio_dir, f"{timestamp}_wakeup", run_dir,
+                                                   run_id, show_date, hedge_seconds=hedge_seconds)
+    if not success:
+        return wake_path, False, backend
+    if backend != prerendered["backend"] or not wake_path.endswith(ext):
+        print(f"   Wake-up rendered by {backend} but the body by {prerendered['backend']} — rendering the full script instead")
+        return wake_path, False, backend
+
+    audio_path = os.path.join(audio_dir, f"daily_reflection_{backend}_{timestamp}{ext}")
+    with metrics.stage(run_id, show_date, "splice", backend=backend):
+        checkpoint.join_chunks([wake_path, body_path], audio_path)
+    os.remove(wake_path)
+    print(f"Audio saved to {audio_path} (live wake-up + pre-rendered body)")
+    return audio_path, True, backend
+
+
 def run_show(dry_run=False, tts_backend=None, input_file=None,
              output_dir="output", voice=None, use_plan=False,
-             target_date=None, manual_host=None):
+             target_date=None, manual_host=None, stream_audio=False,
+             resume=False, hedge_seconds=None):
     print("--- Starting Daily Reflection Generation ---")
 
     init_db()
     today_str = target_date or datetime.datetime.now().strftime("%Y-%m-%d")
+    run_id = metrics.new_run_id(today_str)
     plan = None
     script = None
     script_path = None
+    audio_path = None
+    success = False
 
-    # Select host — rotation picks from all hosts, each has its own TTS config
-    host_name = select_host(manual_host)
-    tts_config = HOST_TTS_CONFIG.get(host_name, {"backend": "kokoro", "voice": "bf_emma"})
+    if hedge_seconds is None:
+        hedge_seconds = float(os.environ.get("TTS_HEDGE_SECONDS") or 0) or None
 
-    # CLI backend override (--kokoro, --mlx, etc.) takes precedence
-    if tts_backend:
-        tts_config = {"backend": tts_backend}
-        if voice:
-            tts_config["voice"] = voice
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+    audio_dir = os.path.join(output_dir, "audio")
+    os.makedirs(audio_dir, exist_ok=True)
+
+    # Stage checkpoints live in output/runs/<date>/. Without --resume they are
+    # wiped first, so every checkpoint.load() below returns None.
+    run_dir = checkpoint.start_run(output_dir, today_str, resume=resume)
+    if resume:
+        stage = checkpoint.first_incomplete(run_dir)
+        print(f"   Resuming {today_str} at stage: {stage or 'done (re-sending)'}")
+
+    saved_inputs = checkpoint.load(run_dir, "inputs")
+
+    # Night-before render of the static sections (run_prerender): only the
+    # wake-up is generated and rendered now
+    prerendered = None if input_file else _load_prerender(output_dir, today_str, manual_host, tts_backend)
+    wakeup = None
+
+    # Select host — rotation picks from all hosts, each has its own TTS config.
+    # A resumed run keeps the host it started with; a pre-rendered one keeps the body's voice.
+    if prerendered:
+        host_name = prerendered["host"]
+        tts_config = prerendered["tts_config"]
+    else:
+        host_name = saved_inputs["host"] if saved_inputs else select_host(manual_host)
+        tts_config = _tts_config_for(host_name, tts_backend, voice)
 
     host_data = content.load_host(host_name)
     backend = tts_config["backend"]
@@ -219,6 +550,8 @@ def run_show(dry_run=False, tts_backend=None, input_file=None,
     else:
         print(f"   Host: {host_name} ({backend})")
 
+    saved_script = checkpoint.load(run_dir, "script")
+
     # 1. Gather Data
     if input_file:
         print(f"1. Reading Script from {input_file}...")
@@ -230,57 +563,135 @@ def run_show(dry_run=False, tts_backend=None, input_file=None,
             print(f"Error reading input file: {e}")
             sys.exit(1)
 
-    else:
-        # Check for plan
-        plan = get_plan_for_date(today_str)
-
-        if use_plan and not plan:
-            print(f"ERROR: --plan flag set but no plan found for {today_str}.")
-            print("Run the planner first: python modules/planner.py")
-            sys.exit(1)
-
-        # Fetch live data
-        print("1. Fetching Weather...")
-        weather_data = weather.get_weather()
-        weather_summary = weather_data['summary']
+    elif saved_script:
+        print("1-2. Script already generated, skipping fetch + LLM")
+        plan = saved_inputs.get("plan") if saved_inputs else None
+        script = saved_script["text"]
+        script_path = saved_script["path"]
+        wakeup = saved_script.get("wakeup")
+
+    elif prerendered:
+        print(f"1. Pre-rendered body found ({prerendered['backend']}) — fetching weather + news for the wake-up...")
+        plan = prerendered["plan"]
+        inputs = gather.gather_inputs(sources=("weather", "news"))
+        _record_gather(run_id, today_str, inputs)
+        checkpoint.save(run_dir, "inputs", {
+            "host": host_name,
+            "plan": plan,
+            "weather": inputs["weather"],
+            "news": inputs["news"],
+            "timings": inputs["timings"],
+        })
+
+        print("2. Generating the wake-up segment...")
+        system_prompt, user_prompt = content.build_wakeup_prompts(
+            inputs["weather"]["summary"], inputs["news"]["combined_summary"],
+            _opening_lines(prerendered["text"]), host_name=host_name, show_date=today_str,
+        )
+        checkpoint.save(run_dir, "prompt", {"system": system_prompt, "user": user_prompt})
+        usage = {}
+        with metrics.stage(run_id, today_str, "llm_wakeup", backend="openai") as m:
+            wakeup = content.complete(system_prompt, user_prompt, usage=usage)
+            m.update(usage, chars=len(wakeup))
+        wakeup = extract_and_strip_canon(wakeup, host_name)
 
-        print("2. Fetching News (world + local + AI)...")
-        news_data = news.get_all_news()
-        news_summary = news_data["combined_summary"]
+        script = f"{wakeup}\n\n{prerendered['text']}"
+        script_path = _save_script(script, output_dir, today_str, run_dir, wakeup=wakeup)
 
-        # Gather personal context (git, calendar, email, open loops)
-        print("   Gathering personal context...")
-        personal_context = context.gather_all_context()
+    else:
+        if saved_inputs:
+            print("1. Using fetched inputs from checkpoint")
+            plan = saved_inputs["plan"]
+        else:
+            # Check for plan
+            plan = get_plan_for_date(today_str)
+
+            if use_plan and not plan:
+                print(f"ERROR: --plan flag set but no plan found for {today_str}.")
+                print("Run the planner first: python modules/planner.py")
+                sys.exit(1)
+
+            # Fetch live data — weather, news, personal context (git, calendar, email,
+            # open loops) and anti-repetition history all run concurrently
+            print("1. Gathering weather, news, personal + anti-repetition context...")
+            inputs = gather.gather_inputs()
+            _record_gather(run_id, today_str, inputs)
+
+            # Merge weather mood + personal context into the anti-repetition context
+            recent_context = inputs["recent"]
+            recent_context["weather_mood"] = inputs["weather"].get("mood", "balanced")
+            recent_context["personal_context"] = inputs["context"].get("formatted_prompt_section", "")
+
+            saved_inputs = {
+                "host": host_name,
+                "plan": plan,
+                "weather": inputs["weather"],
+                "news": inputs["news"],
+                "context": inputs["context"],
+                "recent_context": recent_context,
+                "timings": inputs["timings"],
+            }
+            checkpoint.save(run_dir, "inputs", saved_inputs)
 
-        # Build anti-repetition context + weather mood
-        print("   Building anti-repetition context...")
-        recent_context = content.build_anti_repetition_context()
-        recent_context["weather_mood"] = weather_data.get("mood", "balanced")
-        recent_context["personal_context"] = personal_context.get("formatted_prompt_section", "")
+        weather_summary = saved_inputs["weather"]["summary"]
+        news_summary = saved_inputs["news"]["combined_summary"]
+        recent_context = saved_inputs["recent_context"]
 
-        if plan:
+        saved_prompt = checkpoint.load(run_dir, "prompt")
+        if saved_prompt:
+            print("2. Generating Script from checkpointed prompt...")
+            system_prompt, user_prompt = saved_prompt["system"], saved_prompt["user"]
+        elif plan:
             # Plan-based generation
-            print(f"3. Generating Script from plan (pillars: {plan.get('pillars', [])})...")
-            script = content.generate_script_from_plan(plan, weather_summary, news_summary, recent_context=recent_context, host_name=host_name)
+            print(f"2. Generating Script from plan (pillars: {plan.get('pillars', [])})...")
+            system_prompt, user_prompt = content.build_plan_prompts(plan, weather_summary, news_summary, recent_context=recent_context, host_name=host_name, show_date=today_str)
         else:
             # Freeform generation (original flow)
             quote = load_random_quote("quotes.md")
             deep_dive = pick_freeform_topic()
             print(f"   Context: {weather_summary} | Topic: {deep_dive}")
-            print("3. Generating Script with LLM...")
-            script = content.generate_script(weather_summary, news_summary, deep_dive, quote, recent_context=recent_context, host_name=host_name)
+            print("2. Generating Script with LLM...")
+            system_prompt, user_prompt = content.build_freeform_prompts(weather_summary, news_summary, deep_dive, quote, recent_context=recent_context, host_name=host_name, show_date=today_str)
+        checkpoint.save(run_dir, "prompt", {"system": system_prompt, "user": user_prompt})
+
+        can_stream = stream_audio and not dry_run and tts_registry.get(backend)["streaming"]
+        synth, ext, max_chars = _chunk_synth(tts_config) if can_stream else (None, None, None)
+        usage = {}
+        if synth:
+            # Streaming: TTS renders paragraphs while the LLM is still writing
+            print(f"   >>> Streaming into {backend} TTS <<<")
+            audio_path = os.path.join(audio_dir, f"daily_reflection_{backend}_{timestamp}.{ext}")
+            with metrics.stage(run_id, today_str, "llm_stream", backend=backend) as m:
+                result = stream.stream_show(
+                    content.stream_completion(system_prompt, user_prompt, usage=usage), synth, audio_path,
+                    max_chars=max_chars, on_chunk=metrics.chunk_recorder(run_id, today_str, backend),
+                )
+                m.update(usage, chars=len(result["script"]), ok=int(result["success"]))
+            if result["first_audio"] is not None:
+                metrics.record(run_id, today_str, "first_audio", result["first_audio"], backend=backend)
+            script = result["script"]
+            success = result["success"]
+            if success and result["encoded"]:
+                postprocess.process_encoded(result["encoded"], audio_path)
+            elif success:
+                postprocess.process_file(audio_path)
+            if result["llm_error"] or not script.strip():
+                print("   Streaming generation failed — retrying without streaming...")
+                with metrics.stage(run_id, today_str, "llm", backend="openai") as m:
+                    script = content.complete(system_prompt, user_prompt, usage=usage)
+                    m.update(usage, chars=len(script))
+                success = False
+        else:
+            with metrics.stage(run_id, today_str, "llm", backend="openai") as m:
+                script = content.complete(system_prompt, user_prompt, usage=usage)
+                m.update(usage, chars=len(script))
 
         # Extract improvised canon from script and strip tags before save
-        script = extract_and_strip_canon(script, host_name)
+        with metrics.stage(run_id, today_str, "canon") as m:
+            script = extract_and_strip_canon(script, host_name)
+            m["chars"] = len(script)
 
-        # Save script
-        scripts_dir = os.path.join(output_dir, "scripts")
-        os.makedirs(scripts_dir, exist_ok=True)
-
-        script_path = os.path.join(scripts_dir, f"script_{today_str}.txt")
-        with open(script_path, "w") as f:
-            f.write(script)
-        print(f"   Script saved to {script_path}")
+        script_path = _save_script(script, output_dir, today_str, run_dir)
 
     if dry_run:
         print("Dry run complete. Exiting.")
@@ -297,85 +708,55 @@ def run_show(dry_run=False, tts_backend=None, input_file=None,
                 host=host_name,
             )
             mark_plan_generated(today_str)
-        return
-
-    # 4. Audio Synthesis
-    print("4. Synthesizing Audio...")
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
-
-    audio_dir = os.path.join(output_dir, "audio")
-    os.makedirs(audio_dir, exist_ok=True)
-
-    audio_path = None
-    success = False
-
-    if backend == "mlx":
-        mode = tts_config.get("mode", "clone")
-        if mode == "voicedesign":
-            instruct = tts_config.get("instruct", "A warm, articulate radio presenter")
-            print(f"   >>> MODE: Qwen3-TTS VoiceDesign [{instruct[:50]}...] <<<")
-            audio_filename = f"daily_reflection_mlx_{timestamp}.wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            success = tts_mlx.text_to_speech(script, audio_path, instruct=instruct)
-        else:
-            # Voice clone mode (JEJ default)
-            print(f"   >>> MODE: Qwen3-TTS Voice Clone [JEJ] <<<")
-            audio_filename = f"daily_reflection_mlx_{timestamp}.wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            success = tts_mlx.text_to_speech(script, audio_path)
-
-        if not success:
-            print("   WARNING: mlx-audio failed — falling back to Kokoro (bf_emma)...")
-            audio_filename = f"daily_reflection_kokoro_{timestamp}.wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            success = tts_kokoro.text_to_speech(script, audio_path, voice="bf_emma")
-
-    elif backend == "kokoro":
-        kokoro_voice = tts_config.get("voice", "bf_emma")
-        print(f"   >>> MODE: Kokoro [Voice: {kokoro_voice}] <<<")
-        audio_filename = f"daily_reflection_kokoro_{timestamp}.wav"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        success = tts_kokoro.text_to_speech(script, audio_path, voice=kokoro_voice)
-
-    elif backend == "elevenlabs":
-        print("   >>> MODE: ElevenLabs (Anaya) <<<")
-        audio_filename = f"daily_reflection_elevenlabs_{timestamp}.mp3"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        success = tts_elevenlabs.text_to_speech(script, audio_path)
-
-        if not success:
-            print("   WARNING: ElevenLabs failed — falling back to Kokoro (bf_emma)...")
-            audio_filename = f"daily_reflection_kokoro_{timestamp}.wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            success = tts_kokoro.text_to_speech(script, audio_path, voice="bf_emma")
-
-    elif backend == "voicebox":
-        print("   >>> MODE: Voicebox (JEJ voice clone) <<<")
-        audio_filename = f"daily_reflection_voicebox_{timestamp}.wav"
-        audio_path = os.path.join(audio_dir, audio_filename)
-        success = tts_voicebox.text_to_speech(script, audio_path)
-
+        return script_path
+
+    # 3. Audio Synthesis
+    print("3. Synthesizing Audio...")
+
+    saved_audio = checkpoint.load(run_dir, "audio")
+    if saved_audio and os.path.exists(saved_audio["path"]):
+        audio_path = saved_audio["path"]
+        backend = saved_audio.get("backend", backend)
+        success = True
+        print(f"   Already rendered: {audio_path}")
+    elif success:
+        print("   Already rendered while streaming.")
+    else:
+        if prerendered and wakeup is not None:
+            audio_path, success, backend = _splice_wakeup(wakeup, prerendered, tts_config, audio_dir, timestamp,
+                                                          run_dir, run_id, today_str, hedge_seconds=hedge_seconds)
         if not success:
-            print("   WARNING: Voicebox failed — falling back to Kokoro (bf_emma)...")
-            audio_filename = f"daily_reflection_kokoro_{timestamp}.wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            success = tts_kokoro.text_to_speech(script, audio_path, voice="bf_emma")
+            audio_path, success, backend = synthesize_audio(script, tts_config, audio_dir, timestamp, run_dir,
+                                                            run_id, today_str, hedge_seconds=hedge_seconds)
 
     if success:
-        print(f"SUCCESS! Show ready at: {audio_path}")
-
-        # 5. Send via Telegram
-        print("5. Sending to Telegram...")
-        topic = plan.get("deep_dive_topic", "Daily Reflection") if plan else "Daily Reflection"
-        pillars = ", ".join(plan.get("pillars", [])) if plan else ""
-        summary = f"🌅 *Daily Reflection — {today_str}*\n_{topic}_"
-        if pillars:
-            summary += f"\nPillars: {pillars}"
-        notify.send_telegram(audio_path, summary)
+        # 3b. Compress for delivery (a resumed run reuses the earlier encode)
+        delivery_path = (saved_audio or {}).get("delivery")
+        if not (delivery_path and os.path.exists(delivery_path)):
+            delivery_path = _deliverable(audio_path, run_id, today_str)
+        checkpoint.save(run_dir, "audio", {"path": audio_path, "backend": backend, "delivery": delivery_path})
+        print(f"SUCCESS! Show ready at: {delivery_path}")
+
+        # 4. Send via Telegram
+        if checkpoint.load(run_dir, "notify"):
+            print("4. Already sent to Telegram.")
+        else:
+            print("4. Sending to Telegram...")
+            topic = plan.get("deep_dive_topic", "Daily Reflection") if plan else "Daily Reflection"
+            pillars = ", ".join(plan.get("pillars", [])) if plan else ""
+            summary = f"🌅 *Daily Reflection — {today_str}*\n_{topic}_"
+            if pillars:
+                summary += f"\nPillars: {pillars}"
+            with metrics.stage(run_id, today_str, "notify", bytes=os.path.getsize(delivery_path)) as m:
+                sent = notify.send_telegram(delivery_path, summary)
+                m["ok"] = int(bool(sent))
+            if sent:
+                checkpoint.save(run_dir, "notify", {"sent": True, "audio_path": delivery_path})
     else:
         print("FAILED to generate audio.")
+        print(f"   Rerun with --resume to keep the script and any finished chunks.")
 
-    # 6. Log history
+    # 5. Log history
     if plan:
         save_history(
             show_date=today_str,
@@ -385,11 +766,323 @@ def run_show(dry_run=False, tts_backend=None, input_file=None,
             deep_dive_topic=plan.get("deep_dive_topic"),
             talking_points=plan.get("talking_points"),
             script_path=script_path,
-            audio_path=audio_path if success else None,
+            audio_path=delivery_path if success else None,
             host=host_name,
+            tts_backend=backend if success else None,
         )
         mark_plan_generated(today_str)
 
+    return delivery_path if success else None
+
+def run_prerender(target_date=None, output_dir="output", tts_backend=None, voice=None, manual_host=None):
+    """
+    Night-before render of a plan show's static sections (Centering, Deep Dive, Outro).
+
+    Needs the date's weekly_plan row. The morning run_show for that date finds
+    output/prerender/<date>/body.json, fetches only weather + news, writes the
+    short wake-up and splices it in front of this audio.
+    Returns the body audio path, or None.
+    """
+    init_db()
+    show_date = target_date or (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+    plan = get_plan_for_date(show_date)
+    if not plan:
+        print(f"No plan for {show_date} — nothing to pre-render (run the planner first).")
+        return None
+
+    run_id = metrics.new_run_id(show_date)
+    host_name = select_host(manual_host)
+    tts_config = _tts_config_for(host_name, tts_backend, voice)
+    print(f"--- Pre-rendering {show_date}: {host_name} ({tts_config['backend']}) ---")
+
+    prerender_dir = checkpoint.prerender_path(output_dir, show_date)
+    if os.path.isdir(prerender_dir):
+        shutil.rmtree(prerender_dir)
+    os.makedirs(prerender_dir, exist_ok=True)
+    audio_dir = os.path.join(output_dir, "audio")
+    os.makedirs(audio_dir, exist_ok=True)
+
+    print("1. Generating Centering, Deep Dive and Outro from plan...")
+    system_prompt, user_prompt = content.build_body_prompts(
+        plan, recent_context=content.build_anti_repetition_context(), host_name=host_name, show_date=show_date,
+    )
+    usage = {}
+    with metrics.stage(run_id, show_date, "llm_body", backend="openai") as m:
+        body = content.complete(system_prompt, user_prompt, usage=usage)
+        m.update(usage, chars=len(body))
+    body = extract_and_strip_canon(body, host_name)
+
+    print("2. Synthesizing body audio...")
+    audio_path, success, backend = synthesize_audio(body, tts_config, audio_dir, f"{show_date}_body",
+                                                    prerender_dir, run_id, show_date)
+    if not success:
+        print("FAILED to pre-render — the morning run will generate the full show.")
+        return None
+    if backend != tts_config["backend"]:
+        tts_config = tts_registry.fallback_config(tts_config["backend"])  # the wake-up has to match the body's voice
+
+    checkpoint.save(prerender_dir, "body", {
+        "host": host_name,
+        "tts_config": tts_config,
+        "backend": backend,
+        "plan": plan,
+        "text": body,
+        "audio_path": audio_path,
+    })
+    print(f"Pre-rendered body ready at: {audio_path}")
+    return audio_path
+
+
+def _date_range(start, end):
+    """Inclusive list of YYYY-MM-DD strings from start to end."""
+    day = datetime.datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.datetime.strptime(end or start, "%Y-%m-%d")
+    dates = []
+    while day <= last:
+        dates.append(day.strftime("%Y-%m-%d"))
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def _batch_tts_config(show_date, output_dir, tts_backend=None, voice=None, manual_host=None):
+    """TTS config for a batch item: CLI override, else the host the script was written for."""
+    if tts_backend:
+        return _tts_config_for(None, tts_backend, voice)
+
+    saved = checkpoint.load(checkpoint.run_path(output_dir, show_date), "inputs")
+    history = get_history_for_date(show_date)
+    host_name = manual_host or (saved or {}).get("host") or (history or {}).get("host") or select_host()
+    return _tts_config_for(host_name)
+
+
+def run_batch(dates=None, scripts_dir=None, dry_run=False, tts_backend=None,
+              voice=None, manual_host=None, use_plan=False, output_dir="output",
+              llm_workers=batch.DEFAULT_LLM_WORKERS, llm_rpm=batch.DEFAULT_LLM_RPM,
+              tts_workers=None):
+    """
+    Generate or re-render many shows in one process.
+
+    dates: generate each date (gather + LLM on the rate-limited pool), then render
+    scripts_dir: re-render existing script_<date>.txt files (optionally filtered by dates)
+
+    Backfills don't send Telegram messages; history rows get the new audio path.
+    """
+    print("--- Starting Daily Reflection Batch ---")
+    init_db()
+    audio_dir = os.path.join(output_dir, "audio")
+    os.makedirs(audio_dir, exist_ok=True)
+    scripts = {}
+
+    if scripts_dir:
+        for name in sorted(os.listdir(scripts_dir)):
+            match = re.match(r"script_(\d{4}-\d{2}-\d{2})\.txt$", name)
+            if match and (not dates or match.group(1) in dates):
+                scripts[match.group(1)] = os.path.join(scripts_dir, name)
+        items = list(scripts)
+        llm_stage = None
+    else:
+        items = dates
+
+        def llm_stage(show_date):
+            try:
+                run_show(dry_run=True, target_date=show_date, manual_host=manual_host,
+                         use_plan=use_plan, output_dir=output_dir,
+                         tts_backend=tts_backend, voice=voice)
+            except SystemExit:
+                return None  # run_show exits on a missing --plan; fail this date only
+            path = os.path.join(output_dir, "scripts", f"script_{show_date}.txt")
+            if not os.path.exists(path):
+                return None
+            scripts[show_date] = path
+            return show_date
+
+    if not items:
+        print("Nothing to do.")
+        return {}
+
+    if not tts_workers:
+        tts_workers = batch.default_tts_workers()
+        if tts_backend:
+            tts_workers = tts_registry.max_workers(tts_backend, tts_workers)
+
+    def tts_stage(show_date):
+        if dry_run:
+            return scripts[show_date]
+        with open(scripts[show_date], "r", encoding="utf-8") as f:
+            script = f.read()
+        tts_config = _batch_tts_config(show_date, output_dir, tts_backend, voice, manual_host)
+        run_dir = checkpoint.start_run(output_dir, show_date, resume=True)
+        run_id = metrics.new_run_id(show_date)
+        audio_path, success, backend = synthesize_audio(script, tts_config, audio_dir, f"{show_date}_batch",
+                                                        run_dir, run_id, show_date)
+        if not success:
+            return None
+        delivery_path = _deliverable(audio_path, run_id, show_date)
+        checkpoint.save(run_dir, "audio", {"path": audio_path, "backend": backend, "delivery": delivery_path})
+        set_history_audio(show_date, delivery_path, backend)
+        return delivery_path
+
+    if not dry_run and tts_workers > 1:
+        # Every render thread shares one loaded Kokoro model; split the cores between them
+        from modules import tts_kokoro
+        tts_kokoro.set_torch_threads((os.cpu_count() or 1) // tts_workers)
+        scheduler.set_workers(1)  # shows already render in parallel; one lane each
+
+    return batch.run_pipeline(
+        items, tts_stage, llm_stage=llm_stage,
+        llm_workers=llm_workers, llm_rpm=llm_rpm, tts_workers=tts_workers,
+    )
+
+
+def run_listeners(listener_ids=None, target_date=None, output_dir="output", dry_run=False,
+                  tts_backend=None, voice=None, llm_workers=batch.DEFAULT_LLM_WORKERS,
+                  llm_rpm=batch.DEFAULT_LLM_RPM, tts_workers=None):
+    """
+    One run, one show per listener profile (data/listeners.json).
+
+    Inputs are fetched once and shared (news, same-location weather,
+    anti-repetition history). Each listener's script is written on the
+    rate-limited LLM pool and rendered on the TTS pool, then sent to that
+    listener's Telegram chat. The primary listener writes to output_dir as
+    usual; others to output/listeners/<id>/. Prints per-listener latency and
+    estimated cost. Returns the batch results dict keyed by listener id.
+    """
+    init_db()
+    show_date = target_date or datetime.datetime.now().strftime("%Y-%m-%d")
+    profiles = {l["id"]: l for l in listeners.load_listeners(listener_ids)}
+    if not profiles:
+        print("No listeners to run.")
+        return {}
+
+    print(f"--- Multi-listener run for {show_date}: {', '.join(profiles)} ---")
+    print("1. Gathering shared inputs...")
+    inputs = gather.gather_for_listeners(list(profiles.values()))
+    plan = get_plan_for_date(show_date)
+    report = {lid: {"backend": None, "llm": 0.0, "tts": 0.0, "tokens_in": 0, "tokens_out": 0, "chars": 0}
+              for lid in profiles}
+
+    def llm_stage(lid):
+        listener = profiles[lid]
+        base_dir = output_dir if listener["primary"] else os.path.join(output_dir, "listeners", lid)
+        run_id = f"{metrics.new_run_id(show_date)}_{lid}"
+        run_dir = checkpoint.start_run(base_dir, show_date)
+        host_name = listeners.pick_host(listener, show_date) or select_host()
+        listener_plan = plan if listener["primary"] else None
+
+        data = inputs[lid]
+        weather_summary = data["weather"]["summary"]
+        news_summary = data["news"]["combined_summary"]
+        recent_context = data["recent"]
+        recent_context["weather_mood"] = data["weather"].get("mood", "balanced")
+        recent_context["personal_context"] = data["context"].get("formatted_prompt_section", "")
+        checkpoint.save(run_dir, "inputs", {"host": host_name, "plan": listener_plan, "listener": lid, **data})
+
+        if listener_plan:
+            system_prompt, user_prompt = content.build_plan_prompts(listener_plan, weather_summary, news_summary, recent_context=recent_context, host_name=host_name, show_date=show_date)
+        else:
+            system_prompt, user_prompt = content.build_freeform_prompts(weather_summary, news_summary, pick_freeform_topic(), load_random_quote("quotes.md"), recent_context=recent_context, host_name=host_name, show_date=show_date)
+        system_prompt += listeners.prompt_section(listener)
+        checkpoint.save(run_dir, "prompt", {"system": system_prompt, "user": user_prompt})
+
+        print(f"   [{lid}] Writing script ({host_name})...")
+        usage = {}
+        start = time.perf_counter()
+        with metrics.stage(run_id, show_date, "llm", backend="openai") as m:
+            script = content.complete(system_prompt, user_prompt, usage=usage)
+            m.update(usage, chars=len(script))
+        report[lid].update(llm=time.perf_counter() - start, tokens_in=usage.get("tokens_in", 0),
+                           tokens_out=usage.get("tokens_out", 0))
+
+        script = extract_and_strip_canon(script, host_name)
+        script_path = _save_script(script, base_dir, show_date, run_dir)
+        return {"listener": lid, "host": host_name, "plan": listener_plan, "script": script,
+                "script_path": script_path, "base_dir": base_dir, "run_dir": run_dir, "run_id": run_id}
+
+    def tts_stage(job):
+        lid = job["listener"]
+        listener = profiles[lid]
+        if dry_run:
+            return job["script_path"]
+
+        audio_dir = os.path.join(job["base_dir"], "audio")
+        os.makedirs(audio_dir, exist_ok=True)
+        tts_config = _tts_config_for(job["host"], tts_backend, voice)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+        start = time.perf_counter()
+        audio_path, success, backend = synthesize_audio(job["script"], tts_config, audio_dir, timestamp,
+                                                        job["run_dir"], job["run_id"], show_date)
+        report[lid].update(tts=time.perf_counter() - start, backend=backend, chars=len(job["script"]))
+        if not success:
+            return None
+        delivery_path = _deliverable(audio_path, job["run_id"], show_date)
+        checkpoint.save(job["run_dir"], "audio", {"path": audio_path, "backend": backend, "delivery": delivery_path})
+
+        summary = f"🌅 *Daily Reflection — {show_date}*\n_For {listener['name']}, with {job['host']}_"
+        if notify.send_telegram(delivery_path, summary, chat_id=listener["telegram_chat_id"]):
+            checkpoint.save(job["run_dir"], "notify", {"sent": True, "audio_path": delivery_path})
+
+        if job["plan"]:
+            plan_row = job["plan"]
+            save_history(
+                show_date=show_date,
+                pillars=plan_row.get("pillars", []),
+                quote=plan_row.get("quote"),
+                quote_source=plan_row.get("quote_source"),
+                deep_dive_topic=plan_row.get("deep_dive_topic"),
+                talking_points=plan_row.get("talking_points"),
+                script_path=job["script_path"],
+                audio_path=delivery_path,
+                host=job["host"],
+                tts_backend=backend,
+            )
+            mark_plan_generated(show_date)
+        return delivery_path
+
+    tts_workers = tts_workers or min(len(profiles), batch.default_tts_workers())
+    if not dry_run and tts_workers > 1:
+        # Every render thread shares one loaded Kokoro model; split the cores between them
+        from modules import tts_kokoro
+        tts_kokoro.set_torch_threads((os.cpu_count() or 1) // tts_workers)
+        scheduler.set_workers(1)  # shows already render in parallel; one lane each
+
+    results = batch.run_pipeline(
+        list(profiles), tts_stage, llm_stage=llm_stage,
+        llm_workers=llm_workers, llm_rpm=llm_rpm, tts_workers=tts_workers,
+    )
+
+    print(f"{'listener':<12} {'backend':<11} {'llm s':>7} {'tts s':>7} {'total s':>8} {'tok in':>7} {'tok out':>8} {'est $':>7}")
+    for lid, r in report.items():
+        cost = metrics.estimate_cost(r["tokens_in"], r["tokens_out"], r["backend"], r["chars"])
+        total = results.get(lid, {}).get("seconds", 0)
+        print(f"{lid:<12} {r['backend'] or '-':<11} {r['llm']:>7.1f} {r['tts']:>7.1f} {total:>8.1f} "
+              f"{r['tokens_in']:>7} {r['tokens_out']:>8} {cost:>7.3f}")
+    return results
+
+
+def daemon_jobs(output_dir="output"):
+    """Jobs the resident daemon can run, by action name (see modules/daemon.py)."""
+
+    def show(date=None, host=None, backend=None, voice=None, dry_run=False):
+        return run_show(target_date=date, manual_host=host, tts_backend=backend,
+                        voice=voice, dry_run=dry_run, output_dir=output_dir)
+
+    def render(input_file, date=None, host=None, backend=None, voice=None):
+        return run_show(input_file=input_file, target_date=date, manual_host=host,
+                        tts_backend=backend, voice=voice, output_dir=output_dir)
+
+    def plan(date=None, days=7):
+        from modules import planner
+        # Scheduled on Sunday evening: plan the coming week starting tomorrow
+        start = date or (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+        return len(planner.generate_plan(start, days))
+
+    def prerender(date=None, host=None, backend=None, voice=None):
+        return run_prerender(target_date=date, manual_host=host, tts_backend=backend,
+                             voice=voice, output_dir=output_dir)
+
+    return {"show": show, "render": render, "plan": plan, "prerender": prerender}
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Daily Reflection morning radio show generator")
     parser.add_argument("--plan", action="store_true", help="Require a plan from the weekly planner (fail if none exists)")
@@ -402,11 +1095,23 @@ if __name__ == "__main__":
     parser.add_argument("--voice", type=str, default="am_michael", help="Kokoro voice id (e.g., am_michael, bf_emma)")
     parser.add_argument("--host", type=str, default=None, help="Host name (Anaya, Emma, Bella, Hannah)")
     parser.add_argument("--date", type=str, default=None, help="Target date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--stream", action="store_true", help="Start TTS on finished paragraphs while the LLM is still writing (kokoro/voicebox/elevenlabs)")
+    parser.add_argument("--hedge", type=float, default=None, help="Start Kokoro in parallel if the primary TTS backend has no audio after this many seconds (env: TTS_HEDGE_SECONDS)")
+    parser.add_argument("--prerender", action="store_true", help="Night-before: generate + render the plan's static sections for --date (default: tomorrow)")
+    parser.add_argument("--listeners", nargs="*", default=None, metavar="ID", help="Fan out: one show per listener in data/listeners.json (all, or the given ids), sharing fetched data")
+    parser.add_argument("--resume", action="store_true", help="Resume the date's run from the first unfinished stage (output/runs/<date>/)")
+    parser.add_argument("--stats", action="store_true", help="Print p50/p95 latency per stage and backend from the metrics table")
+    parser.add_argument("--cache-stats", action="store_true", help="Print sentence audio cache size and hit rate per backend")
+    parser.add_argument("--stats-days", type=int, default=30, help="Window for --stats (default: 30 days)")
+    parser.add_argument("--daemon", action="store_true", help="Run resident: warm TTS models, internal schedule, Unix socket for on-demand renders")
+    parser.add_argument("--from", dest="from_date", type=str, default=None, help="Batch: first date to generate/re-render (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="to_date", type=str, default=None, help="Batch: last date, inclusive (default: --from)")
+    parser.add_argument("--scripts-dir", type=str, default=None, help="Batch: re-render every script_<date>.txt in this directory")
+    parser.add_argument("--llm-workers", type=int, default=batch.DEFAULT_LLM_WORKERS, help="Batch: concurrent LLM calls")
+    parser.add_argument("--llm-rpm", type=int, default=batch.DEFAULT_LLM_RPM, help="Batch: max LLM calls per minute")
+    parser.add_argument("--tts-workers", type=int, default=None, help="Batch: concurrent TTS renders (default: CPU cores)")
     args = parser.parse_args()
 
-    from dotenv import load_dotenv
-    load_dotenv()
-
     # Determine TTS backend override (None = auto from host rotation)
     tts_backend = None
     if args.mlx:
@@ -418,6 +1123,58 @@ if __name__ == "__main__":
     elif args.elevenlabs:
         tts_backend = "elevenlabs"
 
+    if args.stats:
+        init_db()
+        metrics.print_stats(args.stats_days)
+        sys.exit(0)
+
+    if args.cache_stats:
+        from modules import audio_cache
+        audio_cache.print_stats()
+        sys.exit(0)
+
+    if args.daemon:
+        from modules import daemon
+        daemon.serve(daemon_jobs())
+        sys.exit(0)
+
+    if args.prerender:
+        run_prerender(
+            target_date=args.date,
+            tts_backend=tts_backend,
+            voice=args.voice if args.voice != "am_michael" else None,
+            manual_host=args.host,
+        )
+        sys.exit(0)
+
+    if args.listeners is not None:
+        run_listeners(
+            listener_ids=args.listeners,
+            target_date=args.date,
+            dry_run=args.dry_run,
+            tts_backend=tts_backend,
+            voice=args.voice if args.voice != "am_michael" else None,
+            llm_workers=args.llm_workers,
+            llm_rpm=args.llm_rpm,
+            tts_workers=args.tts_workers,
+        )
+        sys.exit(0)
+
+    if args.from_date or args.scripts_dir:
+        run_batch(
+            dates=_date_range(args.from_date, args.to_date) if args.from_date else None,
+            scripts_dir=args.scripts_dir,
+            dry_run=args.dry_run,
+            tts_backend=tts_backend,
+            voice=args.voice if args.voice != "am_michael" else None,
+            manual_host=args.host,
+            use_plan=args.plan,
+            llm_workers=args.llm_workers,
+            llm_rpm=args.llm_rpm,
+            tts_workers=args.tts_workers,
+        )
+        sys.exit(0)
+
     run_show(
         dry_run=args.dry_run,
         tts_backend=tts_backend,
@@ -426,4 +1183,7 @@ if __name__ == "__main__":
         use_plan=args.plan,
         target_date=args.date,
         manual_host=args.host,
+        stream_audio=args.stream,
+        resume=args.resume,
+        hedge_seconds=args.hedge,
     )
@@ -0,0 +1,294 @@
+"""
+DOC:START
+Content-addressed audio cache shared by the TTS backends.
+
+Purpose:
+- Caches rendered audio per unit, keyed by a hash of the normalized
+  text + backend + voice/profile + speed + model version
+- Local engines listed in AUDIO_CACHE_SENTENCES (default: Kokoro) cache per
+  sentence, so repeated lines ("Good morning, Chris. It's Emma.", recurring
+  quotes) and unchanged sentences of an edited script skip synthesis
+- Every other backend caches the text it's called with (a packed chunk or
+  segment) as one unit: one request per chunk, and sentences keep the
+  prosody of their neighbours
+- Evicts least-recently-used entries once the cache passes its size budget
+- Keeps hit/miss counts per backend (`main.py --cache-stats`)
+
+Inputs/Outputs:
+- Input: text + a render(text) callable from the backend module
+- Output: the same result shape the backend returns ((audio, sr) or MP3 bytes)
+
+Side effects:
+- Reads/writes output/cache/audio/ (AUDIO_CACHE_DIR); stats.json alongside the entries
+
+Run: python -m modules.audio_cache (prints stats)
+See: modules/modules.md
+DOC:END
+"""
+
+import io
+import os
+import json
+import atexit
+import hashlib
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from modules import segment
+
+CACHE_DIR = os.environ.get(
+    "AUDIO_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", "output", "cache", "audio")
+)
+MAX_BYTES = int(float(os.environ.get("AUDIO_CACHE_MAX_MB", "512")) * 1024 * 1024)
+ENABLED = os.environ.get("AUDIO_CACHE", "1") != "0"
+# Backends cached (and so rendered) sentence by sentence. Only worth it for local engines:
+# for remote ones every missed sentence would be its own request without its neighbours' prosody
+SENTENCE_BACKENDS = {b.strip() for b in os.environ.get("AUDIO_CACHE_SENTENCES", "kokoro").split(",") if b.strip()}
+
+# Evict down to this fraction of the budget so we don't evict on every put
+_EVICT_TO = 0.9
+
+# Sentence lengths of this thread's last sentence-level render (resynth's manifest reads them)
+_spans = threading.local()
+
+
+def split_sentences(text):
+    """Split text into sentences, keeping their punctuation (the unit that gets cached)."""
+    return segment.sentences(text)
+
+
+def normalize(sentence):
+    """Whitespace-insensitive form of a sentence (case and punctuation change the read, so they stay)."""
+    return " ".join(sentence.split())
+
+
+def make_key(sentence, backend, voice=None, speed=None, model=None):
+    """Content address for one rendered sentence."""
+    payload = json.dumps([normalize(sentence), backend, voice, speed, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _encode(result):
+    """(data bytes, extension) for a rendered piece."""
+    if isinstance(result, bytes):
+        return result, "mp3"
+    audio, sample_rate = result
+    buf = io.BytesIO()
+    sf.write(buf, audio, sample_rate, format="WAV", subtype="FLOAT")
+    return buf.getvalue(), "wav"
+
+
+def _decode(data, ext):
+    if ext == "mp3":
+        return data
+    audio, sample_rate = sf.read(io.BytesIO(data), dtype="float32")
+    return audio, sample_rate
+
+
+class AudioCache:
+    """On-disk cache: <dir>/<key[:2]>/<key>.<wav|mp3>, LRU by file mtime."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None  # scanned lazily on first put
+        self.counts = {}  # backend -> {"hits", "misses", "bytes_saved"}
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], f"{key}.{ext}")
+
+    def _count(self, backend, field, amount=1):
+        with self.lock:
+            counts = self.counts.setdefault(backend, {"hits": 0, "misses": 0, "bytes_saved": 0})
+            counts[field] += amount
+
+    def get(self, key, backend):
+        """Cached result for key, or None. A hit refreshes the entry's LRU position."""
+        for ext in ("wav", "mp3"):
+            path = self._path(key, ext)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                break  # evicted between open and utime, or unreadable — treat as a miss
+            self._count(backend, "hits")
+            self._count(backend, "bytes_saved", len(data))
+            return _decode(data, ext)
+        self._count(backend, "misses")
+        return None
+
+    def put(self, key, result):
+        """Store a rendered piece, then evict if over budget."""
+        data, ext = _encode(result)
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self.lock:
+            if self.size is None:
+                self.size = self._scan_size()
+            else:
+                self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) for every cached file."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith((".wav", ".mp3")):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop least-recently-used entries until under the eviction target. Caller holds the lock."""
+        target = self.max_bytes * _EVICT_TO
+        removed = 0
+        for _, size, path in sorted(self._entries()):
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+            removed += 1
+        print(f"   Audio cache: evicted {removed} entr{'y' if removed == 1 else 'ies'} "
+              f"({self.size / 1e6:.0f} MB of {self.max_bytes / 1e6:.0f} MB)")
+
+    def _stats_path(self):
+        return os.path.join(self.directory, "stats.json")
+
+    def load_stats(self):
+        """Cumulative per-backend counts saved by earlier runs."""
+        try:
+            with open(self._stats_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_stats(self):
+        """Fold this process's counts into stats.json (called at exit)."""
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        if not counts:
+            return
+        totals = self.load_stats()
+        for backend, c in counts.items():
+            t = totals.setdefault(backend, {"hits": 0, "misses": 0, "bytes_saved": 0})
+            for field, value in c.items():
+                t[field] = t.get(field, 0) + value
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._stats_path()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(totals, f, indent=2)
+        os.replace(tmp, self._stats_path())
+
+
+CACHE = AudioCache()
+atexit.register(CACHE.save_stats)
+
+
+def _join(pieces):
+    """Concatenate rendered pieces: MP3 frames as bytes, PCM as one array."""
+    if isinstance(pieces[0], bytes):
+        return b"".join(pieces)
+    sample_rate = pieces[0][1]
+    return np.concatenate([audio for audio, _ in pieces]), sample_rate
+
+
+def cached_synthesize(text, render, backend, voice=None, speed=None, model=None, cache=None, render_many=None):
+    """
+    Synthesize text, reusing cached units.
+
+    render: callable(text) -> (audio, sample_rate) | mp3 bytes | None
+    For backends in SENTENCE_BACKENDS the unit is a sentence: only missing
+    sentences are rendered, each its own result so it can be cached.
+    render_many: optional callable([sentences]) -> [results] | None, used when
+    several sentences are missing (batched engines render them together).
+    Any other backend gets one render(text) call on a miss, cached whole.
+    Returns the joined result, or None if any unit failed.
+    With AUDIO_CACHE=0 the whole text goes straight to render().
+    """
+    _spans.last = None
+    if not ENABLED:
+        return render(text)
+    cache = cache or CACHE
+
+    units = split_sentences(text) if backend in SENTENCE_BACKENDS else [text] if text.strip() else []
+    keys = [make_key(unit, backend, voice, speed, model) for unit in units]
+    pieces = [cache.get(key, backend) for key in keys]
+    missing = [i for i, piece in enumerate(pieces) if piece is None]
+    if render_many and len(missing) > 1:
+        rendered = render_many([units[i] for i in missing])
+        if rendered is None:
+            return None
+    else:
+        rendered = (render(units[i]) for i in missing)
+    for i, result in zip(missing, rendered):
+        if result is None:
+            return None
+        cache.put(keys[i], result)
+        pieces[i] = result
+    if backend in SENTENCE_BACKENDS and pieces and not isinstance(pieces[0], bytes):
+        _spans.last = [(unit, len(audio)) for unit, (audio, _) in zip(units, pieces)]
+    return _join(pieces) if pieces else None
+
+
+def take_spans():
+    """[(sentence, samples)] of this thread's last cached_synthesize call, if it rendered per sentence, else None."""
+    spans, _spans.last = getattr(_spans, "last", None), None
+    return spans
+
+
+def stats(cache=None):
+    """Cumulative + this-process counts per backend, with hit rate."""
+    cache = cache or CACHE
+    totals = cache.load_stats()
+    with cache.lock:
+        current = {b: dict(c) for b, c in cache.counts.items()}
+    for backend, c in current.items():
+        t = totals.setdefault(backend, {"hits": 0, "misses": 0, "bytes_saved": 0})
+        for field, value in c.items():
+            t[field] = t.get(field, 0) + value
+    for t in totals.values():
+        lookups = t["hits"] + t["misses"]
+        t["hit_rate"] = t["hits"] / lookups if lookups else None
+    return totals
+
+
+def print_stats(cache=None):
+    """Print the hit-rate report for `main.py --cache-stats`."""
+    cache = cache or CACHE
+    size = cache._scan_size() if os.path.isdir(cache.directory) else 0
+    print(f"Audio cache: {cache.directory} — {size / 1e6:.1f} MB of {cache.max_bytes / 1e6:.0f} MB")
+    totals = stats(cache)
+    if not totals:
+        print("No lookups recorded yet.")
+        return
+    print(f"{'backend':<12} {'hits':>7} {'misses':>7} {'hit rate':>9} {'MB saved':>9}")
+    for backend, t in sorted(totals.items()):
+        rate = f"{t['hit_rate']:.0%}" if t["hit_rate"] is not None else "-"
+        print(f"{backend:<12} {t['hits']:>7} {t['misses']:>7} {rate:>9} {t['bytes_saved'] / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    print_stats()
@@ -0,0 +1,116 @@
+"""
+DOC:START
+Streaming WAV writer shared by the local TTS backends.
+
+Purpose:
+- Appends each rendered segment to the output file as soon as it exists,
+  instead of collecting the whole show in a list and concatenating at the end
+- Keeps peak memory at one segment, whatever the show length
+- Keeps the WAV header current after every append, so a partial file is
+  playable if the process dies late
+
+Inputs/Outputs:
+- Input: output path, then (audio, sample_rate) segments as numpy arrays
+- Output: WAV file at the path
+
+Side effects:
+- Writes the output file incrementally
+
+Run: imported by tts_kokoro, tts_voicebox, tts_sesame, tts_mlx
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import struct
+
+import numpy as np
+import soundfile as sf
+
+# libsndfile only fills in the RIFF and data chunk sizes on close (its
+# SFC_SET_UPDATE_HEADER_AUTO command, 0x1061, isn't exposed by soundfile),
+# so the writer patches both fields itself after every append
+_HEADER_BYTES = 4096
+
+
+def _data_size_offset(path):
+    """Byte offset of the WAV data chunk's size field, or None."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER_BYTES)
+    pos = 12  # after "RIFF", the RIFF size and "WAVE"
+    while pos + 8 <= len(header):
+        chunk_id, size = header[pos:pos + 4], struct.unpack("<I", header[pos + 4:pos + 8])[0]
+        if chunk_id == b"data":
+            return pos + 4
+        pos += 8 + size + (size & 1)
+    return None
+
+
+class AudioWriter:
+    """
+    Context manager appending segments to a WAV file.
+
+        with AudioWriter(path) as out:
+            for audio in segments:
+                out.write(audio, sample_rate)
+
+    The file is opened on the first write, so the sample rate and channel
+    count can come from the first segment.
+    """
+
+    def __init__(self, path, sample_rate=None, subtype=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.subtype = subtype
+        self.frames = 0
+        self._file = None
+        self._data_size_at = None
+
+    def _open(self, audio):
+        channels = 1 if audio.ndim == 1 else audio.shape[1]
+        self._file = sf.SoundFile(self.path, mode="w", samplerate=self.sample_rate,
+                                  channels=channels, format="WAV", subtype=self.subtype)
+        self._data_size_at = _data_size_offset(self.path)
+
+    def _update_header(self):
+        """Write the RIFF and data sizes for the samples on disk so far."""
+        if self._data_size_at is None:
+            return  # no data chunk found: the header is only finalized on close
+        size = os.path.getsize(self.path)
+        with open(self.path, "r+b") as f:
+            f.seek(4)
+            f.write(struct.pack("<I", size - 8))
+            f.seek(self._data_size_at)
+            f.write(struct.pack("<I", size - self._data_size_at - 4))
+
+    def write(self, audio, sample_rate=None):
+        """Append one segment. Raises ValueError if its sample rate differs from the file's."""
+        audio = np.asarray(audio)
+        if sample_rate:
+            if self.sample_rate is None:
+                self.sample_rate = sample_rate
+            elif sample_rate != self.sample_rate:
+                raise ValueError(f"Segment sample rate {sample_rate} != {self.sample_rate}")
+        if self.sample_rate is None:
+            raise ValueError("AudioWriter needs a sample rate before the first segment")
+        if self._file is None:
+            self._open(audio)
+        self._file.write(audio)
+        self.frames += len(audio)
+        self._update_header()
+
+    @property
+    def seconds(self):
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
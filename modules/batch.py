@@ -0,0 +1,120 @@
+"""
+DOC:START
+Two-pool batch runner for backfills and bulk re-renders.
+
+Purpose:
+- Runs an LLM stage on a rate-limited thread pool (network-bound, API quota)
+- Hands each finished item to a separate TTS pool sized to CPU cores
+- Keeps everything in one process so TTS models load once and are shared
+
+Inputs/Outputs:
+- Input: list of items, llm_stage(item) -> job | None, tts_stage(job) -> result | None
+- Output: dict of item -> {"status": "ok" | "failed", "result" | "error", "seconds"}
+
+Side effects:
+- Whatever the stage callables do (main.py wires in script generation + synthesis)
+
+Run: imported by main.py (--from/--to, --scripts-dir)
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_LLM_WORKERS = 4
+DEFAULT_LLM_RPM = 20
+
+
+class RateLimiter:
+    """Spaces calls at least 60/rpm seconds apart across all threads."""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def default_tts_workers():
+    return os.cpu_count() or 1
+
+
+def run_pipeline(items, tts_stage, llm_stage=None, llm_workers=DEFAULT_LLM_WORKERS,
+                 llm_rpm=DEFAULT_LLM_RPM, tts_workers=None):
+    """
+    Push items through llm_stage then tts_stage on separate pools.
+
+    Without llm_stage, items go straight to the TTS pool (re-render mode).
+    An item whose stage returns None or raises is marked failed; the rest
+    of the batch carries on.
+    """
+    tts_workers = tts_workers or default_tts_workers()
+    limiter = RateLimiter(llm_rpm)
+    results = {}
+    started = {item: time.perf_counter() for item in items}
+    batch_start = time.perf_counter()
+
+    def _fail(item, error):
+        print(f"   [{item}] FAILED: {error}")
+        results[item] = {"status": "failed", "error": str(error),
+                         "seconds": time.perf_counter() - started[item]}
+
+    def _limited(item):
+        limiter.wait()
+        return llm_stage(item)
+
+    print(f"Batch: {len(items)} item(s), "
+          f"{'LLM pool ' + str(llm_workers) + ' @ ' + str(llm_rpm) + ' rpm, ' if llm_stage else ''}"
+          f"TTS pool {tts_workers}")
+
+    with ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix="tts") as tts_pool:
+        tts_futures = {}
+
+        if llm_stage:
+            with ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm") as llm_pool:
+                llm_futures = {llm_pool.submit(_limited, item): item for item in items}
+                # Hand each script to TTS as soon as it lands, not after the whole LLM pass
+                for future in as_completed(llm_futures):
+                    item = llm_futures[future]
+                    try:
+                        job = future.result()
+                    except Exception as e:
+                        _fail(item, e)
+                        continue
+                    if job is None:
+                        _fail(item, "LLM stage produced nothing")
+                        continue
+                    tts_futures[tts_pool.submit(tts_stage, job)] = item
+        else:
+            tts_futures = {tts_pool.submit(tts_stage, item): item for item in items}
+
+        for future in as_completed(tts_futures):
+            item = tts_futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                _fail(item, e)
+                continue
+            if result is None:
+                _fail(item, "TTS stage produced nothing")
+                continue
+            results[item] = {"status": "ok", "result": result,
+                             "seconds": time.perf_counter() - started[item]}
+
+    elapsed = time.perf_counter() - batch_start
+    ok = sum(1 for r in results.values() if r["status"] == "ok")
+    print(f"Batch complete: {ok}/{len(items)} succeeded in {elapsed:.1f}s")
+    for item in items:
+        r = results.get(item, {"status": "failed", "seconds": 0})
+        print(f"   {item}: {r['status']} ({r['seconds']:.1f}s)")
+    return results
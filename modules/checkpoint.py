@@ -0,0 +1,176 @@
+"""
+DOC:START
+Per-date stage checkpoints so a failed run can resume where it stopped.
+
+Purpose:
+- Stores each run_show stage's artifact under output/runs/<date>/:
+  inputs.json (host, plan, fetched data), prompt.json, script.json,
+  chunks/ (per-chunk audio), audio.json (final audio), notify.json
+- Renders scripts chunk-by-chunk so a TTS failure keeps finished chunks
+- Lets `main.py --resume` skip every stage that already finished
+- Holds night-before renders under output/prerender/<date>/ (body.json + chunks/)
+
+Inputs/Outputs:
+- Input: output_dir, show date, stage payloads (JSON-serializable dicts)
+- Output: stage payloads on reload, chunk audio paths
+
+Side effects:
+- Writes/deletes files under output/runs/<date>/
+
+Run: imported by main.py (--resume)
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import soundfile as sf
+
+from modules import postprocess
+
+STAGES = ["inputs", "prompt", "script", "audio", "notify"]
+
+
+def run_path(output_dir, show_date):
+    """Checkpoint directory for show_date (may not exist yet)."""
+    return os.path.join(output_dir, "runs", show_date)
+
+
+def prerender_path(output_dir, show_date):
+    """Directory holding the night-before render of show_date's static sections."""
+    return os.path.join(output_dir, "prerender", show_date)
+
+
+def start_run(output_dir, show_date, resume=False):
+    """
+    Return the checkpoint directory for show_date.
+
+    Without resume, any earlier checkpoints for the date are wiped so a
+    fresh run never picks up stale artifacts.
+    """
+    run_dir = run_path(output_dir, show_date)
+    if not resume and os.path.isdir(run_dir):
+        shutil.rmtree(run_dir)
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+
+def load(run_dir, stage):
+    """Return the saved payload for a stage, or None if the stage never finished."""
+    path = os.path.join(run_dir, f"{stage}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"   Warning: unreadable checkpoint {path}: {e}")
+        return None
+
+
+def save(run_dir, stage, payload):
+    """Atomically write a stage payload (write to .tmp, then rename)."""
+    path = os.path.join(run_dir, f"{stage}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def first_incomplete(run_dir):
+    """Name of the first stage without a checkpoint, or None if all finished."""
+    for stage in STAGES:
+        if not os.path.exists(os.path.join(run_dir, f"{stage}.json")):
+            return stage
+    return None
+
+
+def write_piece(path, result):
+    """Write one rendered piece — mp3 bytes or (audio, sample_rate) — via a temp file."""
+    tmp = f"{path}.part"
+    if isinstance(result, bytes):
+        with open(tmp, "wb") as f:
+            f.write(result)
+    else:
+        audio, sample_rate = result
+        sf.write(tmp, audio, sample_rate, format="MP3" if path.endswith(".mp3") else "WAV")
+    os.replace(tmp, path)
+
+
+def chunk_path(run_dir, index, chunk, key, ext):
+    """Path of one chunk's audio under run_dir/chunks/ (the directory is created)."""
+    chunk_dir = os.path.join(run_dir, "chunks")
+    os.makedirs(chunk_dir, exist_ok=True)
+    digest = hashlib.sha1(f"{key}\n{chunk}".encode("utf-8")).hexdigest()[:10]
+    return os.path.join(chunk_dir, f"{index:03d}_{digest}.{ext}")
+
+
+def render_chunks(run_dir, chunks, synth, ext, key, on_chunk=None, cancel=None):
+    """
+    Render chunks to run_dir/chunks/, reusing any already rendered.
+
+    Chunk files are named by index plus a hash of (key, chunk text), so an
+    edited script or a different voice never reuses the wrong audio.
+    key should identify the backend + voice, e.g. "kokoro:bf_emma".
+    on_chunk(index, text, result, seconds) is called after each fresh render.
+    cancel is an optional threading.Event; once set, rendering stops before the next chunk.
+
+    Returns the ordered list of chunk paths, or None if any chunk failed.
+    """
+    paths = []
+    for i, chunk in enumerate(chunks):
+        path = chunk_path(run_dir, i, chunk, key, ext)
+        if os.path.exists(path):
+            print(f"  Chunk {i+1}/{len(chunks)} already rendered, reusing")
+            paths.append(path)
+            continue
+
+        if cancel is not None and cancel.is_set():
+            print(f"  Cancelled before chunk {i+1}/{len(chunks)} ({key})")
+            return None
+
+        print(f"  Chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
+        start = time.perf_counter()
+        result = synth(chunk)
+        if result is None:
+            return None
+        if on_chunk:
+            on_chunk(i, chunk, result, time.perf_counter() - start)
+        write_piece(path, result)
+        paths.append(path)
+
+    return paths
+
+
+def join_chunks(paths, output_path):
+    """
+    Join chunk files into output_path through the post-processing stage
+    (crossfades at chunk boundaries, loudness normalization, silence capping),
+    streamed one chunk at a time.
+
+    Returns the position remap from postprocess.process_files, or None when the chunks
+    were joined as-is (POSTPROCESS=0, or MP3 this libsndfile can't decode/encode).
+    """
+    if postprocess.ENABLED:
+        try:
+            return postprocess.process_files(paths, output_path)
+        except (RuntimeError, TypeError, ValueError) as e:
+            # libsndfile builds without MP3 support land here for ElevenLabs chunks
+            print(f"   Post-processing skipped ({e}) — joining chunks as-is")
+
+    if paths[0].endswith(".mp3"):
+        with open(output_path, "wb") as out:
+            for path in paths:
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return None
+
+    info = sf.info(paths[0])
+    with sf.SoundFile(output_path, mode="w", samplerate=info.samplerate, channels=info.channels) as out:
+        for path in paths:
+            audio, _ = sf.read(path)
+            out.write(audio)
+    return None
@@ -23,12 +23,14 @@ DOC:END
 import os
 import json
 import random
-from openai import OpenAI
 from datetime import datetime
 from modules.db import get_recent_scripts, get_recent_quotes, get_recent_pillar_combos
 
 HOSTS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "hosts.json")
 
+# Hosts flag improvised biography details with this tag; it must never reach TTS
+CANON_PATTERN = r'\[NEW_CANON:\s*"([^"]+)"\]'
+
 
 def load_host(host_name):
     """Load a host persona from data/hosts.json. Returns dict or None."""
@@ -285,14 +287,15 @@ def select_pillars(weather_mood, news_summary="", recent_combos=None):
     return selected
 
 
-def generate_script(weather, news, deep_dive, quote, history_fact=None, model="gpt-5.1", recent_context=None, host_name=None):
-    """
-    Generates the Morning Radio Show script using OpenAI.
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
+def _show_date_label(show_date=None):
+    """Spoken date for the prompt — the show's date (YYYY-MM-DD) when backfilling, else today."""
+    day = datetime.strptime(show_date, "%Y-%m-%d") if show_date else datetime.now()
+    return day.strftime("%A, %B %d, %Y")
+
 
-    today_date = datetime.now().strftime("%A, %B %d, %Y")
+def build_freeform_prompts(weather, news, deep_dive, quote, history_fact=None, recent_context=None, host_name=None, show_date=None):
+    """Build the (system_prompt, user_prompt) pair for freeform generation."""
+    today_date = _show_date_label(show_date)
 
     # Build host persona or fall back to generic
     host = load_host(host_name) if host_name else None
@@ -351,39 +354,37 @@ Your goal is to wake him up, orient him to the day, and provide a deep insightfu
     - End with the Quote.
     - **DO NOT** use headers like "Weather:" or "Deep Dive:". Just speak.
     """
-    
+    return system_prompt, user_prompt
+
+
+def _load_show_flow():
+    """Show flow guide for system prompts ('' if missing)."""
+    show_flow_path = os.path.join(os.path.dirname(__file__), "..", "data", "show_flow.md")
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error generating script: {e}"
+        with open(show_flow_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
 
-def generate_script_from_plan(plan, weather, news, model="gpt-5.1", recent_context=None, host_name=None):
+
+def _host_intro(host_name=None):
+    """(host_intro, host dict or None) for a system prompt."""
+    host = load_host(host_name) if host_name else None
+    if host:
+        return _build_host_prompt(host), host
+    return 'You are a charismatic, deep, and thoughtful Early Morning Radio Host.\nYour listener is Chris. He is analytical, strategic, faithful, and working on himself every day.', None
+
+
+def build_plan_prompts(plan, weather, news, recent_context=None, host_name=None, show_date=None):
     """
-    Generate a script from a weekly plan outline.
+    Build the (system_prompt, user_prompt) pair for plan-based generation.
 
     plan dict has: pillars, deep_dive_topic, quote, quote_source,
                    talking_points, theme_connection
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
+    today_date = _show_date_label(show_date)
 
-    today_date = datetime.now().strftime("%A, %B %d, %Y")
-
-    # Load show flow guide for system prompt
-    show_flow_path = os.path.join(os.path.dirname(__file__), "..", "data", "show_flow.md")
-    try:
-        with open(show_flow_path, "r", encoding="utf-8") as f:
-            show_flow = f.read()
-    except FileNotFoundError:
-        show_flow = ""
+    show_flow = _load_show_flow()
 
     # Dynamic pillar selection — override plan's pre-assigned pillars
     plan_pillars = plan.get("pillars", [])
@@ -411,11 +412,7 @@ def generate_script_from_plan(plan, weather, news, model="gpt-5.1", recent_conte
     tp_str = "\n".join(f"  - {tp}" for tp in talking_points)
 
     # Build host persona or fall back to generic
-    host = load_host(host_name) if host_name else None
-    if host:
-        host_intro = _build_host_prompt(host)
-    else:
-        host_intro = 'You are a charismatic, deep, and thoughtful Early Morning Radio Host.\nYour listener is Chris. He is analytical, strategic, faithful, and working on himself every day.'
+    host_intro, host = _host_intro(host_name)
 
     name_rule = f'\n- Start the show by introducing yourself by name: "Good morning, Chris. It\'s {host["name"]}." or similar.' if host else ""
 
@@ -451,6 +448,107 @@ ABSOLUTE RULES:
 - Do NOT name the pillars. Never say "stoicism" or "INTJ" or "bio-hacking." Just BE those things.
 - Write for TTS: short sentences, no acronyms, numbers as words, punctuation for pacing.
 {_format_anti_repetition_prompt(recent_context) if recent_context else ''}"""
+    return system_prompt, user_prompt
+
+
+def build_body_prompts(plan, recent_context=None, host_name=None, show_date=None):
+    """
+    Build the (system_prompt, user_prompt) pair for the static part of a plan
+    show — Centering, Deep Dive and Outro — which needs no live data and can
+    be written (and rendered) the night before. The wake-up is written in the
+    morning by build_wakeup_prompts and spliced in front.
+    """
+    today_date = _show_date_label(show_date)
+    host_intro, _ = _host_intro(host_name)
+
+    plan_pillars = plan.get("pillars", [])
+    if isinstance(plan_pillars, str):
+        plan_pillars = [plan_pillars]
+    pillars_str = ", ".join(plan_pillars or select_pillars("balanced"))
+
+    talking_points = plan.get("talking_points", [])
+    if isinstance(talking_points, str):
+        talking_points = [talking_points]
+    tp_str = "\n".join(f"  - {tp}" for tp in talking_points)
+
+    system_prompt = f"""{host_intro}
+
+{_load_show_flow()}
+
+ABSOLUTE RULES:
+- NEVER say the words "stoicism," "stoic," "INTJ," "bio-hacking," or "recovery mindset" on-air. These are planning labels. On-air, just embody the ideas naturally.
+- You are writing the SECOND part of the show only. The Wake-Up (greeting, weather, news) and the Pivot are recorded separately in the morning and play right before your first line.
+- Do NOT greet the listener, introduce yourself, or mention weather, news or the time of day. Open already in the slower, quieter register of the Centering."""
+
+    user_prompt = f"""Context for the show ({today_date}):
+- Internal pillars (DO NOT mention these by name, just apply the concepts): {pillars_str}
+- Deep Dive Topic: {plan.get('deep_dive_topic', 'General Reflection')}
+- Quote of the Day: "{plan.get('quote', '')}" — {plan.get('quote_source', 'Unknown')}
+- Theme Connection: {plan.get('theme_connection', '')}
+- Talking Points:
+{tp_str}
+
+**Instructions**:
+- Write ONLY these sections, in order: THE CENTERING, THE DEEP DIVE, THE OUTRO.
+- THE CENTERING: Faith first. A moment of stillness. Draw from the FULL thinker pool in the show flow guide. Vary the count (2-4 sources), vary the order. No thinker repeated from the anti-repetition context.
+- THE DEEP DIVE: Go deep on the main topic. Use the talking points as your guide. 3-4 minutes of reading time.
+- THE OUTRO: "Now, go get after it." + Quote. Short and punctuated.
+- Do NOT use headers, segment labels, or lists. Just flow.
+- Write for TTS: short sentences, no acronyms, numbers as words, punctuation for pacing.
+{_format_anti_repetition_prompt(recent_context) if recent_context else ''}"""
+    return system_prompt, user_prompt
+
+
+def build_wakeup_prompts(weather, news, body_opening, host_name=None, show_date=None):
+    """
+    Build the (system_prompt, user_prompt) pair for the live Wake-Up + Pivot
+    that is spliced in front of a pre-rendered body.
+
+    body_opening: the first lines of the pre-rendered body, so the pivot can
+    hand off to it without a seam.
+    """
+    today_date = _show_date_label(show_date)
+    host_intro, host = _host_intro(host_name)
+    greeting = f'"Good morning, Chris. It\'s {host["name"]}."' if host else '"Good morning, Chris."'
+
+    system_prompt = f"""{host_intro}
+
+You are recording the opening of today's show. The rest of the show is already recorded and plays immediately after your last line.
+
+ABSOLUTE RULES:
+- About 20-30 seconds of reading time. Casual, warm, brief. Like turning on the radio.
+- Do NOT use headers, segment labels, or lists. Write for TTS: short sentences, no acronyms, numbers as words."""
+
+    user_prompt = f"""Context for today ({today_date}):
+- Weather: {weather}
+- News Headlines: {news}
+
+**Instructions**:
+- THE WAKE-UP: Start with {greeting} Give the SPECIFIC weather details — temperature, conditions, what the day looks like. Mention 2-3 actual news headlines briefly and conversationally.
+- THE PIVOT: End with one short line that slows things down and shifts from the outside world to the inside. NEVER use "But put all that aside for a second."
+- Your last line must lead naturally into the recorded show, which opens with:
+\"\"\"
+{body_opening}
+\"\"\"
+- Do NOT repeat or paraphrase that opening, and do not start the centering yourself."""
+    return system_prompt, user_prompt
+
+
+def _fill_usage(usage, response_usage):
+    """Copy token counts from an OpenAI usage object into the caller's dict."""
+    if usage is not None and response_usage is not None:
+        usage["tokens_in"] = response_usage.prompt_tokens
+        usage["tokens_out"] = response_usage.completion_tokens
+
+
+def complete(system_prompt, user_prompt, model="gpt-5.1", usage=None):
+    """Run a single chat completion and return the script text (or an error string).
+
+    Pass a dict as usage to receive tokens_in / tokens_out.
+    """
+    from openai import OpenAI  # imported lazily: --input-file runs never call the LLM
+    api_key = os.getenv("OPENAI_API_KEY")
+    client = OpenAI(api_key=api_key)
 
     try:
         response = client.chat.completions.create(
@@ -461,11 +559,67 @@ ABSOLUTE RULES:
             ],
             temperature=0.7,
         )
+        _fill_usage(usage, response.usage)
         return response.choices[0].message.content
     except Exception as e:
         return f"Error generating script: {e}"
 
 
+def stream_completion(system_prompt, user_prompt, model="gpt-5.1", usage=None):
+    """
+    Stream a chat completion, yielding text deltas as they arrive.
+
+    Raises on API errors — callers streaming into TTS need to know the
+    script is incomplete rather than speak an error string.
+    """
+    from openai import OpenAI
+    api_key = os.getenv("OPENAI_API_KEY")
+    client = OpenAI(api_key=api_key)
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.7,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    for event in stream:
+        # The final event carries usage and no choices
+        _fill_usage(usage, getattr(event, "usage", None))
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def generate_script(weather, news, deep_dive, quote, history_fact=None, model="gpt-5.1", recent_context=None, host_name=None):
+    """
+    Generates the Morning Radio Show script using OpenAI.
+    """
+    system_prompt, user_prompt = build_freeform_prompts(
+        weather, news, deep_dive, quote, history_fact=history_fact,
+        recent_context=recent_context, host_name=host_name,
+    )
+    return complete(system_prompt, user_prompt, model=model)
+
+
+def generate_script_from_plan(plan, weather, news, model="gpt-5.1", recent_context=None, host_name=None):
+    """
+    Generate a script from a weekly plan outline.
+
+    plan dict has: pillars, deep_dive_topic, quote, quote_source,
+                   talking_points, theme_connection
+    """
+    system_prompt, user_prompt = build_plan_prompts(
+        plan, weather, news, recent_context=recent_context, host_name=host_name,
+    )
+    return complete(system_prompt, user_prompt, model=model)
+
+
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
@@ -4,6 +4,24 @@ Personal context module for Daily Reflections.
 Gathers git activity, calendar events, Gmail summary, and open loops
 to inject personal context into the morning show script.
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import os
 import subprocess
@@ -141,18 +159,25 @@ def get_open_loops():
         return []
 
 
-def gather_all_context():
+CONTEXT_SOURCES = ("git", "calendar", "gmail", "open_loops")
+
+
+def gather_all_context(sources=None):
     """
     Gather all personal context and return a formatted prompt section.
 
+    sources: subset of CONTEXT_SOURCES to read (default: all). Skipped sources
+    come back empty, so another listener never sees Chris's repos or inbox.
+
     Returns dict with:
         - formatted_prompt_section: str ready for injection into LLM prompt
         - raw: dict with individual data sources
     """
-    git = get_git_activity()
-    calendar = get_calendar_events()
-    gmail = get_gmail_summary()
-    loops = get_open_loops()
+    sources = CONTEXT_SOURCES if sources is None else sources
+    git = get_git_activity() if "git" in sources else []
+    calendar = get_calendar_events() if "calendar" in sources else []
+    gmail = get_gmail_summary() if "gmail" in sources else []
+    loops = get_open_loops() if "open_loops" in sources else []
 
     parts = ["## YOUR DAY"]
 
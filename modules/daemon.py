@@ -0,0 +1,233 @@
+"""
+DOC:START
+Resident daemon: keeps TTS models warm, runs the schedule, serves a Unix socket.
+
+Purpose:
+- Loads Kokoro pipelines once at startup so scheduled/on-demand runs only pay for inference
+- Internal scheduler: daily show (DAILY_SHOW_TIME), weekly planner (PLANNER_SCHEDULE)
+  and the night-before pre-render of tomorrow's show (PRERENDER_TIME)
+- Local Unix socket accepting one JSON request per connection (show, render, plan, status)
+- Client mode: python -m modules.daemon status|show|render <script.txt>|plan|prerender
+
+Inputs/Outputs:
+- Input: job callables from main.py, env schedule config, JSON requests on the socket
+- Output: one JSON response line per request
+
+Side effects:
+- Creates/removes the socket file (default output/daemon.sock)
+- Runs whatever the jobs do (network, LLM, TTS, Telegram)
+
+Run: python main.py --daemon
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import datetime
+import threading
+import traceback
+import socketserver
+
+SOCKET_PATH = os.environ.get(
+    "DAEMON_SOCKET", os.path.join(os.path.dirname(__file__), "..", "output", "daemon.sock")
+)
+# HH:MM local time for the daily show
+DAILY_SHOW_TIME = os.environ.get("DAILY_SHOW_TIME", "05:30")
+# "<weekday> HH:MM" for the weekly planner (plans the next 7 days)
+PLANNER_SCHEDULE = os.environ.get("PLANNER_SCHEDULE", "Sun 18:00")
+# HH:MM local time to pre-render tomorrow's static sections (after the planner on Sundays)
+PRERENDER_TIME = os.environ.get("PRERENDER_TIME", "21:30")
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+TICK_SECONDS = 20
+
+# Jobs share the warm models and write the same output dirs — run one at a time
+_JOB_LOCK = threading.Lock()
+
+
+def warm_models():
+    """Load Kokoro (one model, the hosts' voices) into this process, or its process pool."""
+    from modules import kokoro_pool, tts_kokoro, tts_server
+    if tts_server.status() is not None:
+        print("[daemon] TTS server is running; renders go there, skipping model warm-up")
+        return
+    start = time.perf_counter()
+    if kokoro_pool.enabled():
+        # Renders go to the worker processes; load the model there instead
+        kokoro_pool.warm()
+    else:
+        tts_kokoro.preload()
+    print(f"[daemon] Models warm in {time.perf_counter() - start:.1f}s")
+
+
+def _run_job(jobs, action, params):
+    """Run a named job under the job lock. Returns a JSON-able response dict."""
+    job = jobs.get(action)
+    if not job:
+        return {"ok": False, "error": f"unknown action '{action}'", "actions": sorted(jobs) + ["status"]}
+
+    with _JOB_LOCK:
+        start = time.perf_counter()
+        print(f"[daemon] {action} {params or ''}")
+        try:
+            result = job(**params)
+        except SystemExit as e:
+            # run_show exits on bad input (missing plan, unreadable file)
+            return {"ok": False, "error": f"job exited ({e.code})"}
+        except Exception as e:
+            traceback.print_exc()
+            return {"ok": False, "error": str(e)}
+        finally:
+            # The daemon rarely exits, so don't leave audio cache hit counts to atexit
+            cache = sys.modules.get("modules.audio_cache")
+            if cache:
+                cache.CACHE.save_stats()
+        return {"ok": True, "result": result, "seconds": round(time.perf_counter() - start, 1)}
+
+
+def _due(spec, now, last_key):
+    """
+    Return a run key if spec ("HH:MM" or "<Weekday> HH:MM") is due at `now` and
+    hasn't already run for that key, else None.
+    """
+    parts = spec.split()
+    if len(parts) == 2:
+        if WEEKDAYS[now.weekday()] != parts[0][:3].title():
+            return None
+        hhmm = parts[1]
+    else:
+        hhmm = parts[0]
+
+    hour, minute = (int(x) for x in hhmm.split(":"))
+    if (now.hour, now.minute) < (hour, minute):
+        return None
+    key = now.strftime("%Y-%m-%d")
+    return key if key != last_key else None
+
+
+def _scheduler(jobs, stop):
+    """Fire the daily show, weekly planner and nightly pre-render when due (once per day each)."""
+    schedule = {"show": DAILY_SHOW_TIME, "plan": PLANNER_SCHEDULE, "prerender": PRERENDER_TIME}
+    schedule = {action: spec for action, spec in schedule.items() if action in jobs}
+    # Don't fire today's already-past slots just because the daemon (re)started
+    now = datetime.datetime.now()
+    last = {action: _due(spec, now, None) for action, spec in schedule.items()}
+
+    while not stop.is_set():
+        now = datetime.datetime.now()
+        for action, spec in schedule.items():
+            key = _due(spec, now, last[action])
+            if key:
+                last[action] = key
+                response = _run_job(jobs, action, {})
+                print(f"[daemon] scheduled {action}: {'ok' if response['ok'] else response['error']}")
+        stop.wait(TICK_SECONDS)
+
+
+def _make_handler(jobs, started):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            try:
+                request = json.loads(line)
+                action = request.pop("action")
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                response = {"ok": False, "error": "expected one JSON object with an 'action' key"}
+            else:
+                if action == "status":
+                    response = {
+                        "ok": True,
+                        "busy": _JOB_LOCK.locked(),
+                        "uptime": round(time.time() - started),
+                        "show_time": DAILY_SHOW_TIME,
+                        "planner": PLANNER_SCHEDULE,
+                        "prerender": PRERENDER_TIME,
+                    }
+                else:
+                    response = _run_job(jobs, action, request)
+            self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+
+    return Handler
+
+
+def serve(jobs, socket_path=SOCKET_PATH, warm=True):
+    """
+    Run the daemon until interrupted.
+
+    jobs: dict of action -> callable(**params). "show" and "plan" are also
+    fired by the scheduler with no params, as is "prerender" if present.
+    """
+    if warm:
+        warm_models()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a previous run
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+
+    stop = threading.Event()
+    scheduler = threading.Thread(target=_scheduler, args=(jobs, stop), name="scheduler", daemon=True)
+    scheduler.start()
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _make_handler(jobs, time.time()))
+    os.chmod(socket_path, 0o600)
+    print(f"[daemon] Listening on {socket_path} (show {DAILY_SHOW_TIME}, planner {PLANNER_SCHEDULE})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[daemon] Shutting down")
+    finally:
+        stop.set()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def send(request, socket_path=SOCKET_PATH, timeout=None):
+    """Send one request to a running daemon and return its response dict (None if not running)."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            data = b""
+            while not data.endswith(b"\n"):
+                part = sock.recv(65536)
+                if not part:
+                    break
+                data += part
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    return json.loads(data) if data else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Talk to a running Daily Reflection daemon")
+    parser.add_argument("action", choices=["status", "show", "render", "plan", "prerender"])
+    parser.add_argument("input_file", nargs="?", help="Script to render (render only)")
+    parser.add_argument("--date", type=str, default=None, help="Show/plan date (YYYY-MM-DD)")
+    parser.add_argument("--host", type=str, default=None, help="Host name")
+    args = parser.parse_args()
+
+    request = {"action": args.action}
+    if args.action == "render":
+        if not args.input_file:
+            parser.error("render needs a script path")
+        request["input_file"] = os.path.abspath(args.input_file)
+    if args.date:
+        request["date"] = args.date
+    if args.host and args.action in ("show", "render", "prerender"):
+        request["host"] = args.host
+
+    response = send(request)
+    if response is None:
+        print(f"Daemon not running (no socket at {SOCKET_PATH})")
+        sys.exit(1)
+    print(json.dumps(response, indent=2))
+    sys.exit(0 if response.get("ok") else 1)
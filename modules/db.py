@@ -4,9 +4,28 @@ SQLite database for show history and weekly plans.
 Tables:
 - history: tracks what was used in past shows (dedup source)
 - weekly_plan: stores planned content (consumed by daily runner)
+- metrics: per-stage timing, token, char, audio and byte counts for each run
 
 Database: data/reflections.db (auto-created)
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import sqlite3
 import json
@@ -40,6 +59,24 @@ def init_db():
             created_at TEXT DEFAULT (datetime('now'))
         );
 
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            show_date TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            backend TEXT,
+            seconds REAL,
+            tokens_in INTEGER,
+            tokens_out INTEGER,
+            chars INTEGER,
+            audio_seconds REAL,
+            rtf REAL,
+            bytes INTEGER,
+            ok INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+        CREATE INDEX IF NOT EXISTS idx_metrics_stage ON metrics(stage, created_at);
+
         CREATE TABLE IF NOT EXISTS weekly_plan (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             week_start TEXT NOT NULL,
@@ -62,6 +99,18 @@ def init_db():
         conn.commit()
     except sqlite3.OperationalError:
         pass  # Column already exists
+    # Engine that actually rendered the audio (differs from the host's when hedging/fallback kicks in)
+    try:
+        conn.execute("ALTER TABLE history ADD COLUMN tts_backend TEXT")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    # Input size for stages that shrink a file (encode), next to the output size in bytes
+    try:
+        conn.execute("ALTER TABLE metrics ADD COLUMN bytes_in INTEGER")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # Column already exists
     conn.close()
 
 
@@ -88,7 +137,7 @@ def get_history(days=90):
 
 def save_history(show_date, pillars, quote, quote_source=None,
                  deep_dive_topic=None, talking_points=None,
-                 script_path=None, audio_path=None, host=None):
+                 script_path=None, audio_path=None, host=None, tts_backend=None):
     """Save a show's metadata to the history table."""
     conn = _connect()
     pillars_json = json.dumps(pillars) if isinstance(pillars, list) else pillars
@@ -96,10 +145,31 @@ def save_history(show_date, pillars, quote, quote_source=None,
     conn.execute(
         """INSERT OR REPLACE INTO history
            (show_date, pillars, quote, quote_source, deep_dive_topic,
-            talking_points, script_path, audio_path, host)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            talking_points, script_path, audio_path, host, tts_backend)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (show_date, pillars_json, quote, quote_source, deep_dive_topic,
-         tp_json, script_path, audio_path, host)
+         tp_json, script_path, audio_path, host, tts_backend)
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_history_for_date(show_date):
+    """Return the history row for a show date as a dict, or None."""
+    conn = _connect()
+    row = conn.execute(
+        "SELECT * FROM history WHERE show_date = ?", (show_date,)
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def set_history_audio(show_date, audio_path, tts_backend=None):
+    """Point an existing history row at a (re-)rendered audio file."""
+    conn = _connect()
+    conn.execute(
+        "UPDATE history SET audio_path = ?, tts_backend = ? WHERE show_date = ?",
+        (audio_path, tts_backend, show_date)
     )
     conn.commit()
     conn.close()
@@ -219,6 +289,36 @@ def get_recent_hosts(days=7):
     return [row["host"] for row in rows]
 
 
+METRIC_FIELDS = ("backend", "seconds", "tokens_in", "tokens_out", "chars",
+                 "audio_seconds", "rtf", "bytes", "bytes_in", "ok")
+
+
+def save_metric(run_id, show_date, stage, **fields):
+    """Insert one stage measurement. Unknown fields are ignored."""
+    values = {k: fields.get(k) for k in METRIC_FIELDS}
+    if values["ok"] is None:
+        values["ok"] = 1
+    conn = _connect()
+    conn.execute(
+        f"""INSERT INTO metrics (run_id, show_date, stage, {", ".join(METRIC_FIELDS)})
+            VALUES (?, ?, ?, {", ".join("?" for _ in METRIC_FIELDS)})""",
+        (run_id, show_date, stage, *(values[k] for k in METRIC_FIELDS))
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_metrics(days=30):
+    """Return metric rows recorded in the last N days as list of dicts."""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT * FROM metrics WHERE created_at >= datetime('now', ?) ORDER BY created_at",
+        (f"-{int(days)} days",)
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
 if __name__ == "__main__":
     init_db()
     print(f"Database initialized at {os.path.abspath(DB_PATH)}")
@@ -0,0 +1,120 @@
+"""
+DOC:START
+Delivery encoding: compress the finished WAV before it's sent or stored.
+
+Purpose:
+- Streams the rendered WAV through ffmpeg into a speech-tuned compressed
+  format (AAC/M4A by default, Opus or MP3) at a configurable bitrate
+- Records the size reduction and encode time (metrics stage "encode")
+- Prunes WAV masters once they're older than KEEP_WAV_DAYS (recent ones stay
+  for incremental re-renders, see resynth.py)
+
+Inputs/Outputs:
+- Input: path to a WAV; ENCODE_FORMAT (aac|opus|mp3), ENCODE_BITRATE (e.g. 48k)
+- Output: path to the encoded file next to it (.m4a / .ogg / .mp3)
+
+Side effects:
+- Runs ffmpeg; writes the encoded file; deletes old WAV masters in output/audio/
+
+Run: imported by main.py
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import time
+import shutil
+import subprocess
+
+# ffmpeg arguments per format. Speech is mono; AAC-LC and Opus stay clear at low bitrates.
+FORMATS = {
+    "aac": {"ext": "m4a", "mime": "audio/mp4", "bitrate": "64k",
+            "args": ["-c:a", "aac", "-f", "ipod", "-movflags", "+faststart"]},
+    "opus": {"ext": "ogg", "mime": "audio/ogg", "bitrate": "32k",
+             "args": ["-c:a", "libopus", "-application", "voip", "-f", "ogg"]},
+    "mp3": {"ext": "mp3", "mime": "audio/mpeg", "bitrate": "64k",
+            "args": ["-c:a", "libmp3lame", "-f", "mp3"]},
+}
+
+FORMAT = os.environ.get("ENCODE_FORMAT", "aac").lower()
+BITRATE = os.environ.get("ENCODE_BITRATE")  # None = the format's default
+ENABLED = FORMAT not in ("", "0", "none", "wav")
+KEEP_WAV_DAYS = float(os.environ.get("KEEP_WAV_DAYS", "2"))
+
+MIME_TYPES = {".wav": "audio/wav", **{f".{f['ext']}": f["mime"] for f in FORMATS.values()}}
+
+
+def mime_type(path):
+    """MIME type for an audio file, by extension."""
+    return MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+
+def encode(wav_path, fmt=None, bitrate=None):
+    """
+    Encode wav_path with ffmpeg. Returns (encoded_path, stats) or None.
+
+    stats: {"bytes_in", "bytes", "seconds"}. None when encoding is disabled,
+    the input isn't a WAV (ElevenLabs MP3 is already compressed), ffmpeg
+    isn't installed, or ffmpeg fails — callers then deliver the WAV.
+    """
+    if fmt is None and not ENABLED:
+        return None
+    fmt = (fmt or FORMAT).lower()
+    if not wav_path.endswith(".wav"):
+        return None
+    if fmt not in FORMATS:
+        print(f"   Encode: unknown format '{fmt}' (known: {', '.join(FORMATS)}), sending WAV")
+        return None
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("   Encode: ffmpeg not found, sending WAV")
+        return None
+
+    spec = FORMATS[fmt]
+    out_path = f"{os.path.splitext(wav_path)[0]}.{spec['ext']}"
+    tmp = f"{out_path}.part"
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", wav_path,
+           "-ac", "1", "-b:a", bitrate or BITRATE or spec["bitrate"], *spec["args"], tmp]
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if proc.returncode != 0:
+        print(f"   Encode: ffmpeg failed ({proc.stderr.strip()[:200]}), sending WAV")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    os.replace(tmp, out_path)
+
+    stats = {"bytes_in": os.path.getsize(wav_path), "bytes": os.path.getsize(out_path), "seconds": seconds}
+    print(f"   Encoded {fmt} @ {bitrate or BITRATE or spec['bitrate']}: "
+          f"{stats['bytes_in'] / 1e6:.1f} MB -> {stats['bytes'] / 1e6:.1f} MB "
+          f"({stats['bytes_in'] / max(stats['bytes'], 1):.0f}x smaller) in {seconds:.1f}s")
+    return out_path, stats
+
+
+def prune_masters(audio_dir, keep_days=KEEP_WAV_DAYS):
+    """
+    Delete WAV masters (and their resynth manifests) older than keep_days
+    that already have an encoded copy. Returns bytes freed.
+    """
+    cutoff = time.time() - keep_days * 86400
+    freed = 0
+    for name in os.listdir(audio_dir):
+        if not name.endswith(".wav"):
+            continue
+        path = os.path.join(audio_dir, name)
+        stem = os.path.splitext(path)[0]
+        encoded = any(os.path.exists(f"{stem}.{f['ext']}") for f in FORMATS.values())
+        try:
+            if not encoded or os.path.getmtime(path) > cutoff:
+                continue
+            freed += os.path.getsize(path)
+            os.remove(path)
+            if os.path.exists(f"{stem}.spans.json"):
+                os.remove(f"{stem}.spans.json")
+        except FileNotFoundError:
+            continue
+    if freed:
+        print(f"   Pruned {freed / 1e6:.0f} MB of WAV masters older than {keep_days:g} days")
+    return freed
@@ -0,0 +1,212 @@
+"""
+DOC:START
+Persistent grapheme-to-phoneme cache for Kokoro.
+
+Purpose:
+- Kokoro's G2P (misaki + spaCy) phonemizes every sentence on every run;
+  host names, the listener's name, recurring thinkers and quotes come back
+  every morning
+- Caches the phoneme segments of each sentence, keyed by language code,
+  phonemizer version and the normalized sentence, so only new text
+  goes through G2P
+- One store for the 'a' (American) and 'b' (British) pipelines, the pool
+  workers and the TTS server; entries stay per language because the two
+  phonemize differently
+- Bounded: least-recently-used entries go once G2P_CACHE_MAX_ENTRIES is passed
+
+Inputs/Outputs:
+- Input: a KPipeline ('a'/'b') and text
+- Output: phoneme strings (<= 510 each) ready for KPipeline.generate_from_tokens
+
+Side effects:
+- Reads/writes output/cache/g2p.sqlite3 (G2P_CACHE_PATH)
+
+Run: python -m modules.g2p_cache (prints entries per language)
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from modules import segment
+from modules.audio_cache import normalize
+
+CACHE_PATH = os.environ.get(
+    "G2P_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", "output", "cache", "g2p.sqlite3")
+)
+MAX_ENTRIES = int(os.environ.get("G2P_CACHE_MAX_ENTRIES", "50000"))
+ENABLED = os.environ.get("G2P_CACHE", "1") != "0"
+
+# Kokoro's model takes at most 510 phonemes per forward pass
+MAX_PHONEMES = 510
+# Evict down to this fraction of the budget so we don't evict on every put
+_EVICT_TO = 0.9
+# Languages whose KPipeline goes through the English G2P (g2p + en_tokenize)
+LANGUAGES = "ab"
+
+
+def _phonemizer_version():
+    """Part of the key: a misaki upgrade can change the phonemes of the same text."""
+    try:
+        from importlib.metadata import version
+        return version("misaki")
+    except Exception:
+        return "unknown"
+
+
+class G2PCache:
+    """SQLite store of (lang, version, sentence) -> phoneme segments, with an in-process memo."""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.memo = {}
+        self.conn = None
+        self.version = None
+        self.count = None
+
+    def _db(self):
+        """Open connection (created on first use). Caller holds the lock."""
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS phonemes (
+                    lang TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    segments TEXT NOT NULL,
+                    used REAL NOT NULL,
+                    PRIMARY KEY (lang, version, text)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_phonemes_used ON phonemes(used)")
+            self.conn.commit()
+            self.version = _phonemizer_version()
+        return self.conn
+
+    def get(self, lang, text):
+        """Phoneme segments for a normalized sentence, or None."""
+        key = (lang, text)
+        with self.lock:
+            if key in self.memo:
+                return self.memo[key]
+            try:
+                db = self._db()
+                row = db.execute("SELECT segments FROM phonemes WHERE lang = ? AND version = ? AND text = ?",
+                                 (lang, self.version, text)).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE phonemes SET used = ? WHERE lang = ? AND version = ? AND text = ?",
+                           (time.time(), lang, self.version, text))
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"   G2P cache read failed: {e}")
+                return None
+            self._remember(key, json.loads(row[0]))
+            return self.memo[key]
+
+    def put(self, lang, text, segments):
+        """Store a sentence's phoneme segments, then evict if over budget."""
+        with self.lock:
+            self._remember((lang, text), segments)
+            try:
+                db = self._db()
+                db.execute("INSERT OR REPLACE INTO phonemes VALUES (?, ?, ?, ?, ?)",
+                           (lang, self.version, text, json.dumps(segments, ensure_ascii=False), time.time()))
+                if self.count is None:
+                    self.count = db.execute("SELECT COUNT(*) FROM phonemes").fetchone()[0]
+                else:
+                    self.count += 1
+                if self.count > self.max_entries:
+                    self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"   G2P cache write failed: {e}")
+
+    def _remember(self, key, segments):
+        """Keep segments in memory too; the memo never outgrows the store. Caller holds the lock."""
+        if len(self.memo) >= self.max_entries:
+            self.memo.clear()
+        self.memo[key] = segments
+
+    def _evict(self, db):
+        """Drop least-recently-used rows (any version) down to the eviction target. Caller holds the lock."""
+        keep = int(self.max_entries * _EVICT_TO)
+        db.execute("DELETE FROM phonemes WHERE rowid IN "
+                   "(SELECT rowid FROM phonemes ORDER BY used DESC LIMIT -1 OFFSET ?)", (keep,))
+        self.count = db.execute("SELECT COUNT(*) FROM phonemes").fetchone()[0]
+        print(f"   G2P cache: evicted down to {self.count} entries (max {self.max_entries})")
+
+
+CACHE = G2PCache()
+
+
+def _g2p(pipeline, sentence):
+    """Run the pipeline's own G2P: phoneme segments as KPipeline.__call__ would cut them."""
+    _, tokens = pipeline.g2p(sentence)
+    return [ps[:MAX_PHONEMES] for _, ps, _ in pipeline.en_tokenize(tokens) if ps]
+
+
+def sentence_phonemes(pipeline, sentence, cache=None):
+    """Phoneme segments for one sentence, from the cache or the phonemizer."""
+    cache = cache or CACHE
+    text = normalize(sentence)
+    if not ENABLED:
+        return _g2p(pipeline, text)
+    segments = cache.get(pipeline.lang_code, text)
+    if segments is None:
+        segments = _g2p(pipeline, text)
+        cache.put(pipeline.lang_code, text, segments)
+    return segments
+
+
+def phonemize(pipeline, text, pack=False, cache=None):
+    """
+    Phoneme segments for text, sentence by sentence through the cache.
+
+    pack=True joins a paragraph's sentences into segments of up to
+    MAX_PHONEMES (fewer, longer forward passes, like KPipeline's own loop);
+    otherwise there's one or more segments per sentence.
+    """
+    segments = []
+    for paragraph in segment.paragraphs(text):
+        current = ""
+        for sentence in segment.sentences(paragraph):
+            for ps in sentence_phonemes(pipeline, sentence, cache):
+                if not pack:
+                    segments.append(ps)
+                elif current and len(current) + 1 + len(ps) <= MAX_PHONEMES:
+                    current = f"{current} {ps}"
+                else:
+                    if current:
+                        segments.append(current)
+                    current = ps
+        if current:
+            segments.append(current)
+    return segments
+
+
+def supports(pipeline):
+    return pipeline.lang_code in LANGUAGES
+
+
+def print_stats(cache=None):
+    cache = cache or CACHE
+    if not os.path.exists(cache.path):
+        print(f"G2P cache: {cache.path} — empty")
+        return
+    with cache.lock:
+        db = cache._db()
+        rows = db.execute("SELECT lang, COUNT(*) FROM phonemes GROUP BY lang ORDER BY lang").fetchall()
+    per_lang = ", ".join(f"'{lang}' {count}" for lang, count in rows) or "no entries"
+    print(f"G2P cache: {cache.path} — {per_lang} (max {cache.max_entries})")
+
+
+if __name__ == "__main__":
+    print_stats()
@@ -0,0 +1,221 @@
+"""
+DOC:START
+Concurrent data-gathering stage for the daily show.
+
+Purpose:
+- Runs weather, news, personal context and anti-repetition lookups at the same time
+- Gives each source its own deadline and a degraded default when it misses
+- Reports stage wall time against the serial path (sum of per-source times)
+- For multi-listener runs, fetches each shared request once (news, same-location weather)
+
+Inputs/Outputs:
+- Input: optional per-source deadlines (seconds)
+- Output: dict with 'weather', 'news', 'context', 'recent' and 'timings'
+
+Side effects:
+- Network calls via modules.weather / modules.news / modules.context
+- Reads data/reflections.db via content.build_anti_repetition_context
+
+Run: python -m modules.gather
+See: modules/modules.md
+DOC:END
+"""
+
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from modules import weather, news, context, content
+
+# Seconds each source may take before we give up and use its default.
+# Context shells out to git in several repos and hits Google APIs, so it gets the most room.
+DEFAULT_DEADLINES = {
+    "weather": 10,
+    "news": 20,
+    "context": 30,
+    "recent": 10,
+}
+
+
+def _default_weather():
+    return {"summary": "Weather unavailable", "temp": "N/A", "condition": "N/A", "mood": "balanced"}
+
+
+def _default_news():
+    return {
+        "world": ["World news unavailable."],
+        "local": ["Local news unavailable."],
+        "ai": ["AI news unavailable."],
+        "combined_summary": "News unavailable.",
+    }
+
+
+def _default_context():
+    return {"formatted_prompt_section": "", "raw": {}}
+
+
+def _default_recent():
+    return {}
+
+
+SOURCES = {
+    "weather": (weather.get_weather, _default_weather),
+    "news": (news.get_all_news, _default_news),
+    "context": (context.gather_all_context, _default_context),
+    "recent": (content.build_anti_repetition_context, _default_recent),
+}
+
+
+def _timed(fn):
+    """Run fn and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _run_with_deadlines(tasks):
+    """
+    Run tasks concurrently, each against its own deadline from stage start.
+
+    tasks: dict of key -> (fn, default_fn, deadline_seconds)
+    Returns (results, timings): per-key result (default on failure/timeout)
+    and seconds (None on timeout).
+    """
+    results = {}
+    timings = {}
+    start = time.perf_counter()
+
+    pool = ThreadPoolExecutor(max_workers=max(1, len(tasks)), thread_name_prefix="gather")
+    futures = {key: pool.submit(_timed, fn) for key, (fn, _, _) in tasks.items()}
+
+    for key, future in futures.items():
+        _, fallback, limit = tasks[key]
+        # Deadlines are measured from stage start, not from when we get round to waiting
+        remaining = limit - (time.perf_counter() - start)
+        done, _ = wait([future], timeout=max(0, remaining))
+
+        if not done:
+            print(f"   {key}: missed {limit}s deadline, using default")
+            results[key] = fallback()
+            timings[key] = None
+            continue
+
+        try:
+            results[key], timings[key] = future.result()
+        except Exception as e:
+            print(f"   {key}: failed ({e}), using default")
+            results[key] = fallback()
+            timings[key] = time.perf_counter() - start
+
+    pool.shutdown(wait=False)
+    return results, timings
+
+
+def gather_inputs(deadlines=None, sources=None):
+    """
+    Fetch all show inputs concurrently.
+
+    Each source runs in its own thread. A source that raises or misses its
+    deadline is replaced with its degraded default; the straggler thread is
+    left to finish in the background (threads can't be killed), its result
+    is simply ignored.
+
+    sources: names to fetch (default: all). Skipped sources get their
+    default so the result always has the same keys.
+
+    Returns dict with keys: weather, news, context, recent, timings.
+    timings has per-source seconds (None on timeout), 'wall' and 'serial'.
+    """
+    limits = dict(DEFAULT_DEADLINES)
+    if deadlines:
+        limits.update(deadlines)
+
+    start = time.perf_counter()
+    tasks = {
+        name: (fn, default, limits[name])
+        for name, (fn, default) in SOURCES.items()
+        if sources is None or name in sources
+    }
+    results, timings = _run_with_deadlines(tasks)
+    for name, (_, default) in SOURCES.items():
+        if name not in tasks:
+            results[name] = default()
+
+    wall = time.perf_counter() - start
+    # The old serial path paid every source back to back; timed-out sources count their full deadline
+    serial = sum(t if t is not None else limits[n] for n, t in timings.items())
+    timings["wall"] = wall
+    timings["serial"] = serial
+
+    per_source = ", ".join(
+        f"{n} {t:.1f}s" if t is not None else f"{n} timeout"
+        for n, t in timings.items() if n in SOURCES
+    )
+    print(f"   Gathered inputs in {wall:.1f}s (serial would be ~{serial:.1f}s) [{per_source}]")
+
+    results["timings"] = timings
+    return results
+
+
+def gather_for_listeners(listeners, deadlines=None):
+    """
+    Fetch inputs for several listener profiles, sharing every request they have in common.
+
+    World + AI headlines and the anti-repetition context are fetched once;
+    weather once per distinct location, local news once per distinct city;
+    personal context only for listeners that list context sources.
+
+    Returns dict of listener id -> inputs shaped like gather_inputs()
+    (timings hold the shared stage's 'wall' plus per-request seconds).
+    """
+    limits = dict(DEFAULT_DEADLINES)
+    if deadlines:
+        limits.update(deadlines)
+
+    tasks = {
+        "news:world": (news.get_top_headlines, lambda: ["World news unavailable."], limits["news"]),
+        "news:ai": (news.get_ai_news, lambda: ["AI news unavailable."], limits["news"]),
+        "recent": (content.build_anti_repetition_context, _default_recent, limits["recent"]),
+    }
+    for listener in listeners:
+        lat, long, tz = listener["lat"], listener["long"], listener["timezone"]
+        tasks.setdefault(f"weather:{lat:.2f},{long:.2f}",
+                         (partial(weather.get_weather, lat, long, tz), _default_weather, limits["weather"]))
+        city, region = listener["news_location"], listener["news_region"]
+        tasks.setdefault(f"news:local:{city}",
+                         (partial(news.get_local_news, city, region),
+                          lambda city=city: [f"Local {city} news unavailable."], limits["news"]))
+        if listener["context"]:
+            tasks[f"context:{listener['id']}"] = (partial(context.gather_all_context, listener["context"]),
+                                                  _default_context, limits["context"])
+
+    start = time.perf_counter()
+    fetched, timings = _run_with_deadlines(tasks)
+    wall = time.perf_counter() - start
+    unshared = len(listeners) * (len(SOURCES) + 2)  # news is three requests per listener
+    print(f"   Gathered {len(tasks)} unique request(s) for {len(listeners)} listener(s) in {wall:.1f}s "
+          f"(~{unshared} without sharing)")
+
+    per_listener = {}
+    for listener in listeners:
+        lat, long = listener["lat"], listener["long"]
+        recent = dict(fetched["recent"])
+        per_listener[listener["id"]] = {
+            "weather": fetched[f"weather:{lat:.2f},{long:.2f}"],
+            "news": news.combine_news(fetched["news:world"], fetched[f"news:local:{listener['news_location']}"],
+                                      fetched["news:ai"]),
+            "context": fetched.get(f"context:{listener['id']}", _default_context()),
+            "recent": recent,
+            "timings": dict(timings, wall=wall),
+        }
+    return per_listener
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    data = gather_inputs()
+    print(data["weather"]["summary"])
+    print(data["news"]["combined_summary"])
+    print(data["context"]["formatted_prompt_section"] or "No context data available.")
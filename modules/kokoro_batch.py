@@ -0,0 +1,203 @@
+"""
+DOC:START
+Batched Kokoro inference: several sentences per forward pass.
+
+Purpose:
+- KPipeline renders one segment per forward pass (batch size 1), which leaves
+  CPU SIMD lanes and threads idle on short lines
+- Takes per-sentence phoneme segments (g2p_cache.phonemize), sorts them by
+  phoneme length, pads them into batches, runs one forward pass per batch and
+  returns the un-padded audio in the original order
+- Padding never reaches the audio: LSTMs get the real lengths (packed),
+  style normalization (AdaIN) takes its statistics over each sentence's own
+  frames, every convolution sees zeros past a sentence's end (as it would
+  alone), and the per-sample source/STFT stages run per sentence
+
+Inputs/Outputs:
+- Input: a KPipeline (with model), phoneme segments, voice, speed, batch size
+- Output: one float32 audio array per phoneme segment (24 kHz), in order
+
+Side effects:
+- None (reads the model's weights; follows kokoro 0.9's KModel.forward_with_tokens)
+
+Run: imported by tts_kokoro.py (KOKORO_BATCH_SIZE > 1); benchmark: python scripts/bench_kokoro_batch.py
+See: modules/modules.md
+DOC:END
+"""
+
+import torch
+import torch.nn.functional as F
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+# Output samples per predicted duration frame (24 kHz: x2 decoder, x60 upsampling, x5 iSTFT hop)
+SAMPLES_PER_FRAME = 600
+# Sentences sorted together; a wider window pads less but holds more audio before it's written
+WINDOW_BATCHES = 4
+
+
+def _mask(valid, length):
+    """[B, 1, length] float mask, 1 for each item's first valid[b] steps."""
+    return (torch.arange(length, device=valid.device)[None, :] < valid[:, None]).unsqueeze(1).float()
+
+
+def _packed(lstm, x, lengths, total):
+    """Run an LSTM over a padded batch [B, T, C] without the padding reaching the real steps."""
+    x = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+    x, _ = lstm(x)
+    x, _ = pad_packed_sequence(x, batch_first=True, total_length=total)
+    return x
+
+
+def _adain(layer, x, s, mask):
+    """AdaIN1d with instance-norm statistics over the masked steps only; padding comes out zero."""
+    count = mask.sum(-1, keepdim=True)
+    mean = (x * mask).sum(-1, keepdim=True) / count
+    var = (((x - mean) * mask) ** 2).sum(-1, keepdim=True) / count
+    x = (x - mean) / torch.sqrt(var + layer.norm.eps)
+    if layer.norm.affine:
+        x = x * layer.norm.weight[:, None] + layer.norm.bias[:, None]
+    h = layer.fc(s)
+    gamma, beta = torch.chunk(h.view(h.size(0), h.size(1), 1), chunks=2, dim=1)
+    return ((1 + gamma) * x + beta) * mask
+
+
+def _adain_blocks(blocks, x, s, valid):
+    """AdainResBlk1d stack (prosody predictor, decoder). Returns (x, valid) at the output resolution."""
+    for block in blocks:
+        mask = _mask(valid, x.shape[-1])
+        out = block.actv(_adain(block.norm1, x, s, mask))
+        if block.upsample_type != "none":
+            valid = valid * 2
+        out = block.pool(out)
+        out_mask = _mask(valid, out.shape[-1])
+        out = block.conv1(out * out_mask)
+        out = block.conv2(block.actv(_adain(block.norm2, out, s, out_mask)))
+        x = (out + block._shortcut(x)) * torch.rsqrt(torch.tensor(2.0))
+    return x, valid
+
+
+def _snake_blocks(block, x, s, mask):
+    """AdaINResBlock1 (generator) with masked AdaIN."""
+    for c1, c2, n1, n2, a1, a2 in zip(block.convs1, block.convs2, block.adain1, block.adain2,
+                                      block.alpha1, block.alpha2):
+        xt = _adain(n1, x, s, mask)
+        xt = c1(xt + (1 / a1) * (torch.sin(a1 * xt) ** 2))
+        xt = _adain(n2, xt, s, mask)
+        xt = c2(xt + (1 / a2) * (torch.sin(a2 * xt) ** 2))
+        x = xt + x
+    return x
+
+
+def _generator(gen, x, s, f0_curve, frames):
+    """iSTFTNet generator over a padded batch; x is at 2 x frame rate."""
+    # Harmonic source + STFT run over samples, so per sentence: they must see each one's real end
+    hars = []
+    for b in range(x.shape[0]):
+        f0 = gen.f0_upsamp(f0_curve[b:b + 1, None, :2 * int(frames[b])]).transpose(1, 2)
+        har_source, _, _ = gen.m_source(f0)
+        spec, phase = gen.stft.transform(har_source.transpose(1, 2).squeeze(1))
+        hars.append(torch.cat([spec, phase], dim=1))
+    har = torch.zeros((x.shape[0], hars[0].shape[1], max(h.shape[-1] for h in hars)), device=x.device)
+    for b, h in enumerate(hars):
+        har[b, :, :h.shape[-1]] = h
+
+    valid = frames * 2
+    for i, up in enumerate(gen.ups):
+        x = F.leaky_relu(x, negative_slope=0.1) * _mask(valid, x.shape[-1])
+        x = up(x)
+        valid = valid * up.stride[0]
+        if i == gen.num_upsamples - 1:
+            x = gen.reflection_pad(x)
+            valid = valid + 1
+        mask = _mask(valid, x.shape[-1])
+        x = x + _snake_blocks(gen.noise_res[i], gen.noise_convs[i](har), s, mask)
+        x = sum(_snake_blocks(gen.resblocks[i * gen.num_kernels + j], x, s, mask)
+                for j in range(gen.num_kernels)) / gen.num_kernels
+    x = gen.conv_post(F.leaky_relu(x) * mask)
+    spec = torch.exp(x[:, :gen.post_n_fft // 2 + 1, :])
+    phase = torch.sin(x[:, gen.post_n_fft // 2 + 1:, :])
+    return [gen.stft.inverse(spec[b:b + 1, :, :int(valid[b])], phase[b:b + 1, :, :int(valid[b])]).reshape(-1)
+            for b in range(x.shape[0])]
+
+
+@torch.no_grad()
+def forward(model, token_batch, ref_s, speed=1.0):
+    """
+    KModel.forward_with_tokens for a batch of token id lists (each with its 0 start/end ids).
+
+    ref_s: [B, 256] style vectors. Returns a list of 1-D float tensors, one per item.
+    """
+    device = model.device
+    lengths = torch.tensor([len(ids) for ids in token_batch], dtype=torch.long)
+    total = int(lengths.max())
+    input_ids = torch.zeros((len(token_batch), total), dtype=torch.long)
+    for b, ids in enumerate(token_batch):
+        input_ids[b, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+    input_ids, ref_s = input_ids.to(device), ref_s.to(device)
+    text_mask = (torch.arange(total)[None, :] + 1 > lengths[:, None]).to(device)
+
+    # Text side: ALBERT, duration encoder and text encoder already take masks / lengths
+    bert_dur = model.bert(input_ids, attention_mask=(~text_mask).int())
+    d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+    s = ref_s[:, 128:]
+    d = model.predictor.text_encoder(d_en, s, lengths, text_mask)
+    x = _packed(model.predictor.lstm, d, lengths, total)
+    duration = torch.sigmoid(model.predictor.duration_proj(x)).sum(axis=-1) / speed
+    pred_dur = torch.round(duration).clamp(min=1).long().masked_fill(text_mask, 0)
+
+    frames = pred_dur.sum(dim=1)
+    total_frames = int(frames.max())
+    alignment = torch.zeros((len(token_batch), total, total_frames), device=device)
+    for b in range(len(token_batch)):
+        indices = torch.repeat_interleave(torch.arange(total, device=device), pred_dur[b])
+        alignment[b, indices, torch.arange(len(indices), device=device)] = 1
+    en = d.transpose(-1, -2) @ alignment
+
+    # Prosody (F0 + energy) at 2 x frame rate
+    predictor = model.predictor
+    shared = _packed(predictor.shared, en.transpose(-1, -2), frames, total_frames).transpose(-1, -2)
+    f0, _ = _adain_blocks(predictor.F0, shared, s, frames)
+    n, valid = _adain_blocks(predictor.N, shared, s, frames)
+    curve_mask = _mask(valid, f0.shape[-1])
+    f0 = (predictor.F0_proj(f0) * curve_mask).squeeze(1)
+    n = (predictor.N_proj(n) * curve_mask).squeeze(1)
+
+    # Decoder
+    decoder = model.decoder
+    asr = model.text_encoder(input_ids, lengths, text_mask) @ alignment
+    f0_down = decoder.F0_conv(f0.unsqueeze(1))
+    n_down = decoder.N_conv(n.unsqueeze(1))
+    x, valid = _adain_blocks([decoder.encode], torch.cat([asr, f0_down, n_down], axis=1), ref_s[:, :128], frames)
+    asr_res = decoder.asr_res(asr)
+    residual = True
+    for block in decoder.decode:
+        if residual:
+            x = torch.cat([x, asr_res, f0_down, n_down], axis=1)
+        x, valid = _adain_blocks([block], x, ref_s[:, :128], valid)
+        if block.upsample_type != "none":
+            residual = False
+    return [audio.cpu() for audio in _generator(decoder.generator, x, ref_s[:, :128], f0, frames)]
+
+
+def render(pipeline, phoneme_segments, voice, speed=1.0, batch_size=8):
+    """
+    Yield audio (float32 numpy) for each phoneme segment, in order.
+
+    Segments are length-sorted within windows of WINDOW_BATCHES batches, so
+    padding stays small while audio still comes out as the script goes.
+    """
+    model = pipeline.model
+    pack = pipeline.load_voice(voice)
+    batch_size = max(1, batch_size)
+    window = batch_size * WINDOW_BATCHES
+    for start in range(0, len(phoneme_segments), window):
+        part = phoneme_segments[start:start + window]
+        tokens = [[0, *[i for i in (model.vocab.get(p) for p in ps) if i is not None], 0] for ps in part]
+        order = sorted(range(len(part)), key=lambda i: len(tokens[i]))
+        audio = [None] * len(part)
+        for b in range(0, len(order), batch_size):
+            members = order[b:b + batch_size]
+            ref_s = torch.cat([pack[len(part[i]) - 1] for i in members])
+            for i, wave in zip(members, forward(model, [tokens[i] for i in members], ref_s, speed)):
+                audio[i] = wave.numpy()
+        yield from audio
@@ -0,0 +1,272 @@
+"""
+DOC:START
+Kokoro on ONNX Runtime: a torch-free CPU inference engine.
+
+Purpose:
+- PyTorch takes seconds to import and has weak single-request latency on
+  CPU-only boxes; this runs the same Kokoro-82M graph with onnxruntime
+- export: traces KModel (kokoro's own ONNX wrapper, complex-free STFT) to
+  kokoro.onnx, optionally an int8 dynamically-quantized copy, and saves the
+  vocab and voice packs as plain files next to it
+- Inference needs only onnxruntime + numpy + misaki (G2P); phonemes go
+  through the same G2P cache and 510-phoneme chunking as the torch path, and
+  the voice packs are the same tensors, so voices sound the same (fp32
+  durations are bit-identical; int8 quantizes only the matmul/LSTM weights
+  and is approximate)
+- tts_kokoro uses it with KOKORO_ENGINE=onnx and falls back to torch when the
+  export or onnxruntime is missing
+
+Inputs/Outputs:
+- Input: phoneme segments (g2p_cache.phonemize), voice, speed
+- Output: float32 audio arrays (24 kHz)
+
+Side effects:
+- export writes output/models/kokoro-onnx/ (KOKORO_ONNX_DIR); needs torch,
+  kokoro and onnx, and downloads the weights and voices
+
+Run: python -m modules.kokoro_onnx export [--int8] [--voices bf_emma af_bella af_heart]
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import json
+import argparse
+import threading
+
+import numpy as np
+
+MODEL_DIR = os.environ.get(
+    "KOKORO_ONNX_DIR", os.path.join(os.path.dirname(__file__), "..", "output", "models", "kokoro-onnx")
+)
+# Use the int8-quantized graph (export --int8 first)
+INT8 = os.environ.get("KOKORO_ONNX_INT8", "0") == "1"
+# onnxruntime intra-op threads (0 = its default, one per core)
+THREADS = int(os.environ.get("KOKORO_ONNX_THREADS", "0") or 0)
+
+REPO_ID = "hexgrad/Kokoro-82M"
+MAX_PHONEMES = 510
+# Exported at this opset; onnxruntime >= 1.17 runs it
+OPSET = 17
+
+
+def model_path(int8=None):
+    return os.path.join(MODEL_DIR, "kokoro.int8.onnx" if (INT8 if int8 is None else int8) else "kokoro.onnx")
+
+
+# --- G2P front-end (same as KPipeline's for 'a'/'b', without importing torch) ---------
+
+class Frontend:
+    """misaki G2P + KPipeline's 510-phoneme chunking; what g2p_cache needs from a pipeline."""
+
+    def __init__(self, lang_code):
+        from misaki import en, espeak
+        self.lang_code = lang_code
+        try:
+            fallback = espeak.EspeakFallback(british=lang_code == "b")
+        except Exception as e:
+            print(f"espeak fallback unavailable ({e}); out-of-vocabulary words will be skipped")
+            fallback = None
+        self.g2p = en.G2P(trf=False, british=lang_code == "b", fallback=fallback, unk="")
+
+    @staticmethod
+    def _ps(tokens):
+        return "".join(t.phonemes + (" " if t.whitespace else "") for t in tokens).strip()
+
+    @staticmethod
+    def _text(tokens):
+        return "".join(t.text + t.whitespace for t in tokens).strip()
+
+    @classmethod
+    def _cut(cls, tokens, next_count):
+        """Where to cut an over-long run: the last sentence, then clause, then comma break that fits."""
+        for marks in ("!.?…", ":;", ",—"):
+            z = next((i for i in reversed(range(len(tokens))) if tokens[i].phonemes in set(marks)), None)
+            if z is None:
+                continue
+            z += 1
+            if z < len(tokens) and tokens[z].phonemes in (")", "”"):
+                z += 1
+            if next_count - len(cls._ps(tokens[:z])) <= MAX_PHONEMES:
+                return z
+        return len(tokens)
+
+    def en_tokenize(self, tokens):
+        """Yield (text, phonemes, tokens) chunks of at most MAX_PHONEMES, as KPipeline.en_tokenize does."""
+        chunk, count = [], 0
+        for t in tokens:
+            t.phonemes = t.phonemes or ""
+            next_ps = t.phonemes + (" " if t.whitespace else "")
+            next_count = count + len(next_ps.rstrip())
+            if next_count > MAX_PHONEMES:
+                z = self._cut(chunk, next_count)
+                yield self._text(chunk[:z]), self._ps(chunk[:z]), chunk[:z]
+                chunk = chunk[z:]
+                count = len(self._ps(chunk))
+                if not chunk:
+                    next_ps = next_ps.lstrip()
+            chunk.append(t)
+            count += len(next_ps)
+        if chunk:
+            yield self._text(chunk), self._ps(chunk), chunk
+
+
+# --- inference ----------------------------------------------------------------------
+
+class Engine:
+    """One onnxruntime session, the vocab, resident voice packs and a G2P front-end per language."""
+
+    def __init__(self, path=None):
+        import onnxruntime as ort
+        path = path or model_path()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if THREADS:
+            options.intra_op_num_threads = THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        with open(os.path.join(MODEL_DIR, "config.json"), "r", encoding="utf-8") as f:
+            self.vocab = json.load(f)["vocab"]
+        self.voices = {}
+        self.frontends = {}
+        self.missing = set()  # voices already reported as not exported
+        self.lock = threading.Lock()
+
+    def frontend(self, lang_code):
+        with self.lock:
+            if lang_code not in self.frontends:
+                self.frontends[lang_code] = Frontend(lang_code)
+            return self.frontends[lang_code]
+
+    def _voice_path(self, name):
+        return os.path.join(MODEL_DIR, "voices", f"{name}.npy")
+
+    def has_voice(self, voice):
+        """Whether every pack of voice ('a,b' blends) was exported; says so once per voice when not."""
+        if voice in self.voices or all(os.path.exists(self._voice_path(name)) for name in voice.split(",")):
+            return True
+        with self.lock:
+            if voice not in self.missing:
+                self.missing.add(voice)
+                print(f"Kokoro voice {voice} wasn't exported for ONNX; rendering it with torch "
+                      f"(python -m modules.kokoro_onnx export --voices {voice.replace(',', ' ')})")
+        return False
+
+    def load_voice(self, voice):
+        """[510, 1, 256] style pack; 'a,b' averages packs like KPipeline.load_voice."""
+        with self.lock:
+            if voice not in self.voices:
+                packs = []
+                for name in voice.split(","):
+                    path = self._voice_path(name)
+                    if not os.path.exists(path):
+                        raise FileNotFoundError(f"voice {name} wasn't exported (python -m modules.kokoro_onnx "
+                                                f"export --voices {name})")
+                    packs.append(np.load(path))
+                self.voices[voice] = np.mean(packs, axis=0) if len(packs) > 1 else packs[0]
+            return self.voices[voice]
+
+    def infer(self, ps, voice, speed=1.0):
+        """Audio for one phoneme segment (<= 510)."""
+        ids = [0, *[i for i in (self.vocab.get(p) for p in ps[:MAX_PHONEMES]) if i is not None], 0]
+        style = self.load_voice(voice)[len(ps[:MAX_PHONEMES]) - 1].astype(np.float32)
+        audio, _ = self.session.run(None, {
+            "input_ids": np.array([ids], dtype=np.int64),
+            "style": style.reshape(1, -1),
+            "speed": np.array([speed], dtype=np.float32),
+        })
+        return audio.reshape(-1)
+
+    def render(self, phoneme_segments, voice, speed=1.0):
+        for ps in phoneme_segments:
+            yield self.infer(ps, voice, speed)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+_failed = False
+
+
+def available():
+    """Whether the exported model and onnxruntime are there."""
+    if not os.path.exists(model_path()):
+        return False
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get():
+    """The shared Engine, or None (after one message) if it can't load — the caller falls back to torch."""
+    global _engine, _failed
+    with _engine_lock:
+        if _engine is None and not _failed:
+            if not available():
+                print(f"Kokoro ONNX model not found at {model_path()} (or onnxruntime missing); using torch. "
+                      f"Export it with: python -m modules.kokoro_onnx export{' --int8' if INT8 else ''}")
+                _failed = True
+                return None
+            try:
+                print(f"Loading Kokoro ONNX engine ({os.path.basename(model_path())})...")
+                _engine = Engine()
+            except Exception as e:
+                print(f"Kokoro ONNX engine failed to load ({e}); using torch")
+                _failed = True
+        return _engine
+
+
+# --- export -------------------------------------------------------------------------
+
+def export(voices, int8=False):
+    """Trace Kokoro-82M to MODEL_DIR (fp32, plus int8 with --int8), with vocab and voice packs."""
+    import torch
+    from huggingface_hub import hf_hub_download
+    from kokoro.model import KModel, KModelForONNX
+
+    os.makedirs(os.path.join(MODEL_DIR, "voices"), exist_ok=True)
+    config_path = hf_hub_download(repo_id=REPO_ID, filename="config.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(os.path.join(MODEL_DIR, "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"vocab": config["vocab"]}, f, ensure_ascii=False)
+
+    # disable_complex: kokoro's conv-based STFT, which exports (torch.stft's complex ops don't)
+    model = KModel(repo_id=REPO_ID, disable_complex=True).eval()
+    input_ids = torch.zeros((1, 64), dtype=torch.long)
+    input_ids[0, 1:-1] = torch.randint(1, len(config["vocab"]), (62,))
+    fp32 = model_path(int8=False)
+    print(f"Exporting {fp32}...")
+    torch.onnx.export(
+        KModelForONNX(model).eval(), (input_ids, torch.randn(1, 256), torch.tensor([1.0])), fp32,
+        input_names=["input_ids", "style", "speed"], output_names=["waveform", "duration"],
+        dynamic_axes={"input_ids": {1: "tokens"}, "waveform": {0: "samples"}, "duration": {0: "tokens"}},
+        opset_version=OPSET, do_constant_folding=True, dynamo=False,
+    )
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"Quantizing {model_path(int8=True)}...")
+        # Only the matmul/LSTM weights: onnxruntime's int8 convolutions (ConvInteger) are slower than fp32 on CPU
+        quantize_dynamic(fp32, model_path(int8=True), weight_type=QuantType.QInt8,
+                         op_types_to_quantize=["MatMul", "Gemm", "LSTM"])
+
+    for voice in voices:
+        pack = torch.load(hf_hub_download(repo_id=REPO_ID, filename=f"voices/{voice}.pt"), weights_only=True)
+        np.save(os.path.join(MODEL_DIR, "voices", f"{voice}.npy"), pack.numpy().astype(np.float32))
+    print(f"Exported to {os.path.abspath(MODEL_DIR)} ({', '.join(voices)})")
+
+
+def main():
+    from modules import tts_kokoro
+
+    parser = argparse.ArgumentParser(description="Export Kokoro-82M for the ONNX Runtime engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("export", help="Trace the model, save vocab and voice packs")
+    cmd.add_argument("--int8", action="store_true", help="Also write a dynamically int8-quantized model")
+    cmd.add_argument("--voices", nargs="+", default=tts_kokoro.VOICES, help="Voice packs to export")
+    args = parser.parse_args()
+    export(args.voices, int8=args.int8)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+DOC:START
+Kokoro process pool: renders pieces of a show in parallel worker processes.
+
+Purpose:
+- One torch process stops scaling past a few intra-op threads, so on a
+  many-core box most cores sit idle during a Kokoro render
+- KOKORO_PROCESSES worker processes each load their own KPipeline with
+  torch threads set to their share of the cores (KOKORO_PROCESS_THREADS)
+- tts_kokoro sends renders here when the pool is enabled: the scheduler runs
+  one chunk lane per process, text_to_speech maps paragraphs over the pool;
+  results come back in script order
+- The process count is capped by available memory (each holds a model copy)
+
+Inputs/Outputs:
+- Input: text pieces, voice, speed
+- Output: (audio, sample_rate) per piece, or None for a failed piece
+
+Side effects:
+- Spawns worker processes on first use (each loads the model, ~1 GB RSS)
+
+Run: imported by tts_kokoro.py and scheduler.py
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import sys
+import atexit
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes (unset/0/1 = render in-process)
+PROCESSES = int(os.environ.get("KOKORO_PROCESSES", "0") or 0)
+# torch threads per worker (unset = the cores split evenly between workers)
+THREADS = int(os.environ.get("KOKORO_PROCESS_THREADS", "0") or 0)
+
+# Resident memory of one worker with a loaded Kokoro-82M pipeline (torch + model + G2P)
+MB_PER_PROCESS = 1024
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _available_mb():
+    """MemAvailable from /proc/meminfo (None where there isn't one)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+@functools.cache
+def processes():
+    """Workers the pool runs (1 = disabled): KOKORO_PROCESSES, capped by cores and free memory."""
+    if PROCESSES <= 1:
+        return 1
+    count = min(PROCESSES, os.cpu_count() or 1)
+    available = _available_mb()
+    if available is not None:
+        count = min(count, max(1, available // MB_PER_PROCESS))
+    return count
+
+
+def enabled():
+    return processes() > 1
+
+
+def _init_worker(threads):
+    """Worker start-up: its share of the cores, the model and voices loaded."""
+    from modules import kokoro_onnx, tts_kokoro
+    kokoro_onnx.THREADS = kokoro_onnx.THREADS or threads
+    onnx = tts_kokoro._onnx_engine() is not None
+    if not onnx:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    tts_kokoro.preload()
+    if onnx and "torch" in sys.modules:
+        # A voice the ONNX export doesn't have loaded the torch pipeline as well
+        import torch
+        torch.set_num_threads(threads)
+
+
+def _render(text, voice, speed):
+    # In-process only: a worker going through the TTS server (or the pool) would defeat the point
+    from modules import tts_kokoro
+    return tts_kokoro._render_local(text, voice, speed)
+
+
+def get():
+    """The shared pool, started on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            count = processes()
+            threads = THREADS or max(1, (os.cpu_count() or 1) // count)
+            print(f"Starting Kokoro process pool: {count} workers x {threads} torch threads")
+            # spawn, not fork: a forked torch (OpenMP pools, a loaded model) isn't safe to reuse
+            _pool = ProcessPoolExecutor(max_workers=count, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(threads,))
+        return _pool
+
+
+def _failed(e):
+    print(f"Kokoro pool render failed: {e}")
+    if isinstance(e, BrokenProcessPool):
+        # A worker died (out of memory?); the next render starts a fresh pool
+        shutdown()
+
+
+def render(text, voice="bf_emma", speed=1.0):
+    """Render one piece in a worker process. Returns (audio, sample_rate) or None."""
+    try:
+        return get().submit(_render, text, voice, speed).result()
+    except Exception as e:
+        _failed(e)
+        return None
+
+
+def render_many(pieces, voice="bf_emma", speed=1.0):
+    """Yield (audio, sample_rate) or None for each piece, in order, rendered across all workers."""
+    pool = get()
+    futures = [pool.submit(_render, piece, voice, speed) for piece in pieces]
+    try:
+        for future in futures:
+            try:
+                yield future.result()
+            except Exception as e:
+                _failed(e)
+                yield None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def warm(voice="bf_emma"):
+    """Start every worker now (each loads its pipeline) instead of on the first show."""
+    for _ in render_many(["Good morning."] * processes(), voice):
+        pass
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,102 @@
+"""
+DOC:START
+Listener profiles for multi-listener runs: one fetch, many personalized shows.
+
+Purpose:
+- Loads listener profiles from data/listeners.json (location, hosts, context
+  sources, delivery target), filling defaults for missing fields
+- Falls back to the single built-in listener (Chris, Chamblee) when no file exists
+- Builds the system-prompt section that retargets a show at another listener
+
+Inputs/Outputs:
+- Input: data/listeners.json — {"listeners": [{"id": "...", "name": "...", ...}]}
+- Output: list of profile dicts
+
+Side effects:
+- None (read-only)
+
+Run: imported by main.py (--listeners)
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import json
+import datetime
+
+from modules.context import CONTEXT_SOURCES
+
+LISTENERS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "listeners.json")
+
+# The original single-listener setup. Every field a profile can set is listed here.
+DEFAULT_LISTENER = {
+    "id": "chris",
+    "name": "Chris",
+    "about": "",
+    "primary": True,              # logs to history, uses the weekly plan and the host LRU rotation
+    "lat": 33.89,
+    "long": -84.29,
+    "timezone": "America/New_York",
+    "news_location": "Atlanta",
+    "news_region": "Georgia",
+    "hosts": [],                  # empty = the standard host rotation
+    "context": list(CONTEXT_SOURCES),
+    "telegram_chat_id": None,     # None = TELEGRAM_USER_ID
+}
+
+
+def _with_defaults(profile):
+    listener = dict(DEFAULT_LISTENER)
+    if not profile.get("primary"):
+        # Secondary listeners never inherit Chris's repos, calendar, inbox or plan
+        listener.update({"primary": False, "context": [], "about": ""})
+    listener.update(profile)
+    listener["id"] = str(listener["id"]).lower()
+    return listener
+
+
+def load_listeners(ids=None, path=LISTENERS_PATH):
+    """
+    Return listener profiles, optionally filtered to the given ids.
+
+    Without data/listeners.json this is just [DEFAULT_LISTENER].
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = json.load(f).get("listeners", [])
+    except FileNotFoundError:
+        profiles = [DEFAULT_LISTENER]
+
+    listeners = [_with_defaults(p) for p in profiles]
+    if ids:
+        wanted = {i.lower() for i in ids}
+        missing = wanted - {l["id"] for l in listeners}
+        if missing:
+            print(f"WARNING: unknown listener(s): {', '.join(sorted(missing))}")
+        listeners = [l for l in listeners if l["id"] in wanted]
+    return listeners
+
+
+def pick_host(listener, show_date):
+    """Rotate through the listener's own hosts by date, or None to use the standard rotation."""
+    hosts = listener.get("hosts") or []
+    if not hosts:
+        return None
+    return hosts[datetime.date.fromisoformat(show_date).toordinal() % len(hosts)]
+
+
+def prompt_section(listener):
+    """System-prompt section retargeting the show at a non-primary listener ('' for the primary)."""
+    if listener.get("primary"):
+        return ""
+    name = listener["name"]
+    lines = [
+        "",
+        "TODAY'S LISTENER (overrides anything above about who is listening):",
+        f"- This show is for {name}, not Chris. Wherever the guide or instructions say \"Chris\", say \"{name}\".",
+        f"- Local area: {listener['news_location']}. Use the weather and local news provided for {name}.",
+    ]
+    if listener.get("about"):
+        lines.append(f"- About {name}: {listener['about']}")
+    lines.append("- Don't reference Chris's life, history or relationships with you.")
+    return "\n".join(lines)
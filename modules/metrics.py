@@ -0,0 +1,170 @@
+"""
+DOC:START
+Per-stage run instrumentation, stored in the metrics table of data/reflections.db.
+
+Purpose:
+- Times each run_show stage (weather, news, context, llm, canon, tts_chunk, notify, ...)
+- Records token counts, character counts, audio seconds, real-time factor and bytes
+- Reports p50/p95 latency per stage and per backend (`main.py --stats`)
+
+Inputs/Outputs:
+- Input: run id + stage name + measured fields
+- Output: rows in the metrics table; printed percentile report
+
+Side effects:
+- Writes to data/reflections.db (one row per measurement, written immediately
+  so a crashed run still leaves its timings behind)
+
+Run: python main.py --stats [--stats-days N]
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import math
+import time
+import datetime
+from contextlib import contextmanager
+
+import soundfile as sf
+
+from modules.db import save_metric, get_metrics
+
+# List prices (USD) for cost estimates; local backends (kokoro, voicebox, mlx) are free to run
+PRICES = {
+    "llm_input_per_mtok": 1.25,
+    "llm_output_per_mtok": 10.00,
+    "elevenlabs_per_kchar": 0.30,
+}
+
+
+def new_run_id(show_date):
+    """Unique id for one run_show invocation."""
+    return f"{show_date}_{datetime.datetime.now().strftime('%H%M%S%f')}"
+
+
+def record(run_id, show_date, stage, seconds, **fields):
+    """Write one measurement. Never lets a metrics failure break a show."""
+    if not run_id:
+        return
+    try:
+        save_metric(run_id, show_date, stage, seconds=seconds, **fields)
+    except Exception as e:
+        print(f"   Warning: failed to record {stage} metric: {e}")
+
+
+@contextmanager
+def stage(run_id, show_date, name, **fields):
+    """
+    Time a block and record it as a stage.
+
+    Yields a dict the block can fill with extra fields (tokens_in, chars, ...).
+    An exception inside the block is recorded with ok=0 and re-raised.
+    """
+    measured = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield measured
+    except BaseException:
+        measured["ok"] = 0
+        raise
+    finally:
+        record(run_id, show_date, name, time.perf_counter() - start, **measured)
+
+
+def audio_fields(result, seconds):
+    """
+    audio_seconds / rtf / bytes for a rendered piece (mp3 bytes or (audio, sample_rate)).
+
+    rtf here is render seconds per audio second (below 1.0 = faster than real time).
+    """
+    if isinstance(result, bytes):
+        return {"bytes": len(result)}
+    audio, sample_rate = result
+    audio_seconds = len(audio) / sample_rate
+    return {"audio_seconds": audio_seconds, "rtf": seconds / audio_seconds if audio_seconds else None}
+
+
+def file_audio_fields(path, seconds):
+    """Same as audio_fields, for a finished file on disk."""
+    fields = {"bytes": os.path.getsize(path)}
+    try:
+        info = sf.info(path)
+        fields["audio_seconds"] = info.duration
+        fields["rtf"] = seconds / info.duration if info.duration else None
+    except Exception:
+        pass  # mp3 without libsndfile mp3 support — size only
+    return fields
+
+
+def chunk_recorder(run_id, show_date, backend):
+    """on_chunk callback for checkpoint.render_chunks / stream.stream_show that records tts_chunk rows."""
+    def on_chunk(index, text, result, seconds):
+        record(run_id, show_date, "tts_chunk", seconds, backend=backend,
+               chars=len(text), **audio_fields(result, seconds))
+    return on_chunk
+
+
+def estimate_cost(tokens_in=0, tokens_out=0, tts_backend=None, chars=0):
+    """Estimated USD for one show: LLM tokens plus paid TTS characters."""
+    cost = (tokens_in or 0) / 1e6 * PRICES["llm_input_per_mtok"]
+    cost += (tokens_out or 0) / 1e6 * PRICES["llm_output_per_mtok"]
+    if tts_backend == "elevenlabs":
+        cost += (chars or 0) / 1000 * PRICES["elevenlabs_per_kchar"]
+    return cost
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(days=30):
+    """
+    Aggregate the last N days of metrics.
+
+    Returns list of dicts with stage, backend, n, p50, p95, mean rtf and mean
+    size reduction (encode), sorted by stage then backend.
+    """
+    groups = {}
+    for row in get_metrics(days):
+        if row["seconds"] is None or not row["ok"]:
+            continue
+        groups.setdefault((row["stage"], row["backend"] or "-"), []).append(row)
+
+    summary = []
+    for (stage_name, backend), rows in sorted(groups.items()):
+        seconds = [r["seconds"] for r in rows]
+        rtfs = [r["rtf"] for r in rows if r["rtf"] is not None]
+        shrinks = [r["bytes_in"] / r["bytes"] for r in rows if r.get("bytes_in") and r["bytes"]]
+        summary.append({
+            "stage": stage_name,
+            "backend": backend,
+            "n": len(rows),
+            "p50": _percentile(seconds, 50),
+            "p95": _percentile(seconds, 95),
+            "rtf": sum(rtfs) / len(rtfs) if rtfs else None,
+            "tokens_out": sum(r["tokens_out"] or 0 for r in rows) / len(rows),
+            "shrink": sum(shrinks) / len(shrinks) if shrinks else None,
+        })
+    return summary
+
+
+def print_stats(days=30):
+    """Print the p50/p95 report for `main.py --stats`."""
+    summary = summarize(days)
+    if not summary:
+        print(f"No metrics recorded in the last {days} days.")
+        return
+
+    print(f"Stage latency, last {days} days")
+    print(f"{'stage':<14} {'backend':<12} {'n':>5} {'p50 s':>8} {'p95 s':>8} {'rtf':>6} {'tok out':>8} {'shrink':>7}")
+    for s in summary:
+        rtf = f"{s['rtf']:.2f}" if s["rtf"] is not None else "-"
+        tokens = f"{s['tokens_out']:.0f}" if s["tokens_out"] else "-"
+        shrink = f"{s['shrink']:.1f}x" if s["shrink"] else "-"
+        print(f"{s['stage']:<14} {s['backend']:<12} {s['n']:>5} {s['p50']:>8.2f} {s['p95']:>8.2f} {rtf:>6} {tokens:>8} "
+              f"{shrink:>7}")
+
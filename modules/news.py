@@ -7,6 +7,24 @@ Sources:
 
 Output: get_all_news() returns structured dict with world, local, ai categories
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import requests
 import os
@@ -60,10 +78,10 @@ def _get_google_news_world():
         return ["World news unavailable."]
 
 
-def get_local_news(location="Atlanta"):
+def get_local_news(location="Atlanta", region="Georgia"):
     """Fetches local news headlines from Google News RSS."""
     try:
-        query = quote(f"{location} Georgia")
+        query = quote(f"{location} {region}".strip())
         url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
         feed = feedparser.parse(url)
 
@@ -97,17 +115,8 @@ def get_ai_news():
         return ["AI news unavailable."]
 
 
-def get_all_news():
-    """
-    Fetches all news categories and returns structured dict.
-
-    Returns:
-        dict with keys: world, local, ai, combined_summary
-    """
-    world = get_top_headlines()
-    local = get_local_news()
-    ai = get_ai_news()
-
+def combine_news(world, local, ai):
+    """Build the structured news dict (with the LLM prompt summary) from headline lists."""
     # Build combined summary for the LLM prompt
     all_headlines = world + local + ai
     combined = "; ".join(all_headlines)
@@ -120,6 +129,19 @@ def get_all_news():
     }
 
 
+def get_all_news(location="Atlanta", region="Georgia"):
+    """
+    Fetches all news categories and returns structured dict.
+
+    Returns:
+        dict with keys: world, local, ai, combined_summary
+    """
+    world = get_top_headlines()
+    local = get_local_news(location, region)
+    ai = get_ai_news()
+    return combine_news(world, local, ai)
+
+
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
@@ -2,18 +2,38 @@
 Send delivery notifications for completed daily reflections.
 Supports Telegram (audio + summary message).
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import os
 import requests
 
+from modules.encode import mime_type
+
 
 TELEGRAM_API = "https://api.telegram.org/bot{token}"
 
 
-def send_telegram(audio_path: str, summary: str = None):
-    """Send the audio file + optional summary to Chris via Telegram."""
+def send_telegram(audio_path: str, summary: str = None, chat_id: str = None):
+    """Send the audio file + optional summary via Telegram (to Chris unless chat_id is given)."""
     token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_USER_ID")
+    chat_id = chat_id or os.getenv("TELEGRAM_USER_ID")
 
     if not token or not chat_id:
         print("   Telegram: TELEGRAM_BOT_TOKEN or TELEGRAM_USER_ID not set, skipping.")
@@ -30,12 +50,17 @@ def send_telegram(audio_path: str, summary: str = None):
                 timeout=10,
             )
 
-        # Send audio file
+        # Send audio file. sendAudio takes MP3/M4A; an Opus (.ogg) show goes as a voice message.
+        mime = mime_type(audio_path)
+        method, field = ("sendVoice", "voice") if mime == "audio/ogg" else ("sendAudio", "audio")
+        data = {"chat_id": chat_id}
+        if method == "sendAudio":
+            data.update({"title": "Daily Reflection", "performer": "JEJ"})
         with open(audio_path, "rb") as f:
             resp = requests.post(
-                f"{base_url}/sendAudio",
-                data={"chat_id": chat_id, "title": "Daily Reflection", "performer": "JEJ"},
-                files={"audio": (os.path.basename(audio_path), f, "audio/mpeg")},
+                f"{base_url}/{method}",
+                data=data,
+                files={field: (os.path.basename(audio_path), f, mime)},
                 timeout=120,
             )
 
@@ -6,6 +6,24 @@ content outlines for upcoming shows. Stores plans in SQLite.
 
 Run: python modules/planner.py [--date YYYY-MM-DD] [--days N]
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import os
 import json
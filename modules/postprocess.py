@@ -0,0 +1,487 @@
+"""
+DOC:START
+Audio post-processing after synthesis: level, joins and pauses.
+
+Purpose:
+- Joins chunk audio with short equal-power crossfades instead of hard cuts
+- Normalizes each chunk's integrated loudness (ITU-R BS.1770 K-weighted, gated)
+  to a target LUFS, so every backend and chunk lands at the same level, with a
+  peak ceiling
+- Caps overlong silences (TTS pauses, chunk tails) at MAX_SILENCE_S
+- Vectorized NumPy over the whole show: far faster than real time
+  (scripts/bench_postprocess.py)
+- process_file() streams a finished WAV in blocks (measure, then apply gain and
+  cap silences), and process_files() joins chunk files one chunk at a time, so
+  a whole show never has to fit in memory
+
+Inputs/Outputs:
+- Input: list of audio arrays (chunks) + sample rate, chunk file paths, or a file path
+- Output: processed array and a map from pre-processing sample positions to
+  output positions (keeps resynth manifests aligned)
+
+Side effects:
+- process_file() rewrites the file in place; process_files() writes the joined show
+
+Run: imported by checkpoint.py / main.py; benchmark: python scripts/bench_postprocess.py
+See: modules/modules.md
+DOC:END
+"""
+
+import io
+import os
+
+import numpy as np
+import soundfile as sf
+
+from modules.audio_writer import AudioWriter
+
+ENABLED = os.environ.get("POSTPROCESS", "1") != "0"
+TARGET_LUFS = float(os.environ.get("TARGET_LUFS", "-16"))  # spoken-word podcast level
+PEAK_CEILING_DB = -1.0
+CROSSFADE_MS = 20
+MAX_SILENCE_S = float(os.environ.get("MAX_SILENCE_SECONDS", "1.2"))
+SILENCE_DB = -50.0      # frames quieter than this (dBFS, after normalization) count as silence
+SILENCE_FRAME_MS = 10
+# process_file() reads and writes this much audio at a time
+FILE_BLOCK_S = 10
+
+
+def _biquad_shelf(sample_rate, gain_db=4.0, q=1 / np.sqrt(2), fc=1500.0):
+    """BS.1770 stage 1 (head/high-shelf) coefficients for any sample rate."""
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * fc / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    b = [a * ((a + 1) + (a - 1) * cos_w0 + 2 * np.sqrt(a) * alpha),
+         -2 * a * ((a - 1) + (a + 1) * cos_w0),
+         a * ((a + 1) + (a - 1) * cos_w0 - 2 * np.sqrt(a) * alpha)]
+    den = [(a + 1) - (a - 1) * cos_w0 + 2 * np.sqrt(a) * alpha,
+           2 * ((a - 1) - (a + 1) * cos_w0),
+           (a + 1) - (a - 1) * cos_w0 - 2 * np.sqrt(a) * alpha]
+    return b, den
+
+
+def _biquad_highpass(sample_rate, q=0.5, fc=38.0):
+    """BS.1770 stage 2 (RLB high-pass) coefficients."""
+    w0 = 2 * np.pi * fc / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return b, den
+
+
+def integrated_loudness(audio, sample_rate):
+    """
+    Gated integrated loudness in LUFS (BS.1770-4), or None if under one 400 ms block
+    or entirely below the absolute gate.
+    """
+    # scipy is only needed once a show is actually post-processed
+    from scipy.signal import lfilter
+
+    block = int(0.4 * sample_rate)
+    step = int(0.1 * sample_rate)
+    if len(audio) < block:
+        return None
+
+    x = audio.astype(np.float64)
+    for b, a in (_biquad_shelf(sample_rate), _biquad_highpass(sample_rate)):
+        x = lfilter(b, a, x, axis=0)
+
+    power = x ** 2 if x.ndim == 1 else (x ** 2).sum(axis=1)  # L/R/C channel weights are all 1
+    cumulative = np.concatenate([[0.0], np.cumsum(power)])
+    starts = np.arange(0, len(power) - block + 1, step)
+    energy = (cumulative[starts + block] - cumulative[starts]) / block
+    return _gated_loudness(energy)
+
+
+def _gated_loudness(energy):
+    """Integrated loudness from the 400 ms block energies (absolute then relative gate), or None."""
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(energy)
+    gated = energy[loudness > -70.0]
+    if not len(gated):
+        return None
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    gated = energy[(loudness > -70.0) & (loudness > relative_gate)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def join(pieces, sample_rate, crossfade_ms=CROSSFADE_MS):
+    """
+    Concatenate pieces with an equal-power crossfade at each boundary.
+
+    Returns (audio, overlaps) — overlaps[i] is the number of samples piece i+1
+    was pulled back onto piece i (shorter than crossfade_ms for very short pieces).
+    """
+    pieces = [np.asarray(p, dtype=np.float32) for p in pieces]
+    fade = int(sample_rate * crossfade_ms / 1000)
+    overlaps = [min(fade, len(a) // 2, len(b) // 2) for a, b in zip(pieces, pieces[1:])]
+
+    out = np.zeros((sum(len(p) for p in pieces) - sum(overlaps),) + pieces[0].shape[1:], dtype=np.float32)
+    position = 0
+    for i, piece in enumerate(pieces):
+        piece = piece.copy()
+        head = overlaps[i - 1] if i > 0 else 0
+        tail = overlaps[i] if i < len(overlaps) else 0
+        if head:
+            ramp = np.sin(np.linspace(0.0, np.pi / 2, head, dtype=np.float32))
+            piece[:head] *= ramp if piece.ndim == 1 else ramp[:, None]
+        if tail:
+            ramp = np.cos(np.linspace(0.0, np.pi / 2, tail, dtype=np.float32))
+            piece[-tail:] *= ramp if piece.ndim == 1 else ramp[:, None]
+        start = position - head
+        out[start:start + len(piece)] += piece
+        position = start + len(piece)
+    return out, overlaps
+
+
+def cap_silences(audio, sample_rate, max_silence_s=MAX_SILENCE_S, threshold_db=SILENCE_DB):
+    """
+    Shorten every silent run longer than max_silence_s to max_silence_s
+    (trimming its middle, so the speech on both sides keeps its natural tail/attack).
+
+    Returns (audio, keep) — keep is the per-sample boolean mask that was applied.
+    """
+    frame = max(1, int(sample_rate * SILENCE_FRAME_MS / 1000))
+    frames = len(audio) // frame
+    keep = np.ones(len(audio), dtype=bool)
+    if not frames:
+        return audio, keep
+
+    mono = audio if audio.ndim == 1 else audio.mean(axis=1)
+    rms = np.sqrt(np.mean(mono[:frames * frame].reshape(frames, frame).astype(np.float64) ** 2, axis=1))
+    with np.errstate(divide="ignore"):
+        silent = 20 * np.log10(rms) < threshold_db
+
+    edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    max_frames = int(max_silence_s * 1000 / SILENCE_FRAME_MS)
+    long_runs = (run_ends - run_starts) > max_frames
+    if not long_runs.any():
+        return audio, keep
+
+    # +1 at each cut start, -1 at each cut end, cumsum marks the frames to drop
+    cut_starts = run_starts[long_runs] + max_frames // 2
+    cut_ends = run_ends[long_runs] - (max_frames - max_frames // 2)
+    marks = np.zeros(frames + 1, dtype=np.int32)
+    np.add.at(marks, cut_starts, 1)
+    np.add.at(marks, cut_ends, -1)
+    drop = np.cumsum(marks[:-1]) > 0
+    keep[:frames * frame] = ~np.repeat(drop, frame)
+    return audio[keep], keep
+
+
+def normalize(audio, sample_rate, target_lufs=TARGET_LUFS):
+    """Scale to target_lufs, capped so the peak stays under PEAK_CEILING_DB. Returns (audio, gain_db)."""
+    loudness = integrated_loudness(audio, sample_rate)
+    if loudness is None:
+        return audio, 0.0
+    gain_db = target_lufs - loudness
+    peak = float(np.max(np.abs(audio))) if len(audio) else 0.0
+    if peak > 0:
+        gain_db = min(gain_db, PEAK_CEILING_DB - 20 * np.log10(peak))
+    return audio * np.float32(10 ** (gain_db / 20)), float(gain_db)
+
+
+def process(pieces, sample_rate, crossfade_ms=CROSSFADE_MS, target_lufs=TARGET_LUFS,
+            max_silence_s=MAX_SILENCE_S):
+    """
+    Normalize each piece's loudness, crossfade-join them, cap silences.
+
+    Pieces are normalized separately so a quiet chunk (or backend) comes up
+    to the same level as its neighbours. Returns (audio, remap) — remap(positions)
+    maps sample positions in the plain concatenation of pieces to positions
+    in the output (numpy array in/out).
+    """
+    levelled = [normalize(np.asarray(p, dtype=np.float32), sample_rate, target_lufs)[0] for p in pieces]
+    audio, overlaps = join(levelled, sample_rate, crossfade_ms)
+    audio, keep = cap_silences(audio, sample_rate, max_silence_s)
+
+    raw_starts = np.cumsum([0] + [len(p) for p in pieces[:-1]])
+    pulled_back = np.cumsum([0] + overlaps)
+    kept_before = np.concatenate([[0], np.cumsum(keep)])
+
+    def remap(positions):
+        positions = np.asarray(positions)
+        piece = np.searchsorted(raw_starts, positions, side="right") - 1
+        joined = np.clip(positions - pulled_back[piece], 0, len(keep))
+        return kept_before[joined]
+
+    return audio, remap
+
+
+class Crossfader:
+    """
+    Streaming join(): pieces go in one after another, whole or as blocks, and
+    come out to out.write with the same equal-power crossfades. Only the
+    previous piece's tail is held back. overlaps matches join()'s.
+    """
+
+    def __init__(self, out, sample_rate, crossfade_ms=CROSSFADE_MS):
+        self.out = out
+        self.fade = int(sample_rate * crossfade_ms / 1000)
+        self.overlaps = []
+        self.held = None  # the previous piece's last min(fade, len // 2) samples
+
+    def _write(self, audio):
+        if len(audio):
+            self.out.write(audio)
+
+    def add(self, blocks, length):
+        """Append one piece of `length` samples, given as an iterable of blocks."""
+        overlap = 0
+        if self.held is not None:
+            overlap = min(len(self.held), length // 2)
+            self.overlaps.append(overlap)
+            self._write(self.held[:len(self.held) - overlap])
+        keep = min(self.fade, length // 2)
+        body_end = length - keep
+        head, tail, position = [], [], 0
+
+        def _flush_head():
+            if head:
+                old, new = self.held[len(self.held) - overlap:], np.concatenate(head)
+                fade_out = np.cos(np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32))
+                fade_in = np.sin(np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32))
+                if new.ndim > 1:
+                    fade_out, fade_in = fade_out[:, None], fade_in[:, None]
+                self._write(old * fade_out + new * fade_in)
+                head.clear()
+
+        for block in blocks:
+            block = np.asarray(block, dtype=np.float32)
+            to_head = min(max(overlap - position, 0), len(block))
+            to_body = min(max(body_end - position, 0), len(block))
+            if to_head:
+                head.append(block[:to_head])
+            if to_body > to_head:
+                _flush_head()
+                self._write(block[to_head:to_body])
+            tail.append(block[to_body:])
+            position += len(block)
+        _flush_head()
+        self.held = np.concatenate(tail) if tail else np.zeros(0, dtype=np.float32)
+
+    def finish(self):
+        if self.held is not None:
+            self._write(self.held)
+            self.held = None
+
+
+class _SilenceCapper:
+    """
+    Streaming cap_silences(): audio written to it in order reaches out.write with every
+    silent run over max_silence_s shortened, holding at most one run's kept tail.
+    cuts lists the dropped [start, end) sample ranges of the input.
+    """
+
+    def __init__(self, out, sample_rate, max_silence_s=MAX_SILENCE_S, threshold_db=SILENCE_DB):
+        self.out = out
+        self.frame = max(1, int(sample_rate * SILENCE_FRAME_MS / 1000))
+        # A silent run keeps its first `head` and last `tail` frames (as cap_silences does)
+        max_frames = int(max_silence_s * 1000 / SILENCE_FRAME_MS)
+        self.head, self.tail = max_frames // 2, max_frames - max_frames // 2
+        self.threshold_db = threshold_db
+        self.cuts = []
+        self.position = 0  # input samples in whole frames so far
+        self.run = 0  # frames in the silent run in progress
+        self.run_start = 0
+        self.held = None  # the run's frames past `head`, at most the last `tail`
+        self.partial = None  # less than a frame, waiting for the next write
+
+    def _write(self, audio):
+        if len(audio):
+            self.out.write(audio)
+
+    def _end_run(self):
+        if self.held is not None:
+            self._write(self.held)
+        if self.run > self.head + self.tail:
+            self.cuts.append((self.run_start + self.head * self.frame,
+                              self.run_start + (self.run - self.tail) * self.frame))
+        self.held, self.run = None, 0
+
+    def write(self, audio):
+        frame = self.frame
+        audio = audio.reshape(len(audio), -1)
+        if self.partial is not None:
+            audio = np.concatenate([self.partial, audio])
+        frames = len(audio) // frame
+        self.partial = audio[frames * frame:]
+        audio = audio[:frames * frame]
+        if not frames:
+            return
+        mono = audio.mean(axis=1).reshape(frames, frame).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            silent = 20 * np.log10(np.sqrt(np.mean(mono ** 2, axis=1))) < self.threshold_db
+        # Runs of equal silent/non-silent frames in this block
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(silent.astype(np.int8))) + 1, [frames]])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            piece = audio[start * frame:end * frame]
+            if not silent[start]:
+                self._end_run()
+                self._write(piece)
+                continue
+            if not self.run:
+                self.run_start = self.position + start * frame
+            direct = max(0, min(end - start, self.head - self.run)) * frame
+            self._write(piece[:direct])
+            if self.tail:
+                rest = piece[direct:] if self.held is None else np.concatenate([self.held, piece[direct:]])
+                self.held = rest[-self.tail * frame:]
+            self.run += end - start
+        self.position += frames * frame
+
+    def finish(self):
+        self._end_run()
+        if self.partial is not None:
+            # A trailing partial frame is never silence-checked
+            self._write(self.partial)
+            self.partial = None
+
+
+def _file_loudness(path, block_frames):
+    """
+    (integrated LUFS or None, peak) of a WAV, read block_frames at a time.
+
+    Same measure as integrated_loudness(): the K-weighting filters carry their
+    state across blocks, and 400 ms block energies are built from 100 ms step sums.
+    """
+    from scipy.signal import lfilter
+
+    peak = 0.0
+    step_sums, carry = [], None  # power summed per 100 ms step; the partial step left over
+    with sf.SoundFile(path) as f:
+        sample_rate = f.samplerate
+        step = int(0.1 * sample_rate)
+        filters = [(b, a, None) for b, a in (_biquad_shelf(sample_rate), _biquad_highpass(sample_rate))]
+        for audio in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            peak = max(peak, float(np.max(np.abs(audio)))) if len(audio) else peak
+            x = audio.astype(np.float64)
+            for i, (b, a, state) in enumerate(filters):
+                if state is None:
+                    state = np.zeros((max(len(a), len(b)) - 1, x.shape[1]))
+                x, state = lfilter(b, a, x, axis=0, zi=state)
+                filters[i] = (b, a, state)
+            power = (x ** 2).sum(axis=1)
+            if carry is not None:
+                power = np.concatenate([carry, power])
+            whole = len(power) // step * step
+            step_sums.extend(power[:whole].reshape(-1, step).sum(axis=1))
+            carry = power[whole:]
+    if len(step_sums) < 4:
+        return None, peak
+    sums = np.asarray(step_sums)
+    energy = (sums[:-3] + sums[1:-2] + sums[2:-1] + sums[3:]) / (4 * step)
+    return _gated_loudness(energy), peak
+
+
+def process_file(path, target_lufs=TARGET_LUFS, max_silence_s=MAX_SILENCE_S, threshold_db=SILENCE_DB):
+    """
+    Post-process a finished WAV in place (whole-script and streamed renders). Returns True if it ran.
+
+    Same result as process([audio]) — loudness normalized with the peak
+    ceiling, long silences capped — but streamed: one pass measures, a second
+    applies the gain and writes, FILE_BLOCK_S at a time. Only the kept tail of
+    a silent run is ever buffered.
+    """
+    if not ENABLED or not path.endswith(".wav"):
+        return False
+    with sf.SoundFile(path) as f:
+        sample_rate, channels = f.samplerate, f.channels
+    frame = max(1, int(sample_rate * SILENCE_FRAME_MS / 1000))
+    block_frames = max(1, int(FILE_BLOCK_S * sample_rate) // frame) * frame
+
+    loudness, peak = _file_loudness(path, block_frames)
+    gain_db = 0.0
+    if loudness is not None:
+        gain_db = target_lufs - loudness
+        if peak > 0:
+            gain_db = min(gain_db, PEAK_CEILING_DB - 20 * np.log10(peak))
+    gain = np.float32(10 ** (gain_db / 20))
+
+    tmp = f"{path}.part"
+    with sf.SoundFile(path) as src, sf.SoundFile(tmp, "w", sample_rate, channels, format="WAV") as out:
+        capper = _SilenceCapper(out, sample_rate, max_silence_s, threshold_db)
+        for audio in src.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            capper.write(audio * gain)
+        capper.finish()
+    os.replace(tmp, path)
+    return True
+
+
+def process_files(paths, output_path, crossfade_ms=CROSSFADE_MS, target_lufs=TARGET_LUFS,
+                  max_silence_s=MAX_SILENCE_S):
+    """
+    process() for chunk files, written to output_path as it goes.
+
+    Same audio and remap as process() on the decoded files, but only one
+    chunk is in memory at a time: each is normalized, crossfaded onto the
+    previous one's tail and silence-capped on its way to the file (AudioWriter
+    for WAV). paths may also be file objects (process_encoded). Raises what
+    sf.read raises for a file this libsndfile can't decode.
+    """
+    fmt = os.path.splitext(output_path)[1].lstrip(".").upper()
+    tmp = f"{output_path}.part"
+    out = sample_rate = capper = crossfader = None
+    raw_starts, total = [], 0
+    try:
+        for path in paths:
+            piece, rate = sf.read(path, dtype="float32")
+            if out is None:
+                sample_rate = rate
+                channels = 1 if piece.ndim == 1 else piece.shape[1]
+                out = (AudioWriter(tmp, sample_rate) if fmt == "WAV"
+                       else sf.SoundFile(tmp, "w", sample_rate, channels, format=fmt))
+                capper = _SilenceCapper(out, sample_rate, max_silence_s)
+                crossfader = Crossfader(capper, sample_rate, crossfade_ms)
+            elif rate != sample_rate:
+                raise ValueError(f"chunk {len(raw_starts) + 1} is {rate} Hz, not {sample_rate}")
+            raw_starts.append(total)
+            total += len(piece)
+            piece, _ = normalize(piece, sample_rate, target_lufs)
+            crossfader.add([piece], len(piece))
+        crossfader.finish()
+        capper.finish()
+        out.close()
+    except BaseException:
+        if out is not None:
+            out.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_path)
+
+    raw_starts = np.asarray(raw_starts)
+    pulled_back = np.cumsum([0] + crossfader.overlaps)
+    joined_length = total - pulled_back[-1]
+    cut_starts = np.array([start for start, _ in capper.cuts], dtype=np.int64)
+    cut_lengths = np.array([end - start for start, end in capper.cuts], dtype=np.int64)
+
+    def remap(positions):
+        positions = np.asarray(positions)
+        piece = np.searchsorted(raw_starts, positions, side="right") - 1
+        joined = np.clip(positions - pulled_back[piece], 0, joined_length)
+        dropped = np.clip(joined[..., None] - cut_starts, 0, cut_lengths).sum(axis=-1)
+        return joined - dropped
+
+    return remap
+
+
+def process_encoded(parts, output_path):
+    """
+    Decode encoded chunks (MP3 bytes), post-process and re-encode to output_path,
+    one chunk at a time (process_files).
+
+    Returns False — nothing written — when disabled or when this libsndfile
+    build can't decode/encode the format; the caller then joins the bytes as-is.
+    """
+    if not ENABLED:
+        return False
+    try:
+        process_files([io.BytesIO(part) for part in parts], output_path)
+        return True
+    except (RuntimeError, TypeError, ValueError) as e:
+        print(f"   Post-processing skipped ({e})")
+        return False
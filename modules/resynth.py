@@ -0,0 +1,240 @@
+"""
+DOC:START
+Incremental re-synthesis: re-render only the sentences an edit changed.
+
+Purpose:
+- Writes a sentence-to-audio-span manifest next to each rendered WAV
+  (daily_reflection_<backend>_<timestamp>.spans.json)
+- Spans come from the normal chunk render: sentence lengths where the audio
+  cache rendered the chunk sentence by sentence (Kokoro), else whole chunks
+- On a rerun of the same date with the same backend + voice (e.g.
+  `main.py --input-file output/scripts/script_<date>.txt` after fixing a line),
+  diffs the new sentences (or chunks) against the manifest, synthesizes only
+  the changed ones and splices them into the previous audio with short crossfades,
+  seeking into the previous WAV instead of loading it
+
+Inputs/Outputs:
+- Input: script chunks, a synth(text) callable, the audio directory
+- Output: the spliced WAV + its manifest; None whenever a full render is needed instead
+
+Side effects:
+- Writes <audio>.spans.json manifests and spliced WAVs in output/audio/
+
+Run: imported by main.py
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import json
+import time
+import difflib
+
+import numpy as np
+import soundfile as sf
+
+from modules import audio_cache, postprocess
+from modules.audio_cache import split_sentences, normalize
+from modules.audio_writer import AudioWriter
+
+# Crossfade where new audio meets reused audio (equal-power, so no dip in loudness)
+CROSSFADE_MS = postprocess.CROSSFADE_MS
+
+# Past this share of changed sentences a full render is as quick and sounds more even
+MAX_CHANGED = 0.5
+
+
+def units_for(chunks, unit="sentence"):
+    """The units a manifest spans, in order: the script's sentences, or its chunks whole."""
+    if unit == "chunk":
+        return list(chunks)
+    return [s for chunk in chunks for s in split_sentences(chunk)]
+
+
+def manifest_path(audio_path):
+    return f"{os.path.splitext(audio_path)[0]}.spans.json"
+
+
+class SpanRecorder:
+    """
+    Wraps a chunk synth to remember each chunk's span lengths for the manifest.
+
+    Each chunk is still one synth call. Sentence lengths come from the audio
+    cache when it rendered the chunk sentence by sentence; otherwise the
+    chunk is recorded as one span.
+    """
+
+    def __init__(self, synth):
+        self.synth = synth
+        self.lengths = {}  # chunk text -> [(sentence, samples)], or None when only the chunk's length is known
+        self.totals = {}  # chunk text -> samples
+        self.sample_rate = None
+
+    def __call__(self, chunk):
+        return self.record(chunk, self.synth)
+
+    def wrap(self, synth):
+        """Recording synth for another worker (scheduler lanes, helper backends)."""
+        return lambda chunk: self.record(chunk, synth)
+
+    def record(self, chunk, synth):
+        audio_cache.take_spans()
+        result = synth(chunk)
+        if result is None:
+            return None
+        audio, self.sample_rate = result
+        spans = audio_cache.take_spans()
+        # Sentence spans only if they are this chunk's (same sentences, same total length)
+        if spans and ([s for s, _ in spans] != split_sentences(chunk) or sum(n for _, n in spans) != len(audio)):
+            spans = None
+        self.lengths[chunk] = spans
+        self.totals[chunk] = len(audio)
+        return result
+
+    def spans(self, chunks):
+        """
+        (unit, [(text, samples)]) for the whole script — unit "sentence" when every
+        chunk has sentence lengths, else "chunk" — or (None, None) if a chunk was
+        reused unseen (--resume).
+        """
+        if any(chunk not in self.totals for chunk in chunks):
+            return None, None
+        if all(self.lengths[chunk] for chunk in chunks):
+            return "sentence", [entry for chunk in chunks for entry in self.lengths[chunk]]
+        return "chunk", [(chunk, self.totals[chunk]) for chunk in chunks]
+
+
+def write_manifest(audio_path, show_date, key, sample_rate, lengths, remap=None, target_lufs=None, unit="sentence"):
+    """
+    Save the sentence (or chunk, per unit) spans in samples of audio_path next to it.
+
+    lengths are the rendered unit lengths before post-processing; remap
+    (from postprocess.process) moves their boundaries to where they ended up.
+    target_lufs is the level the audio was normalized to (None = untouched),
+    so later splices can match it.
+    """
+    ends = np.cumsum([samples for _, samples in lengths])
+    starts = ends - [samples for _, samples in lengths]
+    if remap is not None:
+        starts, ends = remap(starts), remap(ends)
+    payload = {
+        "audio": os.path.basename(audio_path),
+        "show_date": show_date,
+        "key": key,
+        "sample_rate": sample_rate,
+        "target_lufs": target_lufs,
+        "unit": unit,
+        "sentences": [{"text": text, "start": int(start), "end": int(end)}
+                      for (text, _), start, end in zip(lengths, starts, ends)],
+    }
+    path = manifest_path(audio_path)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def find_previous(audio_dir, show_date, key):
+    """Newest manifest (with its audio still on disk) for this date + backend/voice, or None."""
+    candidates = []
+    for name in os.listdir(audio_dir):
+        if not name.endswith(".spans.json"):
+            continue
+        path = os.path.join(audio_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        audio_path = os.path.join(audio_dir, manifest.get("audio", ""))
+        if manifest.get("show_date") == show_date and manifest.get("key") == key and os.path.exists(audio_path):
+            manifest["path"] = audio_path
+            candidates.append((os.path.getmtime(path), manifest))
+    return max(candidates, key=lambda c: c[0])[1] if candidates else None
+
+
+def _splice(opcodes, old, sentences, src, synth, out, target_lufs, on_sentence):
+    """
+    Write the spliced audio to out: unchanged spans read from src (seeking, block by
+    block), new ones synthesized. Returns ([[(sentence, samples)] per run], crossfade
+    overlaps), or (None, None) if a render failed. Each run boundary is a splice.
+    """
+    crossfader = postprocess.Crossfader(out, src.samplerate, CROSSFADE_MS)
+    block = int(postprocess.FILE_BLOCK_S * src.samplerate)
+    runs = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            start, end = old[i1]["start"], old[i2 - 1]["end"]
+            src.seek(start)
+            crossfader.add(src.blocks(blocksize=block, frames=end - start, dtype="float32"), end - start)
+            runs.append([(sentences[j1 + k], s["end"] - s["start"]) for k, s in enumerate(old[i1:i2])])
+        elif tag in ("replace", "insert"):
+            for j in range(j1, j2):
+                start = time.perf_counter()
+                result = synth(sentences[j])
+                if result is None:
+                    return None, None
+                if result[1] != src.samplerate:
+                    print(f"   Sample rate changed ({result[1]} vs {src.samplerate}) — rendering in full")
+                    return None, None
+                if on_sentence:
+                    on_sentence(j, sentences[j], result, time.perf_counter() - start)
+                piece = np.asarray(result[0], dtype=np.float32)
+                if target_lufs is not None:
+                    piece, _ = postprocess.normalize(piece, src.samplerate, target_lufs)
+                    piece, _ = postprocess.cap_silences(piece, src.samplerate)
+                crossfader.add([piece], len(piece))
+                runs.append([(sentences[j], len(piece))])
+        # "delete": the old sentences' audio is simply not carried over
+    crossfader.finish()
+    return runs, crossfader.overlaps
+
+
+def rerender(previous, sentences, synth, output_path, on_sentence=None):
+    """
+    Re-render sentences by reusing previous's audio wherever the text is unchanged.
+
+    previous: manifest from find_previous()
+    sentences: units_for(chunks, previous's unit) — sentences, or whole chunks
+    synth: callable(text) -> (audio, sample_rate) | None
+    on_sentence(index, text, result, seconds) is called after each fresh render.
+
+    New sentences get the same post-processing as the previous render
+    (loudness target, silence cap) so they sit at the same level. Returns the new [(sentence, samples)] lengths, or None when
+    a full render is the better (or only) option: too much changed, a sentence
+    failed, or the sample rate differs.
+    """
+    old = previous["sentences"]
+    matcher = difflib.SequenceMatcher(
+        a=[normalize(s["text"]) for s in old], b=[normalize(s) for s in sentences], autojunk=False
+    )
+    opcodes = matcher.get_opcodes()
+    changed = sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag in ("replace", "insert"))
+    unit = previous.get("unit", "sentence")
+    if changed > MAX_CHANGED * len(sentences):
+        print(f"   {changed}/{len(sentences)} {unit}s changed — rendering in full")
+        return None
+
+    with sf.SoundFile(previous["path"]) as src:
+        sample_rate = src.samplerate
+        if sample_rate != previous["sample_rate"]:
+            return None
+        print(f"   Incremental re-render: {changed}/{len(sentences)} {unit}s changed, "
+              f"reusing {os.path.basename(previous['path'])}")
+        tmp = f"{output_path}.part"
+        with AudioWriter(tmp, sample_rate) as out:
+            runs, overlaps = _splice(opcodes, old, sentences, src, synth, out, previous.get("target_lufs"),
+                                     on_sentence)
+    if not runs:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    os.replace(tmp, output_path)
+
+    lengths = []
+    for piece_lengths, overlap in zip(runs, overlaps + [0]):
+        lengths.extend(piece_lengths)
+        # The overlap comes out of the sentence on the left of the splice
+        text, samples = lengths[-1]
+        lengths[-1] = (text, samples - overlap)
+    return lengths
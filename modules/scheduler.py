@@ -0,0 +1,278 @@
+"""
+DOC:START
+Chunk scheduler: spreads one show's chunks across several TTS workers.
+
+Purpose:
+- Runs several instances of the show's voice at once (Kokoro threads sharing
+  the model with the cores split between them, parallel API requests up to the
+  backend's declared concurrency)
+- Optional helper backends (TTS_HELPERS, e.g. a Kokoro next to a Voicebox
+  server) take routine chunks — the weather rundown — but never the rest
+- Tracks each worker's throughput (chars/s); a slow worker leaves a chunk to a
+  faster one that would still finish it sooner
+- Writes chunks to the run's checkpoint directory, so they reassemble in
+  script order and --resume reuses them
+
+Inputs/Outputs:
+- Input: the script (chunk_script packs it), a worker list (plan_workers), checkpoint dir + key
+- Output: ordered chunk paths, or None if a chunk failed / the render was cancelled
+
+Side effects:
+- Writes run_dir/chunks/; may lower torch's thread count for parallel Kokoro workers
+
+Run: imported by main.py
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import re
+import time
+import bisect
+import threading
+
+from modules import checkpoint, kokoro_pool, segment, tts_registry
+
+# Chunk workers per show (unset = from the backend: its declared concurrency,
+# Kokoro's process pool size, or one worker per KOKORO_THREADS_PER_WORKER cores)
+WORKERS = os.environ.get("TTS_CHUNK_WORKERS")
+# Helper backends for routine chunks: "kokoro" or "kokoro:am_michael,..."
+HELPERS = [h.strip() for h in os.environ.get("TTS_HELPERS", "").split(",") if h.strip()]
+
+# Kokoro-82M stops speeding up past ~4 intra-op threads; more cores go to more workers
+KOKORO_THREADS_PER_WORKER = 4
+
+# Chunks a different voice may read without anyone noticing: weather and similar rundowns
+ROUTINE_PATTERN = re.compile(
+    r"\b(forecast|degrees|temperatures?|°[CF]?|rain|showers|drizzle|snow|wind|humidity|sunny|cloudy|"
+    r"overcast|high of|low of)\b",
+    re.IGNORECASE,
+)
+
+# Re-check skipped chunks this often (throughput estimates can be off)
+_WAIT_SECONDS = 0.5
+
+_limit = None
+
+
+def set_workers(count):
+    """Cap workers per show, helpers included (batch modes already render several shows at once)."""
+    global _limit
+    _limit = count
+
+
+def is_routine(text):
+    return bool(ROUTINE_PATTERN.search(text))
+
+
+def chunk_script(script, workers, max_chars):
+    """
+    Pack a finished script into chunks of at most max_chars (segment.pack).
+
+    With a routine-only helper among the workers, runs of routine and other
+    paragraphs are packed separately, so the helper still gets whole chunks
+    it may read.
+    """
+    if not any(w.routine_only for w in workers):
+        return segment.pack(script, max_chars)
+    chunks, run, routine = [], [], None
+    for para in segment.paragraphs(script):
+        if run and is_routine(para) != routine:
+            chunks += segment.pack("\n\n".join(run), max_chars)
+            run = []
+        routine = is_routine(para)
+        run.append(para)
+    if run:
+        chunks += segment.pack("\n\n".join(run), max_chars)
+    return chunks
+
+
+class Worker:
+    """One rendering lane: a synth callable plus its measured throughput."""
+
+    def __init__(self, name, backend, synth, routine_only=False):
+        self.name = name
+        self.backend = backend
+        self.synth = synth
+        self.routine_only = routine_only
+        self.chunks = 0
+        self.chars = 0
+        self.seconds = 0.0
+        self.busy_until = 0.0
+        self.failed = False
+
+    @property
+    def rate(self):
+        """Characters per second rendered so far (None before the first chunk)."""
+        return self.chars / self.seconds if self.seconds else None
+
+    def eligible(self, text):
+        return not self.failed and (not self.routine_only or is_routine(text))
+
+    def estimate(self, text, now):
+        """Monotonic time this worker would finish text if it started next, or None if unmeasured."""
+        if self.rate is None:
+            return None
+        return max(now, self.busy_until) + len(text) / self.rate
+
+
+def default_workers(backend):
+    if WORKERS:
+        return tts_registry.max_workers(backend, max(1, int(WORKERS)))
+    limit = tts_registry.get(backend)["concurrency"]
+    if limit:
+        return limit
+    if backend == "kokoro" and kokoro_pool.enabled():
+        return kokoro_pool.processes()  # one lane per worker process
+    return max(1, (os.cpu_count() or 1) // KOKORO_THREADS_PER_WORKER)
+
+
+def _helper_workers(tts_config):
+    """Workers for TTS_HELPERS that can join this backend's chunks (same format and sample rate)."""
+    backend = tts_config["backend"]
+    spec = tts_registry.get(backend)
+    workers = []
+    for entry in HELPERS:
+        name, _, voice = entry.partition(":")
+        try:
+            helper = tts_registry.get(name)
+        except ValueError as e:
+            print(f"   Helper skipped: {e}")
+            continue
+        if name == backend or not helper["chunked"]:
+            continue
+        if (helper["format"], helper["sample_rate"]) != (spec["format"], spec["sample_rate"]):
+            print(f"   Helper {name} skipped: {helper['format']} @ {helper['sample_rate']} Hz "
+                  f"can't join {backend}'s {spec['format']} @ {spec['sample_rate']} Hz")
+            continue
+        config = {"backend": name, **({"voice": voice} if voice else {})}
+        synth = tts_registry.synth_fn(config)
+
+        def render(text, synth=synth, name=name):
+            with tts_registry.slot(name):
+                return synth(text)
+
+        workers.append(Worker(f"{name} (helper)", name, render, routine_only=True))
+    return workers
+
+
+def plan_workers(tts_config, synth):
+    """Workers for one show: the backend's own instances plus any helpers (capped by set_workers)."""
+    backend = tts_config["backend"]
+    count = default_workers(backend) if _limit is None else min(_limit, default_workers(backend))
+    workers = [Worker(f"{backend}#{n + 1}" if count > 1 else backend, backend, synth) for n in range(count)]
+    if _limit is None or _limit > len(workers):
+        workers += _helper_workers(tts_config)[:None if _limit is None else _limit - len(workers)]
+
+    kokoro_lanes = sum(1 for w in workers if w.backend == "kokoro")
+    if kokoro_lanes > 1 and not kokoro_pool.enabled():
+        # Every Kokoro lane shares one loaded model; split the cores between them
+        from modules import tts_kokoro
+        tts_kokoro.set_torch_threads((os.cpu_count() or 1) // kokoro_lanes)
+    return workers
+
+
+def render_chunks(run_dir, chunks, workers, ext, key, on_chunk=None, cancel=None):
+    """
+    Render chunks on all workers at once, reusing any already in run_dir.
+
+    Same files and return value as checkpoint.render_chunks; on_chunk gets the
+    rendering worker's backend as a fifth argument. A failed helper hands its
+    chunk back to the others; a failed chunk on the show's own backend fails the render.
+    """
+    paths = [None] * len(chunks)
+    pending = []
+    for i, chunk in enumerate(chunks):
+        path = checkpoint.chunk_path(run_dir, i, chunk, key, ext)
+        if os.path.exists(path):
+            print(f"  Chunk {i+1}/{len(chunks)} already rendered, reusing")
+            paths[i] = path
+        else:
+            pending.append(i)
+    if not pending:
+        return paths
+
+    cond = threading.Condition()
+    state = {"failed": False, "in_flight": 0}
+
+    def _faster_elsewhere(worker, text, now):
+        mine = worker.estimate(text, now)
+        if mine is None:
+            return False
+        return any(other is not worker and other.eligible(text)
+                   and (theirs := other.estimate(text, now)) is not None and theirs < mine
+                   for other in workers)
+
+    def _take(worker):
+        """Next chunk index for worker, or None once there's nothing left it should do. Holds cond."""
+        while True:
+            if state["failed"] or (cancel is not None and cancel.is_set()):
+                return None
+            eligible = [i for i in pending if worker.eligible(chunks[i])]
+            if not eligible and not state["in_flight"]:
+                return None
+            now = time.monotonic()
+            for i in eligible:
+                if not _faster_elsewhere(worker, chunks[i], now):
+                    pending.remove(i)
+                    state["in_flight"] += 1
+                    worker.busy_until = worker.estimate(chunks[i], now) or now
+                    return i
+            cond.wait(_WAIT_SECONDS)
+
+    def _run(worker):
+        while True:
+            with cond:
+                i = _take(worker)
+                if i is None:
+                    cond.notify_all()
+                    return
+            print(f"  Chunk {i+1}/{len(chunks)} ({len(chunks[i])} chars) on {worker.name}...")
+            start = time.perf_counter()
+            try:
+                result = worker.synth(chunks[i])
+            except Exception as e:
+                print(f"  Chunk {i+1} failed on {worker.name}: {e}")
+                result = None
+            seconds = time.perf_counter() - start
+
+            if result is not None:
+                path = checkpoint.chunk_path(run_dir, i, chunks[i], key, ext)
+                checkpoint.write_piece(path, result)
+                if on_chunk:
+                    on_chunk(i, chunks[i], result, seconds, worker.backend)
+
+            with cond:
+                state["in_flight"] -= 1
+                worker.busy_until = 0.0
+                if result is None:
+                    if worker.routine_only:
+                        print(f"  {worker.name} failed — its chunks go back to {workers[0].backend}")
+                        worker.failed = True
+                        bisect.insort(pending, i)
+                    else:
+                        state["failed"] = True
+                else:
+                    paths[i] = path
+                    worker.chunks += 1
+                    worker.chars += len(chunks[i])
+                    worker.seconds += seconds
+                cond.notify_all()
+                if worker.failed:
+                    return
+
+    threads = [threading.Thread(target=_run, args=(w,), name=f"tts-{w.name}", daemon=True) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = ", ".join(f"{w.name} {w.chunks} @ {w.rate:.0f} chars/s" for w in workers if w.chunks)
+    if summary:
+        print(f"  Workers: {summary}")
+    if cancel is not None and cancel.is_set():
+        print(f"  Cancelled with {sum(p is None for p in paths)} chunk(s) left ({key})")
+        return None
+    if state["failed"] or any(p is None for p in paths):
+        return None
+    return paths
@@ -0,0 +1,173 @@
+"""
+DOC:START
+Sentence segmentation and chunk packing shared by every TTS path.
+
+Purpose:
+- Finds sentence ends in one pass, without breaking on titles before a name
+  ("Dr. Smith", "St. Paul"), "e.g."-style abbreviations, initials, decimals,
+  or punctuation inside a quote that runs on ("'Wow!' she said")
+- Only abbreviations that can't end a sentence are kept: "say no. To",
+  "6 p.m. Then" and "et al. The" split
+- Keeps closing quotes/brackets with the sentence they end
+- Packs paragraphs (then sentences, then words) into chunks up to a per-backend
+  size, so each request carries as much text as the backend allows
+
+Inputs/Outputs:
+- Input: text (str), max chars per chunk
+- Output: lists of sentences / chunks
+
+Side effects:
+- None
+
+Run: python -m modules.segment (checks the splitting regression cases); imported by audio_cache, stream and the TTS backends
+See: modules/modules.md
+DOC:END
+"""
+
+import re
+
+# Never the last word of a sentence (compared lowercased, without the dot). Ordinary words ("no", "est")
+# and abbreviations that often end one ("etc.", "p.m.", "U.S.") are left out: a missed split is worse
+ABBREVIATIONS = frozenset({"vs", "e.g", "i.e", "cf", "approx"})
+# Titles: only an abbreviation when a capitalised name follows ("Dr. Smith", "St. Paul")
+TITLES = frozenset({"mr", "mrs", "ms", "dr", "prof", "rev", "st", "mt", "capt", "lt", "col", "sgt"})
+
+# Splitting regression cases: (text, expected sentences)
+CASES = (
+    ("You can say no. That is fine.", ["You can say no.", "That is fine."]),
+    ("He loves you enough to say no. To let the discomfort stay.",
+     ["He loves you enough to say no.", "To let the discomfort stay."]),
+    ("You pull it back. “No. Today. This hour.”", ["You pull it back.", "“No.", "Today.", "This hour.”"]),
+    ("We meet at 6 p.m. Then we eat.", ["We meet at 6 p.m.", "Then we eat."]),
+    ("Smith et al. The study held.", ["Smith et al.", "The study held."]),
+    ("Dr. Smith met Mr. Jones. Then St. Paul spoke.", ["Dr. Smith met Mr. Jones.", "Then St. Paul spoke."]),
+    ("Bring fruit, e.g. Apples. Done.", ["Bring fruit, e.g. Apples.", "Done."]),
+    ("J. R. R. Tolkien wrote it. It is 3.5 miles.", ["J. R. R. Tolkien wrote it.", "It is 3.5 miles."]),
+    ("'Wow!' she said. Next.", ["'Wow!' she said.", "Next."]),
+)
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace, or a line break
+_CANDIDATE = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)|\n')
+_NEXT_CHAR = re.compile(r'\s*(\S)')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def _is_abbreviation(text, start, dot, following):
+    """True if the word ending at text[dot] == '.' is an abbreviation, a title before a name or an initial."""
+    word_start = max(text.rfind(" ", start, dot), text.rfind("\n", start, dot)) + 1
+    word = text[word_start:dot].lstrip("\"'“‘([")
+    if len(word) == 1 and word.isalpha() and word.isupper():
+        return True  # initial: "J. R. R. Tolkien"
+    if word.lower() in TITLES:
+        return following.isupper()
+    return word.lower() in ABBREVIATIONS
+
+
+def sentence_ends(text, stop=None):
+    """
+    Yield the index just past each sentence end in text (up to stop).
+
+    Only ends followed by more text count — the tail is left to the caller,
+    so a partially streamed buffer never gets cut after "Dr." or "approx.".
+    """
+    start = 0
+    stop = len(text) if stop is None else stop
+    for match in _CANDIDATE.finditer(text):
+        end = match.end()
+        if end > stop:
+            return
+        following = _NEXT_CHAR.match(text, end)
+        if following is None:
+            return
+        if match.group() != "\n":
+            if following.group(1).islower():
+                continue  # "approx. five", "'Wow!' she said"
+            if (match.group()[0] == "." and match.end() - match.start() == 1
+                    and _is_abbreviation(text, start, match.start(), following.group(1))):
+                continue
+        yield end
+        start = end
+
+
+def sentences(text):
+    """Split text into sentences, keeping their punctuation."""
+    out = []
+    start = 0
+    for end in sentence_ends(text):
+        sentence = text[start:end].strip()
+        if sentence:
+            out.append(sentence)
+        start = end
+    tail = text[start:].strip()
+    if tail:
+        out.append(tail)
+    return out
+
+
+def paragraphs(text):
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+
+def _split_words(sentence, max_chars):
+    """Cut an over-long sentence at spaces (hard cut inside a word longer than max_chars)."""
+    pieces = []
+    current, size = [], 0
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(" ".join(current))
+                current, size = [], 0
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and size + 1 + len(word) > max_chars:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        size += len(word) + (1 if current else 0)
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def pack(text, max_chars, paragraph_joiner="\n\n"):
+    """
+    Pack text into as few chunks of at most max_chars as possible.
+
+    Whole paragraphs are packed first; a paragraph over max_chars is packed
+    sentence by sentence, and a sentence over max_chars word by word.
+    """
+    chunks = []
+    parts, size = [], 0
+    for para in paragraphs(text):
+        if len(para) <= max_chars:
+            pieces = [para]
+        else:
+            pieces = []
+            for sentence in sentences(para):
+                pieces.extend([sentence] if len(sentence) <= max_chars else _split_words(sentence, max_chars))
+        for i, piece in enumerate(pieces):
+            joiner = " " if i else paragraph_joiner
+            if parts and size + len(joiner) + len(piece) > max_chars:
+                chunks.append("".join(parts))
+                parts, size = [], 0
+            if parts:
+                parts.append(joiner)
+                size += len(joiner)
+            parts.append(piece)
+            size += len(piece)
+    if parts:
+        chunks.append("".join(parts))
+    return chunks
+
+
+def check():
+    """Run the CASES; returns the failures as (text, expected, got)."""
+    return [(text, expected, sentences(text)) for text, expected in CASES if sentences(text) != expected]
+
+
+if __name__ == "__main__":
+    failures = check()
+    for text, expected, got in failures:
+        print(f"FAIL {text!r}: expected {expected}, got {got}")
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} segmentation cases pass")
+    raise SystemExit(1 if failures else 0)
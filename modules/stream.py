@@ -0,0 +1,231 @@
+"""
+DOC:START
+Streaming script-to-audio pipeline: starts TTS before the LLM finishes.
+
+Purpose:
+- Splits the streamed LLM response into finished paragraphs as text arrives
+- Strips [NEW_CANON: ...] tags before anything reaches the TTS engine
+- Feeds paragraphs through a bounded queue to a TTS consumer that appends
+  each rendered piece to the output file while generation continues
+
+Inputs/Outputs:
+- Input: iterator of text deltas, a synth function (text -> (audio, sr) | bytes | None)
+- Output: dict with the full raw script, success flag, time-to-first-audio and
+  the MP3 pieces (main.py post-processes them once the stream is done)
+
+Side effects:
+- Writes audio incrementally to output_path (WAV for PCM backends, raw MP3 bytes otherwise)
+
+Run: imported by main.py (--stream)
+See: modules/modules.md
+DOC:END
+"""
+
+import re
+import time
+import queue
+import threading
+import soundfile as sf
+
+from modules import segment
+from modules.content import CANON_PATTERN
+
+# Cut an over-long paragraph at a sentence end once it grows past this, so
+# the TTS side isn't starved while the LLM writes a wall of text
+MAX_PARAGRAPH_CHARS = 1200
+
+# Paragraphs waiting for TTS. Small: the LLM is faster than any local engine,
+# and the point is to overlap the two, not to buffer the whole script.
+QUEUE_SIZE = 4
+
+# How often a producer blocked on a full queue checks whether the consumer stopped
+_PUT_SECONDS = 0.5
+
+def strip_canon(text):
+    """Remove [NEW_CANON: ...] tags, including malformed ones the regex in main would miss."""
+    text = re.sub(CANON_PATTERN, '', text)
+    text = re.sub(r'\[NEW_CANON:[^\]]*\]?', '', text)
+    return text.strip()
+
+
+def _has_open_bracket(text):
+    return text.rfind("[") > text.rfind("]")
+
+
+def iter_paragraphs(deltas, max_chars=MAX_PARAGRAPH_CHARS):
+    """
+    Turn a stream of text deltas into finished paragraphs.
+
+    A paragraph is finished at a blank line. If a paragraph runs past
+    max_chars it is cut at its last sentence end instead — but never inside
+    an open [...] tag, so a half-streamed canon tag can't leak out.
+    """
+    buffer = ""
+    for delta in deltas:
+        buffer += delta
+
+        while True:
+            idx = buffer.find("\n\n")
+            if idx == -1:
+                break
+            para, buffer = buffer[:idx], buffer[idx + 2:]
+            if para.strip():
+                yield para.strip()
+
+        # A single delta can hold several max_chars' worth (a finished script does)
+        while len(buffer) > max_chars and not _has_open_bracket(buffer):
+            cut = max(segment.sentence_ends(buffer, max_chars), default=0)
+            if not cut:
+                break
+            yield buffer[:cut].strip()
+            buffer = buffer[cut:]
+
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class _AudioSink:
+    """Appends rendered pieces to output_path as they arrive."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.wav = None
+        self.mp3 = None
+        self.encoded = []  # the MP3 pieces, kept for post-processing (concatenated MP3 can't be)
+        self.seconds = 0.0
+
+    def write(self, result):
+        if isinstance(result, bytes):
+            if self.mp3 is None:
+                self.mp3 = open(self.output_path, "wb")
+            self.mp3.write(result)
+            self.mp3.flush()
+            self.encoded.append(result)
+            return
+
+        audio, sample_rate = result
+        if self.wav is None:
+            channels = 1 if audio.ndim == 1 else audio.shape[1]
+            self.wav = sf.SoundFile(self.output_path, mode="w", samplerate=sample_rate, channels=channels)
+        self.wav.write(audio)
+        self.wav.flush()
+        self.seconds += len(audio) / sample_rate
+
+    def close(self):
+        if self.wav is not None:
+            self.wav.close()
+        if self.mp3 is not None:
+            self.mp3.close()
+
+
+def stream_show(deltas, synth, output_path, max_chars=MAX_PARAGRAPH_CHARS, queue_size=QUEUE_SIZE,
+                on_chunk=None):
+    """
+    Render a streaming LLM response to audio while it is still being generated.
+
+    deltas: iterator of text chunks (e.g. content.stream_completion(...))
+    synth:  callable(text) -> (audio, sample_rate) | mp3 bytes | None
+    max_chars: paragraph cap — keep at or below the backend's request limit
+    on_chunk: optional callable(index, text, result, seconds) after each render
+
+    The LLM is read on a producer thread; this thread renders. If TTS fails
+    partway, we keep draining the queue so the full script is still returned
+    and the caller can fall back to a non-streaming render.
+
+    Returns dict with:
+        - script: full raw script text (canon tags intact, for extraction)
+        - success: True if every paragraph rendered
+        - llm_error: exception raised by the LLM stream, or None
+        - first_audio: seconds from start until the first piece was written
+        - chunks: number of paragraphs rendered
+        - encoded: the MP3 pieces as rendered (empty for WAV), for
+          postprocess.process_encoded — the file itself is their raw concatenation
+    """
+    start = time.perf_counter()
+    pending = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()  # set when this thread stops consuming (e.g. synth raised)
+    raw_parts = []
+    errors = []
+
+    def _recording(it):
+        for delta in it:
+            if stop.is_set():
+                return
+            raw_parts.append(delta)
+            yield delta
+
+    def _put(item):
+        """Queue item; gives up once nobody is consuming, instead of blocking on a full queue forever."""
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=_PUT_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _produce():
+        try:
+            for para in iter_paragraphs(_recording(deltas), max_chars=max_chars):
+                spoken = strip_canon(para)
+                # No sentence end to cut at: still never send a request over max_chars
+                for piece in segment.pack(spoken, max_chars) if len(spoken) > max_chars else [spoken] if spoken else []:
+                    _put(piece)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _put(None)
+
+    producer = threading.Thread(target=_produce, name="llm-stream", daemon=True)
+    producer.start()
+
+    sink = _AudioSink(output_path)
+    success = True
+    first_audio = None
+    rendered = 0
+
+    try:
+        while True:
+            para = pending.get()
+            if para is None:
+                break
+            if not success:
+                continue  # keep draining so the producer can finish the script
+
+            print(f"   Streaming chunk {rendered + 1} ({len(para)} chars)...")
+            chunk_start = time.perf_counter()
+            result = synth(para)
+            if result is None:
+                print("   WARNING: TTS failed mid-stream, finishing script without audio")
+                success = False
+                continue
+            if on_chunk:
+                on_chunk(rendered, para, result, time.perf_counter() - chunk_start)
+
+            sink.write(result)
+            rendered += 1
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+                print(f"   First audio after {first_audio:.1f}s")
+    finally:
+        stop.set()
+        sink.close()
+        producer.join()
+
+    llm_error = errors[0] if errors else None
+    if llm_error:
+        print(f"   LLM stream failed: {llm_error}")
+        success = False
+    if rendered == 0:
+        success = False
+
+    elapsed = time.perf_counter() - start
+    print(f"   Streamed {rendered} chunk(s) in {elapsed:.1f}s")
+
+    return {
+        "script": "".join(raw_parts),
+        "success": success,
+        "llm_error": llm_error,
+        "first_audio": first_audio,
+        "chunks": rendered,
+        "encoded": sink.encoded,
+    }
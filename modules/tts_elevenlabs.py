@@ -4,95 +4,126 @@ TTS module using ElevenLabs API.
 Primary TTS backend for Daily Reflections. Uses the JEJ voice clone.
 Falls back gracefully if API key is missing or request fails.
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import os
 import requests
 
+from modules import audio_cache, postprocess, segment, tts_registry
+
 DEFAULT_VOICE_ID = "DihGQaIZuuqae0qMrsGF"  # JEJ clone
-MAX_CHARS = 5000  # ElevenLabs limit per request for most models
+MAX_CHARS = tts_registry.get("elevenlabs")["max_chars"]  # per-request limit, declared in the registry
 
 
 def _chunk_text(text):
-    """Split text into chunks under MAX_CHARS, splitting on paragraph then sentence boundaries."""
-    paragraphs = text.split("\n\n")
-    chunks = []
-    current = ""
-
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-        if len(current) + len(para) + 2 <= MAX_CHARS:
-            current = f"{current}\n\n{para}" if current else para
-        else:
-            if current:
-                chunks.append(current)
-            if len(para) > MAX_CHARS:
-                sentences = para.replace(". ", ".\n").split("\n")
-                current = ""
-                for sent in sentences:
-                    sent = sent.strip()
-                    if not sent:
-                        continue
-                    if len(current) + len(sent) + 1 <= MAX_CHARS:
-                        current = f"{current} {sent}" if current else sent
-                    else:
-                        if current:
-                            chunks.append(current)
-                        current = sent
-            else:
-                current = para
-
-    if current:
-        chunks.append(current)
-
-    return chunks
+    """Split text into chunks under MAX_CHARS, packing whole paragraphs, then sentences."""
+    return segment.pack(text, MAX_CHARS)
 
 
-def text_to_speech(text, output_path, voice_id=None, model="eleven_v3"):
-    """
-    Generate speech via ElevenLabs API and save as MP3.
-    Returns True on success, False on failure.
-    """
+def _request_config(voice_id=None):
+    """Return (url, headers, voice_id) for the TTS endpoint, or None if no API key is set."""
     api_key = os.environ.get("ELEVENLABS_API_KEY")
     if not api_key:
         print("Error: ELEVENLABS_API_KEY not set.")
-        return False
+        return None
 
     if voice_id is None:
         voice_id = os.environ.get("ELEVENLABS_VOICE_ID", DEFAULT_VOICE_ID)
 
-    chunks = _chunk_text(text)
-    print(f"Generating speech via ElevenLabs (voice: {voice_id[:8]}..., key: {api_key[:8]}..., {len(chunks)} chunk(s))...")
-
     url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
     headers = {
         "xi-api-key": api_key,
         "Content-Type": "application/json",
         "Accept": "audio/mpeg",
     }
+    return url, headers, voice_id
+
+
+def _generate_chunk(url, headers, chunk, model="eleven_v3"):
+    """Request one chunk of MP3 audio. Returns bytes; raises on HTTP errors."""
+    payload = {
+        "text": chunk,
+        "model_id": model,
+    }
+    resp = requests.post(url, json=payload, headers=headers, timeout=120)
+    resp.raise_for_status()
+    return resp.content
+
+
+def synthesize(text, voice_id=None, model="eleven_v3"):
+    """
+    Synthesize one piece of text (must fit in MAX_CHARS) and return MP3 bytes,
+    or None on failure.
+
+    Used by the streaming pipeline to render paragraphs as they arrive.
+    A chunk already rendered with the same voice and model comes from the audio cache.
+    """
+    config = _request_config(voice_id)
+    if not config:
+        return None
+    url, headers, voice_id = config
+
+    def _render(chunk):
+        try:
+            return _generate_chunk(url, headers, chunk, model=model)
+        except requests.HTTPError as e:
+            print(f"ElevenLabs API error: {e} — {e.response.text if e.response else ''}")
+            return None
+        except Exception as e:
+            print(f"Error in ElevenLabs generation: {e}")
+            return None
+
+    # A cached chunk costs no credits
+    return audio_cache.cached_synthesize(text, _render, "elevenlabs", voice=voice_id, model=model)
+
+
+def text_to_speech(text, output_path, voice_id=None, model="eleven_v3"):
+    """
+    Generate speech via ElevenLabs API and save as MP3.
+    Returns True on success, False on failure.
+    """
+    config = _request_config(voice_id)
+    if not config:
+        return False
+    url, headers, voice_id = config
+
+    chunks = _chunk_text(text)
+    print(f"Generating speech via ElevenLabs (voice: {voice_id[:8]}..., key: {headers['xi-api-key'][:8]}..., {len(chunks)} chunk(s))...")
 
     audio_parts = []
 
     try:
         for i, chunk in enumerate(chunks):
             print(f"  Chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
-            payload = {
-                "text": chunk,
-                "model_id": model,
-            }
-            resp = requests.post(url, json=payload, headers=headers, timeout=120)
-            resp.raise_for_status()
-            audio_parts.append(resp.content)
+            audio_parts.append(_generate_chunk(url, headers, chunk, model=model))
 
         if not audio_parts:
             print("No audio generated.")
             return False
 
-        # Concatenate MP3 chunks (MP3 frames are independently decodable)
-        with open(output_path, "wb") as f:
-            for part in audio_parts:
-                f.write(part)
+        # Crossfade + normalize the chunks; without MP3 support in libsndfile,
+        # concatenate them as-is (MP3 frames are independently decodable)
+        if not postprocess.process_encoded(audio_parts, output_path):
+            with open(output_path, "wb") as f:
+                for part in audio_parts:
+                    f.write(part)
 
         print(f"Audio saved to {output_path}")
         return True
@@ -6,7 +6,10 @@ Fast local text-to-speech using Kokoro-82M model.
 Purpose:
 - Converts text to audio using the Kokoro TTS pipeline
 - Supports multiple voices (American/British, Male/Female)
-- Caches pipelines per language code for efficiency
+- Caches pipelines per language code; they share one loaded model and the
+  voice packs (preloaded for KOKORO_VOICES)
+- KOKORO_ENGINE=onnx runs the exported model on ONNX Runtime instead of torch
+  (kokoro_onnx.py), falling back to torch when the model or a voice isn't exported
 
 Inputs/Outputs:
 - Input: text (str), output_path (str), voice (str, e.g. 'am_michael', 'bf_emma')
@@ -23,10 +26,11 @@ DOC:END
 
 import os
 import re
-import soundfile as sf
+import sys
+import threading
 import numpy as np
-import torch
-from kokoro import KPipeline
+
+from modules import audio_cache, audio_writer, g2p_cache, kokoro_pool, segment, tts_server
 
 
 def _strip_voice_tags(text):
@@ -37,57 +41,222 @@ def _strip_voice_tags(text):
     """
     return re.sub(r'\[(?:sighs?|exhales?|whispers?|laughs?|curious|excited|sarcastic|mischievously|happy)\]\s*', '', text)
 
+SAMPLE_RATE = 24000
+# Part of the audio cache key: bump when the model weights change
+MODEL_VERSION = "Kokoro-82M-v1.0"
+# Sentences per forward pass (kokoro_batch.py); 1 keeps KPipeline's one-segment loop.
+# Worth raising on many-core CPUs: python scripts/bench_kokoro_batch.py
+BATCH_SIZE = max(1, int(os.environ.get("KOKORO_BATCH_SIZE", "1")))
+# Inference engine: "torch" (KPipeline) or "onnx" (kokoro_onnx.py; torch stays the fallback)
+ENGINE = os.environ.get("KOKORO_ENGINE", "torch")
+
+REPO_ID = "hexgrad/Kokoro-82M"
+# Voices kept resident (the Kokoro hosts); the daemon, TTS server and pool workers preload them
+VOICES = [v.strip() for v in os.environ.get("KOKORO_VOICES", "bf_emma,af_bella,af_heart").split(",") if v.strip()]
+
 # Initialize pipeline once (global cache)
 # 'a' = American English
 PIPELINES = {}
+# One model and one set of voice packs behind every language's pipeline
+MODEL = None
+VOICE_PACKS = {}
+# Batch/daemon modes render from several threads; make sure the model loads once
+_INIT_LOCK = threading.Lock()
+
+def _load_model():
+    """The KModel all pipelines share. Caller holds _INIT_LOCK."""
+    global MODEL
+    if MODEL is None:
+        import torch
+        from kokoro import KModel
+        MODEL = KModel(repo_id=REPO_ID).to("cuda" if torch.cuda.is_available() else "cpu").eval()
+    return MODEL
 
 def init_pipeline(lang_code='a'):
     global PIPELINES
-    if lang_code not in PIPELINES:
-        try:
-            print(f"Initializing Kokoro Pipeline for language '{lang_code}'...")
-            PIPELINES[lang_code] = KPipeline(lang_code=lang_code) 
-        except Exception as e:
-            print(f"Error initializing Kokoro: {e}")
-            return None
+    with _INIT_LOCK:
+        if lang_code not in PIPELINES:
+            try:
+                print(f"Initializing Kokoro Pipeline for language '{lang_code}'...")
+                # torch + kokoro take seconds to import; only pay that when a pipeline is actually needed
+                from kokoro import KPipeline
+                # Languages differ only in their G2P front-end: the weights and voice packs are shared
+                pipeline = KPipeline(lang_code=lang_code, repo_id=REPO_ID, model=_load_model())
+                pipeline.voices = VOICE_PACKS
+                PIPELINES[lang_code] = pipeline
+            except Exception as e:
+                print(f"Error initializing Kokoro: {e}")
+                return None
     return PIPELINES[lang_code]
 
-def text_to_speech(text, output_path, voice='am_michael', speed=1.0):
+def _onnx_engine(voice=None):
     """
-    Converts text to speech using Kokoro and saves to output_path.
+    The ONNX Runtime engine when KOKORO_ENGINE=onnx and it can render voice
+    (its language is supported and its pack was exported), else None: torch renders it.
     """
-    # Strip voice direction tags (Kokoro reads them literally)
-    text = _strip_voice_tags(text)
+    if ENGINE != "onnx" or (voice[0] if voice else 'a') not in g2p_cache.LANGUAGES:
+        return None
+    from modules import kokoro_onnx
+    engine = kokoro_onnx.get()
+    if engine is None or (voice and not engine.has_voice(voice)):
+        return None
+    return engine
+
+def preload(voices=None):
+    """Load the model, a pipeline per language and the voice packs (default VOICES) up front."""
+    for voice in voices or VOICES:
+        engine = _onnx_engine(voice)
+        if engine:
+            engine.frontend(voice[0])
+            engine.load_voice(voice)
+            continue
+        pipeline = init_pipeline(voice[0])
+        if pipeline:
+            pipeline.load_voice(voice)
+
+def set_torch_threads(num_threads):
+    """Cap torch intra-op threads, so several render threads don't oversubscribe the CPU."""
+    if _onnx_engine() is not None and "torch" not in sys.modules:
+        return  # onnxruntime sizes its own pool (KOKORO_ONNX_THREADS); no torch voices loaded
+    import torch
+    torch.set_num_threads(max(1, num_threads))
 
-    # Derive language code from voice prefix (e.g. 'am_michael' -> 'a', 'bf_emma' -> 'b')
+def synthesize(text, voice='am_michael', speed=1.0):
+    """
+    Synthesize one piece of text and return (audio, sample_rate), or None on failure.
+
+    Used by the chunked and streaming renders, one chunk per call.
+    Sentences already rendered with the same voice and speed come from the audio cache;
+    with KOKORO_BATCH_SIZE > 1 the chunk's missing ones are rendered together in batches
+    (with AUDIO_CACHE=0 the whole chunk goes through iter_segments, batched the same way).
+    """
+    return audio_cache.cached_synthesize(
+        text, lambda sentence: _synthesize(sentence, voice, speed),
+        "kokoro", voice=voice, speed=speed, model=MODEL_VERSION,
+        render_many=(lambda sentences: _synthesize_many(sentences, voice, speed)) if _batched(voice) else None,
+    )
+
+
+def _batched(voice):
+    """Batched torch inference applies (KOKORO_BATCH_SIZE > 1 and not on the ONNX engine)."""
+    return BATCH_SIZE > 1 and _onnx_engine(voice) is None
+
+
+def iter_segments(text, voice='am_michael', speed=1.0):
+    """Yield audio arrays segment by segment as the pipeline renders them (used by the TTS server)."""
+    text = _strip_voice_tags(text)
     lang_code = voice[0] if voice else 'a'
 
+    engine = _onnx_engine(voice)
+    if engine:
+        yield from engine.render(g2p_cache.phonemize(engine.frontend(lang_code), text, pack=True), voice, speed)
+        return
+
     pipeline = init_pipeline(lang_code)
     if not pipeline:
-        return False
+        raise RuntimeError(f"Kokoro pipeline '{lang_code}' failed to load")
+    if not g2p_cache.supports(pipeline):
+        for _, _, audio in pipeline(text, voice=voice, speed=speed, split_pattern=r'\n+'):
+            yield audio.numpy() if hasattr(audio, "numpy") else audio
+        return
+
+    # Phonemes come from the G2P cache; only new sentences go through the phonemizer
+    if BATCH_SIZE > 1:
+        from modules import kokoro_batch
+        yield from kokoro_batch.render(pipeline, g2p_cache.phonemize(pipeline, text), voice, speed, BATCH_SIZE)
+        return
+    for ps in g2p_cache.phonemize(pipeline, text, pack=True):
+        for result in pipeline.generate_from_tokens(ps, voice=voice, speed=speed):
+            yield result.audio.numpy()
+
+
+def _synthesize(text, voice='am_michael', speed=1.0):
+    # A running TTS server already has the pipeline loaded; render there if we can
+    remote = tts_server.render("kokoro", text, voice=voice, speed=speed)
+    if remote is not None:
+        return remote
+    # Parallel mode: one of the pool's worker processes renders it (KOKORO_PROCESSES)
+    if kokoro_pool.enabled():
+        return kokoro_pool.render(text, voice, speed)
+    return _render_local(text, voice, speed)
+
+
+def _render_local(text, voice='am_michael', speed=1.0):
+    """Render in this process (also what each pool worker runs)."""
+    try:
+        segments = list(iter_segments(text, voice, speed))
+        if not segments:
+            return None
+        return np.concatenate(segments), SAMPLE_RATE
+    except Exception as e:
+        print(f"Error in TTS generation: {e}")
+        return None
+
+
+def _synthesize_many(sentences, voice='am_michael', speed=1.0):
+    """[(audio, sample_rate)] for several sentences, sharing batched forward passes; None on failure."""
+    if tts_server.status() is not None:
+        results = [_synthesize(sentence, voice, speed) for sentence in sentences]
+        return None if any(r is None for r in results) else results
+    if kokoro_pool.enabled():
+        results = list(kokoro_pool.render_many(sentences, voice, speed))
+        return None if any(r is None for r in results) else results
+
+    pipeline = init_pipeline(voice[0] if voice else 'a')
+    if not pipeline:
+        return None
+    try:
+        from modules import kokoro_batch
+        owners, segments = [], []
+        for n, sentence in enumerate(sentences):
+            for ps in g2p_cache.phonemize(pipeline, _strip_voice_tags(sentence)):
+                owners.append(n)
+                segments.append(ps)
+        pieces = [[] for _ in sentences]
+        for owner, audio in zip(owners, kokoro_batch.render(pipeline, segments, voice, speed, BATCH_SIZE)):
+            pieces[owner].append(audio)
+    except Exception as e:
+        print(f"Error in TTS generation: {e}")
+        return None
+    if not all(pieces):
+        return None
+    return [(np.concatenate(p), SAMPLE_RATE) for p in pieces]
+
+def _pool_segments(text, voice, speed):
+    """Paragraphs rendered across the process pool, yielded in script order."""
+    paragraphs = segment.paragraphs(_strip_voice_tags(text))
+    for n, result in enumerate(kokoro_pool.render_many(paragraphs, voice, speed)):
+        if result is None:
+            raise RuntimeError(f"paragraph {n + 1} of {len(paragraphs)} failed")
+        yield result[0]
+
+def text_to_speech(text, output_path, voice='am_michael', speed=1.0):
+    """
+    Converts text to speech using Kokoro and saves to output_path.
+    """
+    if kokoro_pool.enabled():
+        segments = _pool_segments(text, voice, speed)
+    else:
+        # Derive language code from voice prefix (e.g. 'am_michael' -> 'a', 'bf_emma' -> 'b')
+        lang_code = voice[0] if voice else 'a'
+
+        if not _onnx_engine(voice) and not init_pipeline(lang_code):
+            return False
+        # Segments come from the ONNX engine, the pipeline loop or batched forward passes (KOKORO_BATCH_SIZE)
+        segments = iter_segments(text, voice, speed)
 
     try:
-        # Generate audio
-        # generate() returns a generator of (graphemes, phonemes, audio)
-        generator = pipeline(text, voice=voice, speed=speed, split_pattern=r'\n+')
-        
-        all_audio = []
-        
         print("Generating audio segments...")
-        for i, (gs, ps, audio) in enumerate(generator):
-            # audio is a 1D numpy array
-            all_audio.append(audio)
-            
-        if not all_audio:
+        # Each segment goes straight to disk, so memory doesn't grow with the show
+        with audio_writer.AudioWriter(output_path, SAMPLE_RATE) as out:
+            for audio in segments:
+                # audio is a 1D numpy array
+                out.write(audio)
+
+        if not out.frames:
             print("No audio generated.")
             return False
-            
-        # Concatenate all segments
-        final_audio = np.concatenate(all_audio)
-        
-        # Save to file (24khz is standard for Kokoro usually)
-        sf.write(output_path, final_audio, 24000)
-        
+
         print(f"Audio saved to {output_path}")
         return True
         
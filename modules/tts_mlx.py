@@ -7,6 +7,24 @@ Two modes:
 
 Requires: pip install mlx-audio
 """
+"""
+DOC:START
+[One-sentence descriptor]
+
+Purpose:
+- [What this file does]
+
+Inputs/Outputs:
+- [If applicable]
+
+Side effects:
+- [DB writes, network calls, file writes]
+
+Run: [How to run/test]
+See: [Pointer to folder doc]
+DOC:END
+"""
+
 
 import os
 import re
@@ -86,9 +104,8 @@ def text_to_speech(text, output_path, instruct=None, ref_audio=None, ref_text=No
     text = _strip_voice_tags(text)
 
     try:
-        import mlx.core as mx
         import numpy as np
-        from mlx_audio.audio_io import write as audio_write
+        from modules.audio_writer import AudioWriter
 
         model = _get_model(model_path)
 
@@ -111,20 +128,17 @@ def text_to_speech(text, output_path, instruct=None, ref_audio=None, ref_text=No
 
         results = model.generate(**gen_kwargs)
 
-        audio_list = []
-        for result in results:
-            audio_list.append(result.audio)
+        # Write each generated segment as it arrives instead of concatenating at the end
+        with AudioWriter(output_path, model.sample_rate) as out:
+            for result in results:
+                out.write(np.array(result.audio))
 
-        if not audio_list:
+        if not out.frames:
             print("No audio generated.")
             return False
 
-        audio = mx.concatenate(audio_list, axis=0)
-        audio_np = np.array(audio)
-        audio_write(output_path, audio_np, model.sample_rate, format="wav")
-
         elapsed = time.time() - start
-        duration = len(audio_np) / model.sample_rate
+        duration = out.seconds
         rtf = duration / elapsed if elapsed > 0 else 0
         print(f"Audio saved to {output_path} ({duration:.1f}s audio in {elapsed:.1f}s, RTF: {rtf:.2f}x)")
         return True
@@ -0,0 +1,193 @@
+"""
+DOC:START
+TTS backend registry: one place that says what each engine can do.
+
+Purpose:
+- Declares each backend's limits and capabilities as plain metadata
+  (max chunk size, chunked/streaming support, safe concurrency, output
+  format, sample rate, warm-up cost, fallback engine)
+- Lets main.py pick chunking, parallelism and fallback from that metadata
+  instead of special-casing each engine
+- Imports a backend module only when that backend is actually used
+
+Inputs/Outputs:
+- Input: backend name or tts_config dict ({"backend": ..., "voice": ..., ...})
+- Output: metadata dicts, synth callables, fallback configs, concurrency slots
+
+Side effects:
+- Imports the backend module on first use (torch/kokoro, mlx-audio, ...)
+
+Run: imported by main.py and the tts_* modules
+See: modules/modules.md
+DOC:END
+"""
+
+import threading
+import importlib
+from contextlib import nullcontext
+
+# Every backend declares the same keys:
+#   module          backend module, imported lazily
+#   label           ">>> MODE" line; formatted with the tts_config (plus defaults)
+#   defaults        tts_config defaults (voice, mode, ...)
+#   voice_arg       synthesize() keyword the config's "voice" is passed as (None = not configurable here)
+#   max_chars       hard per-request text limit (None = no limit)
+#   chunked         renders piece by piece via synthesize(text) (checkpointable, cancellable)
+#   streaming       can start on the first paragraph while the LLM is still writing
+#   concurrency     renders that may run at once in one process (None = CPU-bound, use cores)
+#   format          output file format / extension
+#   sample_rate     output sample rate (Hz)
+#   warmup_seconds  rough one-off model load cost
+#   fallback        backend to retry with when this one fails (None = last resort)
+BACKENDS = {
+    "kokoro": {
+        "module": "modules.tts_kokoro",
+        "label": "Kokoro [Voice: {voice}]",
+        "defaults": {"voice": "bf_emma"},
+        "voice_arg": "voice",
+        "max_chars": None,
+        "chunked": True,
+        "streaming": True,
+        "concurrency": None,  # threads share one model; split torch threads across cores instead
+        "format": "wav",
+        "sample_rate": 24000,
+        "warmup_seconds": 8,
+        "fallback": None,
+    },
+    "voicebox": {
+        "module": "modules.tts_voicebox",
+        "label": "Voicebox (JEJ voice clone)",
+        "defaults": {},
+        "voice_arg": None,  # profile comes from VOICEBOX_PROFILE_ID / the server's first profile
+        "max_chars": 4500,  # Voicebox limit is 5000, leave headroom
+        "chunked": True,
+        "streaming": True,
+        "concurrency": 1,  # one local server, one GPU — parallel requests just queue there
+        "format": "wav",
+        "sample_rate": 24000,
+        "warmup_seconds": 0,  # model lives in the server process
+        "fallback": "kokoro",
+    },
+    "elevenlabs": {
+        "module": "modules.tts_elevenlabs",
+        "label": "ElevenLabs (Anaya)",
+        "defaults": {},
+        "voice_arg": None,  # voice_id comes from the environment / hosts.json
+        "max_chars": 5000,  # ElevenLabs limit per request for most models
+        "chunked": True,
+        "streaming": True,
+        "concurrency": 2,  # plan-level concurrent request limit
+        "format": "mp3",
+        "sample_rate": 44100,
+        "warmup_seconds": 0,
+        "fallback": "kokoro",
+    },
+    "mlx": {
+        "module": "modules.tts_mlx",
+        "label": "Qwen3-TTS Voice Clone [JEJ]",
+        "mode_labels": {"voicedesign": "Qwen3-TTS VoiceDesign [{instruct:.50}...]"},
+        # Extra text_to_speech() arguments per mode
+        "mode_args": {"voicedesign": ("instruct",)},
+        "defaults": {"mode": "clone", "instruct": "A warm, articulate radio presenter"},
+        "voice_arg": None,
+        "max_chars": None,
+        "chunked": False,  # one generate() call for the whole script: no chunk progress, can't cancel
+        "streaming": False,
+        "concurrency": 1,  # unified memory holds one 1.7B model
+        "format": "wav",
+        "sample_rate": 24000,
+        "warmup_seconds": 20,
+        "fallback": "kokoro",
+    },
+}
+
+_SLOTS = {}
+_SLOTS_LOCK = threading.Lock()
+
+
+def get(name):
+    """Metadata dict for a backend. Raises ValueError for an unknown name."""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{name}' (known: {', '.join(BACKENDS)})") from None
+
+
+def load(name):
+    """Import and return the backend's module."""
+    return importlib.import_module(get(name)["module"])
+
+
+def _config(tts_config):
+    """tts_config with the backend's defaults filled in."""
+    return {**get(tts_config["backend"])["defaults"], **tts_config}
+
+
+def label(tts_config):
+    """Human-readable mode line for a config."""
+    spec = get(tts_config["backend"])
+    config = _config(tts_config)
+    template = spec.get("mode_labels", {}).get(config.get("mode"), spec["label"])
+    return template.format(**config)
+
+
+def chunk_chars(name, preferred):
+    """Chunk size to use: the preferred size, capped at the backend's request limit."""
+    limit = get(name)["max_chars"]
+    return min(preferred, limit) if limit else preferred
+
+
+def pack_chars(name, default):
+    """Chunk size for a finished script: the backend's request limit (fewest requests), else default."""
+    return get(name)["max_chars"] or default
+
+
+def synth_fn(tts_config):
+    """callable(text) -> (audio, sr) | mp3 bytes | None for a chunked backend, else None."""
+    spec = get(tts_config["backend"])
+    if not spec["chunked"]:
+        return None
+    synthesize = load(tts_config["backend"]).synthesize
+    voice = _config(tts_config).get("voice")
+    if spec["voice_arg"] and voice:
+        kwargs = {spec["voice_arg"]: voice}
+        return lambda text: synthesize(text, **kwargs)
+    return synthesize
+
+
+def render_whole(tts_config, script, output_path):
+    """Render a whole script with a non-chunked backend's text_to_speech(). Returns success bool."""
+    spec = get(tts_config["backend"])
+    config = _config(tts_config)
+    kwargs = {arg: config[arg] for arg in spec.get("mode_args", {}).get(config.get("mode"), ())}
+    return load(tts_config["backend"]).text_to_speech(script, output_path, **kwargs)
+
+
+def fallback_config(name):
+    """tts_config for the backend to fall back to after `name` fails, or None."""
+    fallback = get(name)["fallback"]
+    if not fallback:
+        return None
+    return {"backend": fallback, **get(fallback)["defaults"]}
+
+
+def max_workers(name, requested):
+    """Cap a requested worker count at the backend's safe concurrency."""
+    limit = get(name)["concurrency"]
+    return min(requested, limit) if limit else requested
+
+
+def slot(name):
+    """
+    Context manager holding one of the backend's concurrency slots.
+
+    Batch and multi-listener runs render from several threads at once;
+    this keeps each backend at or under its declared concurrency.
+    """
+    limit = get(name)["concurrency"]
+    if not limit:
+        return nullcontext()
+    with _SLOTS_LOCK:
+        if name not in _SLOTS:
+            _SLOTS[name] = threading.BoundedSemaphore(limit)
+        return _SLOTS[name]
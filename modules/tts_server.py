@@ -0,0 +1,324 @@
+"""
+DOC:START
+Local TTS model server: loaded Kokoro/Sesame models shared across processes.
+
+Purpose:
+- Owns the loaded pipelines so batch jobs, reruns and the daemon stop paying
+  the model load each time
+- Unix socket API: one JSON request per connection, rendered audio streamed
+  back as length-prefixed float32 PCM frames as each segment finishes
+- Per-model concurrency slots plus a bounded wait queue; a full queue answers
+  "busy" and the caller renders in-process instead
+- Client side (render/stream) is used transparently by tts_kokoro and
+  tts_sesame whenever the server is running
+
+Inputs/Outputs:
+- Input: {"action": "render", "backend": "kokoro", "text": "...", "voice": "bf_emma", "speed": 1.0}
+         or {"action": "status"}
+- Output: JSON header line ({"ok": true, "sample_rate": 24000}), then frames:
+  4-byte big-endian byte count + float32 samples; a zero count ends the stream
+
+Side effects:
+- Creates/removes the socket file (default output/tts.sock); loads models
+
+Run: python -m modules.tts_server serve [--preload kokoro sesame] | status
+See: modules/modules.md
+DOC:END
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import socket
+import threading
+import traceback
+import socketserver
+
+import numpy as np
+
+SOCKET_PATH = os.environ.get(
+    "TTS_SERVER_SOCKET", os.path.join(os.path.dirname(__file__), "..", "output", "tts.sock")
+)
+# TTS_SERVER=0 makes every caller render in-process even if a server is up
+ENABLED = os.environ.get("TTS_SERVER", "1") != "0"
+
+# Renders that may run at once per model, and how many more may wait for a slot
+SLOTS = {
+    "kokoro": int(os.environ.get("TTS_SERVER_KOKORO_SLOTS", "2")),
+    "sesame": int(os.environ.get("TTS_SERVER_SESAME_SLOTS", "1")),
+}
+MAX_QUEUE = int(os.environ.get("TTS_SERVER_MAX_QUEUE", "8"))
+# Client side: longest wait for the server's next frame (queueing for a slot included) before
+# giving up and rendering in-process; connect and status get STATUS_TIMEOUT
+TIMEOUT = float(os.environ.get("TTS_SERVER_TIMEOUT", "120"))
+STATUS_TIMEOUT = 5.0
+
+_FRAME = struct.Struct(">I")
+
+
+# --- engines (server side) -------------------------------------------------------
+
+def _kokoro_segments(text, voice="am_michael", speed=1.0):
+    from modules import tts_kokoro
+    return tts_kokoro.SAMPLE_RATE, tts_kokoro.iter_segments(text, voice=voice, speed=speed)
+
+
+def _sesame_segments(text):
+    from modules import tts_sesame
+    if not tts_sesame.init_model():
+        raise RuntimeError("Sesame model failed to load")
+    return tts_sesame._sampling_rate(), (tts_sesame._render_segment(s)[0] for s in tts_sesame._split_segments(text))
+
+
+ENGINES = {"kokoro": _kokoro_segments, "sesame": _sesame_segments}
+
+
+def preload(backends):
+    """Load models up front so the first request doesn't pay for it."""
+    start = time.perf_counter()
+    for backend in backends:
+        if backend == "kokoro":
+            from modules import tts_kokoro
+            tts_kokoro.preload()
+        elif backend == "sesame":
+            from modules import tts_sesame
+            tts_sesame.init_model()
+    print(f"[tts-server] Loaded {', '.join(backends)} in {time.perf_counter() - start:.1f}s")
+
+
+class Busy(Exception):
+    pass
+
+
+class _Gate:
+    """Concurrency slots for one model plus a cap on requests waiting for them."""
+
+    def __init__(self, slots, max_queue):
+        self.slots = threading.BoundedSemaphore(slots)
+        self.size = slots
+        self.max_queue = max_queue
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.active = 0
+        self.served = 0
+
+    def __enter__(self):
+        with self.lock:
+            if self.waiting >= self.max_queue:
+                raise Busy()
+            self.waiting += 1
+        self.slots.acquire()
+        with self.lock:
+            self.waiting -= 1
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+            self.served += 1
+        self.slots.release()
+        return False
+
+    def status(self):
+        with self.lock:
+            return {"slots": self.size, "active": self.active, "waiting": self.waiting, "served": self.served}
+
+
+def _make_handler(gates, started):
+    class Handler(socketserver.StreamRequestHandler):
+        def _header(self, payload):
+            self.wfile.write((json.dumps(payload) + "\n").encode("utf-8"))
+
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+                action = request.pop("action", "render")
+            except (json.JSONDecodeError, AttributeError):
+                return self._header({"ok": False, "error": "expected one JSON object"})
+
+            if action == "status":
+                return self._header({
+                    "ok": True,
+                    "uptime": round(time.time() - started),
+                    "models": {name: gate.status() for name, gate in gates.items()},
+                    "max_queue": MAX_QUEUE,
+                })
+            if action != "render":
+                return self._header({"ok": False, "error": f"unknown action '{action}'"})
+
+            backend = request.pop("backend", None)
+            text = request.pop("text", "")
+            if backend not in gates:
+                return self._header({"ok": False, "error": f"unknown backend '{backend}' (serving {', '.join(gates)})"})
+
+            try:
+                with gates[backend]:
+                    self._render(backend, text, request)
+            except Busy:
+                self._header({"ok": False, "error": "busy"})
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client went away mid-stream
+
+        def _render(self, backend, text, params):
+            try:
+                sample_rate, segments = ENGINES[backend](text, **params)
+                sent_header = False
+                for audio in segments:
+                    data = np.ascontiguousarray(audio, dtype=np.float32).tobytes()
+                    if not sent_header:
+                        self._header({"ok": True, "sample_rate": sample_rate})
+                        sent_header = True
+                    self.wfile.write(_FRAME.pack(len(data)) + data)
+                    self.wfile.flush()
+                if not sent_header:
+                    return self._header({"ok": False, "error": "no audio generated"})
+                self.wfile.write(_FRAME.pack(0))
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                traceback.print_exc()
+                if not sent_header:
+                    self._header({"ok": False, "error": str(e)})
+                # After the header, closing without the end frame tells the client it failed
+
+    return Handler
+
+
+def serve(socket_path=SOCKET_PATH, preload_backends=("kokoro",)):
+    """Run the TTS server until interrupted."""
+    if preload_backends:
+        preload(preload_backends)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a previous run
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+
+    gates = {name: _Gate(slots, MAX_QUEUE) for name, slots in SLOTS.items()}
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _make_handler(gates, time.time()))
+    server.daemon_threads = True
+    os.chmod(socket_path, 0o600)
+    print(f"[tts-server] Listening on {socket_path} "
+          f"({', '.join(f'{n} x{s}' for n, s in SLOTS.items())}, queue {MAX_QUEUE})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[tts-server] Shutting down")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# --- client ---------------------------------------------------------------------------
+
+_announced = set()
+
+
+def _connect(socket_path, timeout=None):
+    """Connected client socket whose reads give up after timeout (default TIMEOUT), or None if no server answers."""
+    if not ENABLED or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(STATUS_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()  # stale socket file, server not running
+        return None
+    except socket.timeout:
+        sock.close()
+        print(f"   TTS server at {socket_path} isn't accepting connections — rendering in-process")
+        return None
+    sock.settimeout(timeout or TIMEOUT)
+    return sock
+
+
+def stream(backend, text, socket_path=SOCKET_PATH, **params):
+    """
+    Yield rendered segments as (audio, sample_rate) while the server renders.
+
+    Yields nothing if no server is running; raises RuntimeError if the server
+    refuses (busy, error) or the stream breaks off, socket.timeout if it
+    sends nothing for TIMEOUT seconds.
+    """
+    sock = _connect(socket_path)
+    if sock is None:
+        return
+    with sock, sock.makefile("rb") as f:
+        sock.sendall((json.dumps({"action": "render", "backend": backend, "text": text, **params}) + "\n").encode("utf-8"))
+        header = json.loads(f.readline() or b'{"ok": false, "error": "no response"}')
+        if not header.get("ok"):
+            raise RuntimeError(f"TTS server: {header.get('error')}")
+        sample_rate = header["sample_rate"]
+        while True:
+            prefix = f.read(_FRAME.size)
+            if len(prefix) < _FRAME.size:
+                raise RuntimeError("TTS server: stream ended early")
+            (size,) = _FRAME.unpack(prefix)
+            if size == 0:
+                return
+            data = f.read(size)
+            if len(data) < size:
+                raise RuntimeError("TTS server: stream ended early")
+            yield np.frombuffer(data, dtype=np.float32), sample_rate
+
+
+def render(backend, text, socket_path=SOCKET_PATH, **params):
+    """
+    Render text on the server. Returns (audio, sample_rate), or None if no
+    server is running or it couldn't take the request — render in-process then.
+    """
+    try:
+        pieces = list(stream(backend, text, socket_path=socket_path, **params))
+    except socket.timeout:
+        print(f"   TTS server sent nothing for {TIMEOUT:.0f}s — rendering in-process")
+        return None
+    except (RuntimeError, OSError) as e:
+        print(f"   {e} — rendering in-process")
+        return None
+    if not pieces:
+        return None
+    if backend not in _announced:
+        _announced.add(backend)
+        print(f"   Rendering {backend} on the TTS server ({socket_path})")
+    return np.concatenate([audio for audio, _ in pieces]), pieces[0][1]
+
+
+def status(socket_path=SOCKET_PATH):
+    """Server status dict, or None if not running (or not answering within STATUS_TIMEOUT)."""
+    sock = _connect(socket_path, timeout=STATUS_TIMEOUT)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile("rb") as f:
+            sock.sendall(b'{"action": "status"}\n')
+            return json.loads(f.readline())
+    except socket.timeout:
+        print(f"   TTS server at {socket_path} didn't answer within {STATUS_TIMEOUT:.0f}s")
+        return None
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local TTS model server")
+    parser.add_argument("action", choices=["serve", "status"])
+    parser.add_argument("--preload", nargs="*", choices=sorted(ENGINES), default=["kokoro"],
+                        help="Models to load at startup (default: kokoro)")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Socket path (TTS_SERVER_SOCKET)")
+    args = parser.parse_args()
+
+    if args.action == "serve":
+        serve(args.socket, args.preload)
+    else:
+        response = status(args.socket)
+        if response is None:
+            print(f"TTS server not running (no socket at {args.socket})")
+            sys.exit(1)
+        print(json.dumps(response, indent=2))
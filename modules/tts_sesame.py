@@ -24,9 +24,11 @@ DOC:END
 
 import torch
 from transformers import AutoProcessor, CsmForConditionalGeneration
-import soundfile as sf
 import os
 import sys
+import threading
+
+from modules import audio_cache, audio_writer, segment, tts_server
 
 # Monkey patch for torch.compiler.is_compiling if missing (common on some Mac builds)
 if not hasattr(torch, "compiler"):
@@ -36,16 +38,26 @@ if not hasattr(torch, "compiler"):
 elif not hasattr(torch.compiler, "is_compiling"):
     torch.compiler.is_compiling = lambda: False
 
+MODEL_ID = "sesame/csm-1b"
+# Longest text per generate() call (~15 s of speech, well inside max_new_tokens)
+SEGMENT_CHARS = int(os.environ.get("SESAME_SEGMENT_CHARS", "220"))
+
 # Global cache
 MODEL = None
 PROCESSOR = None
+# Batch mode renders from several threads; make sure the model loads once
+_INIT_LOCK = threading.Lock()
 
 def init_model():
+    with _INIT_LOCK:
+        return _init_model()
+
+def _init_model():
     global MODEL, PROCESSOR
     if MODEL is None:
         try:
             print("Loading Sesame CSM-1B (Production Mode)...")
-            model_id = "sesame/csm-1b"
+            model_id = MODEL_ID
             
             # Use MPS if available
             device = "mps" if torch.backends.mps.is_available() else "cpu"
@@ -65,71 +77,95 @@ def init_model():
             return False
     return True
 
+def _sampling_rate():
+    return MODEL.config.sampling_rate if hasattr(MODEL.config, 'sampling_rate') else 24000
+
+
+def _render_segment(chunk):
+    """Render one sentence-sized segment. Returns (audio, sample_rate)."""
+    # Sesame expects a speaker token. [0] is default.
+    if not chunk.startswith("["):
+        csm_input_text = f"[0]{chunk}"
+    else:
+        csm_input_text = chunk
+
+    # 1. Process inputs
+    inputs = PROCESSOR(text=csm_input_text, add_special_tokens=True).to(MODEL.device)
+
+    # 2. Generate
+    with torch.no_grad():
+        # Increased max_new_tokens just in case, though chunking helps most
+        output = MODEL.generate(**inputs, output_audio=True, max_new_tokens=2048)
+
+    # 3. Extract audio
+    # generate(output_audio=True) returns a list of waveform tensors, [1, T] or [T].
+    # Grab the tensor to CPU numpy for writing.
+    audio_tensor = output[0].cpu().float()
+
+    # Remove batch dim if present [1, T]
+    if audio_tensor.dim() == 2:
+        audio_tensor = audio_tensor.squeeze(0)
+
+    return audio_tensor.numpy(), _sampling_rate()
+
+
+def _render(chunk):
+    """Render a segment on the TTS server if one is running, else load the model here."""
+    remote = tts_server.render("sesame", chunk)
+    if remote is not None:
+        return remote
+    if not init_model():
+        raise RuntimeError("Sesame model failed to load")
+    return _render_segment(chunk)
+
+
+def _split_segments(text):
+    # Whole sentences packed up to SEGMENT_CHARS: the model's context can't take
+    # a paragraph, but one generate() call per short sentence wastes most of the time
+    return segment.pack(text, SEGMENT_CHARS, paragraph_joiner=" ")
+
+
+def synthesize(text):
+    """
+    Synthesize one piece of text and return (audio, sample_rate), or None on failure.
+
+    Renders segment by segment like text_to_speech (the model can't take a
+    whole paragraph); each packed segment is one cache unit and one generate()
+    call. Used by scripts/bench_tts.py.
+    """
+    try:
+        import numpy as np
+        pieces = [audio_cache.cached_synthesize(piece, _render, "sesame", model=MODEL_ID)
+                  for piece in _split_segments(text)]
+        if not pieces:
+            return None
+        return np.concatenate([audio for audio, _ in pieces]), pieces[0][1]
+    except Exception as e:
+        print(f"Error in Sesame generation: {e}")
+        return None
+
+
 def text_to_speech(text, output_path):
     """
     Generates audio using Sesame CSM-1B, chunking by sentence to handle long scripts.
     """
-    if not init_model():
-        return False
-        
+    # The model loads on the first segment that isn't cached or served by the TTS server
     try:
-        import numpy as np
-        device = MODEL.device
-        sampling_rate = MODEL.config.sampling_rate if hasattr(MODEL.config, 'sampling_rate') else 24000
-        
-        # Simple splitting by newline first (preserves structure) then by period
-        # This is a rough heuristic.
-        raw_chunks = text.replace('\n', '. ').split('.')
-        chunks = [c.strip() for c in raw_chunks if c.strip()]
-        
-        all_audio_segments = []
-        
+        chunks = _split_segments(text)
         print(f"Generating audio in {len(chunks)} segments...")
-        
-        for i, chunk in enumerate(chunks):
-            # Sesame expects a speaker token. [0] is default.
-            if not chunk.startswith("["):
-                csm_input_text = f"[0]{chunk}"
-            else:
-                csm_input_text = chunk
-            
-            print(f"  Segment {i+1}/{len(chunks)}: {chunk[:30]}...")
-            
-            # 1. Process inputs
-            inputs = PROCESSOR(text=csm_input_text, add_special_tokens=True).to(device)
-            
-            # 2. Generate
-            with torch.no_grad():
-                # Increased max_new_tokens just in case, though chunking helps most
-                output = MODEL.generate(**inputs, output_audio=True, max_new_tokens=2048)
-            
-            # 3. Extract audio
-            # Output audio is usually a tensor [1, T] or similar.
-            # We need to grab the waveform values.
-            # The structure from generate(output_audio=True) returns a wrapper or tensor depending on version.
-            # But earlier successful run suggested it returned something PROCESSOR.save_audio accepted.
-            # Usually it's output[0] or .audio
-            
-            # Let's inspect what PROCESSOR.save_audio does: it just writes the tensor.
-            # We will grab the tensor to CPU numpy for concatenation.
-            audio_tensor = output[0].cpu().float()
-            
-            # Remove batch dim if present [1, T]
-            if audio_tensor.dim() == 2:
-                audio_tensor = audio_tensor.squeeze(0)
-                
-            all_audio_segments.append(audio_tensor.numpy())
-            
-        # 4. Concatenate all segments
-        if not all_audio_segments:
+
+        # 4. Append each segment to the file as it's rendered
+        with audio_writer.AudioWriter(output_path) as out:
+            for i, chunk in enumerate(chunks):
+                print(f"  Segment {i+1}/{len(chunks)}: {chunk[:30]}...")
+                # A segment rendered before (same packed text) comes from the audio cache
+                audio, sample_rate = audio_cache.cached_synthesize(chunk, _render, "sesame", model=MODEL_ID)
+                out.write(audio, sample_rate)
+
+        if not out.frames:
             print("No audio generated.")
             return False
-            
-        final_audio = np.concatenate(all_audio_segments)
-        
-        # 5. Save
-        sf.write(output_path, final_audio, sampling_rate)
-        
+
         print(f"Full Audio saved to {output_path}")
         return True
         
@@ -5,7 +5,7 @@ TTS module using Voicebox (Qwen3-TTS + MLX) via REST API.
 Purpose:
 - Generates speech using a cloned voice profile via the Voicebox server
 - Supports voice cloning through pre-configured voice profiles
-- Chunks long text to stay within API limits, then concatenates audio
+- Chunks long text to stay within API limits, appending each chunk's audio to the file
 - Falls back gracefully when server is unavailable
 
 Inputs/Outputs:
@@ -25,63 +25,26 @@ import os
 import io
 import requests
 import soundfile as sf
-import numpy as np
 
-MAX_CHARS = 4500  # Voicebox limit is 5000, leave headroom
+from modules import audio_cache, audio_writer, segment, tts_registry
+
+MAX_CHARS = tts_registry.get("voicebox")["max_chars"]  # per-request limit, declared in the registry
 
 
 def _chunk_text(text):
-    """Split text into chunks under MAX_CHARS, splitting on paragraph then sentence boundaries."""
-    paragraphs = text.split("\n\n")
-    chunks = []
-    current = ""
-
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-        # If a single paragraph fits, accumulate
-        if len(current) + len(para) + 2 <= MAX_CHARS:
-            current = f"{current}\n\n{para}" if current else para
-        else:
-            # Flush current
-            if current:
-                chunks.append(current)
-            # If paragraph itself exceeds limit, split by sentence
-            if len(para) > MAX_CHARS:
-                sentences = para.replace(". ", ".\n").split("\n")
-                current = ""
-                for sent in sentences:
-                    sent = sent.strip()
-                    if not sent:
-                        continue
-                    if len(current) + len(sent) + 1 <= MAX_CHARS:
-                        current = f"{current} {sent}" if current else sent
-                    else:
-                        if current:
-                            chunks.append(current)
-                        current = sent
-            else:
-                current = para
-
-    if current:
-        chunks.append(current)
-
-    return chunks
+    """Split text into chunks under MAX_CHARS, packing whole paragraphs, then sentences."""
+    return segment.pack(text, MAX_CHARS)
 
 
-def text_to_speech(text, output_path, profile_id=None, language="en", seed=None):
-    """
-    Generates speech via the Voicebox REST API and saves to output_path.
-    Chunks long text automatically. Returns True on success, False on failure.
-    """
+def _resolve_server(profile_id=None):
+    """Return (base_url, profile_id) if the server is healthy and a profile is set, else None."""
     base_url = os.environ.get("VOICEBOX_URL", "http://localhost:8001")
     if profile_id is None:
         profile_id = os.environ.get("VOICEBOX_PROFILE_ID")
 
     if not profile_id:
         print("Error: No Voicebox profile ID. Set VOICEBOX_PROFILE_ID in .env.")
-        return False
+        return None
 
     # Health check
     try:
@@ -89,52 +52,91 @@ def text_to_speech(text, output_path, profile_id=None, language="en", seed=None)
         resp.raise_for_status()
     except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
         print(f"Voicebox server unreachable at {base_url}: {e}")
+        return None
+
+    return base_url, profile_id
+
+
+def _generate_chunk(base_url, profile_id, chunk, language="en", seed=None):
+    """Generate and download one chunk. Returns (audio, sample_rate); raises on HTTP errors."""
+    payload = {
+        "profile_id": profile_id,
+        "text": chunk,
+        "language": language,
+    }
+    if seed is not None:
+        payload["seed"] = seed
+
+    resp = requests.post(f"{base_url}/generate", json=payload, timeout=300)
+    resp.raise_for_status()
+    generation = resp.json()
+    generation_id = generation["id"]
+    duration = generation.get("duration", 0)
+    print(f"    {duration:.1f}s of audio")
+
+    # Download audio
+    resp = requests.get(f"{base_url}/audio/{generation_id}", timeout=120)
+    resp.raise_for_status()
+
+    return sf.read(io.BytesIO(resp.content))
+
+
+def synthesize(text, profile_id=None, language="en", seed=None):
+    """
+    Synthesize one piece of text (must fit in MAX_CHARS) and return
+    (audio, sample_rate), or None on failure.
+
+    Used by the streaming pipeline to render paragraphs as they arrive.
+    A chunk already rendered with the same profile and seed comes from the
+    audio cache; the server is only health-checked on a miss.
+    """
+    profile_id = profile_id or os.environ.get("VOICEBOX_PROFILE_ID")
+    server = []
+
+    def _render(chunk):
+        if not server:
+            resolved = _resolve_server(profile_id)
+            if not resolved:
+                return None
+            server.append(resolved)
+        base_url, resolved_profile = server[0]
+        try:
+            return _generate_chunk(base_url, resolved_profile, chunk, language=language, seed=seed)
+        except Exception as e:
+            print(f"Error in Voicebox generation: {e}")
+            return None
+
+    return audio_cache.cached_synthesize(text, _render, "voicebox", voice=profile_id,
+                                         model=f"{language}:{seed}")
+
+
+def text_to_speech(text, output_path, profile_id=None, language="en", seed=None):
+    """
+    Generates speech via the Voicebox REST API and saves to output_path.
+    Chunks long text automatically. Returns True on success, False on failure.
+    """
+    server = _resolve_server(profile_id)
+    if not server:
         return False
+    base_url, profile_id = server
 
     # Chunk text if needed
     chunks = _chunk_text(text)
     print(f"Generating speech via Voicebox (profile: {profile_id[:8]}..., {len(chunks)} chunk(s))...")
 
-    all_audio = []
-    sample_rate = None
-
     try:
-        for i, chunk in enumerate(chunks):
-            payload = {
-                "profile_id": profile_id,
-                "text": chunk,
-                "language": language,
-            }
-            if seed is not None:
-                payload["seed"] = seed
-
-            print(f"  Chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
-            resp = requests.post(f"{base_url}/generate", json=payload, timeout=300)
-            resp.raise_for_status()
-            generation = resp.json()
-            generation_id = generation["id"]
-            duration = generation.get("duration", 0)
-            print(f"    {duration:.1f}s of audio")
-
-            # Download audio
-            resp = requests.get(f"{base_url}/audio/{generation_id}", timeout=120)
-            resp.raise_for_status()
-
-            audio_data, sr = sf.read(io.BytesIO(resp.content))
-            all_audio.append(audio_data)
-            if sample_rate is None:
-                sample_rate = sr
-
-        if not all_audio:
+        # Chunks are appended to the file as they arrive rather than held until the end
+        with audio_writer.AudioWriter(output_path) as out:
+            for i, chunk in enumerate(chunks):
+                print(f"  Chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
+                audio_data, sr = _generate_chunk(base_url, profile_id, chunk, language=language, seed=seed)
+                out.write(audio_data, sr)
+
+        if not out.frames:
             print("No audio generated.")
             return False
 
-        # Concatenate all chunks
-        final_audio = np.concatenate(all_audio)
-        sf.write(output_path, final_audio, sample_rate)
-
-        total_duration = len(final_audio) / sample_rate
-        print(f"Audio saved to {output_path} ({total_duration:.1f}s total)")
+        print(f"Audio saved to {output_path} ({out.seconds:.1f}s total)")
         return True
 
     except Exception as e:
@@ -9,7 +9,7 @@ Purpose:
 - No API key required (Open-Meteo is free)
 
 Inputs/Outputs:
-- Input: Optional lat/long (defaults to Chamblee, GA)
+- Input: Optional lat/long/timezone (defaults to Chamblee, GA)
 - Output: Dict with 'summary', 'temp', 'condition'
 
 Side effects:
@@ -23,9 +23,9 @@ DOC:END
 import requests
 from datetime import datetime
 
-def get_weather(lat=33.89, long=-84.29): # Chamblee, GA coordinates
+def get_weather(lat=33.89, long=-84.29, timezone="America/New_York"): # Chamblee, GA coordinates
     """
-    Fetches weather for Chamblee, GA using Open-Meteo (Free, No Key).
+    Fetches weather for a location (default Chamblee, GA) using Open-Meteo (Free, No Key).
     """
     try:
         url = "https://api.open-meteo.com/v1/forecast"
@@ -35,10 +35,10 @@ def get_weather(lat=33.89, long=-84.29): # Chamblee, GA coordinates
             "current": "temperature_2m,weather_code",
             "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max",
             "temperature_unit": "fahrenheit",
-            "timezone": "America/New_York",
+            "timezone": timezone,
             "forecast_days": 1
         }
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=10)
         data = response.json()
         
         current = data.get('current', {})
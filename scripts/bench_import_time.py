@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+DOC:START
+Import-time budget check for main.py startup (what every --dry-run pays).
+
+Purpose:
+- Runs `python -X importtime -c "import main"` in a fresh interpreter (best of N)
+- Reports total startup import time and the slowest top-level imports
+- Fails if the total exceeds the budget, or if a TTS/LLM backend (torch, kokoro,
+  mlx-audio, openai) is imported before any backend was chosen
+
+Inputs/Outputs:
+- Input: --budget-ms (default IMPORT_BUDGET_MS or 1000), --runs, --top
+- Output: report on stdout; exit 1 over budget or on a forbidden import
+
+Side effects:
+- None (spawns short-lived Python subprocesses)
+
+Run: python scripts/bench_import_time.py [--budget-ms 1000] [--runs 3]
+DOC:END
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Heavy packages that must only load once a run actually needs that backend
+FORBIDDEN = ("torch", "kokoro", "mlx", "mlx_audio", "openai", "transformers")
+
+DEFAULT_BUDGET_MS = int(os.environ.get("IMPORT_BUDGET_MS", "1000"))
+
+
+def measure(statement="import main"):
+    """
+    Run statement under -X importtime in a fresh interpreter.
+
+    Returns list of (depth, package, self_us, cumulative_us) in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"'{statement}' failed: {tail[0]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        # Each nesting level adds two spaces after the single separator space
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(rows):
+    """(total_ms, top-level rows) — total is the sum of top-level cumulative times."""
+    top = [r for r in rows if r[0] == 0]
+    return sum(r[3] for r in top) / 1000.0, top
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if main.py startup imports exceed a time budget")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS, help="Max total import time (ms)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--statement", default="import main", help="What to import (default: import main)")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        try:
+            rows = measure(args.statement)
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        total, top = summarize(rows)
+        if best is None or total < best[0]:
+            best = (total, top, rows)
+
+    total, top, rows = best
+    print(f"{args.statement}: {total:.0f} ms of imports (best of {args.runs}, budget {args.budget_ms} ms)")
+    print(f"{'cumulative ms':>14}  package")
+    for _, name, _, cumulative_us in sorted(top, key=lambda r: -r[3])[:args.top]:
+        print(f"{cumulative_us / 1000.0:>14.1f}  {name}")
+
+    loaded = {name.split(".")[0] for _, name, _, _ in rows}
+    forbidden = sorted(loaded.intersection(FORBIDDEN))
+
+    failed = False
+    if forbidden:
+        print(f"FAIL: backend packages imported at startup: {', '.join(forbidden)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"FAIL: {total:.0f} ms is over the {args.budget_ms} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
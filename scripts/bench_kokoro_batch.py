@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+DOC:START
+Benchmark for batched Kokoro inference (modules/kokoro_batch.py).
+
+Purpose:
+- Renders the same text with KPipeline's one-segment-at-a-time loop (what
+  tts_kokoro does with KOKORO_BATCH_SIZE=1) and with batched forward passes
+  at each --batch-sizes value
+- Reports seconds, x real time and the speed-up over the loop, so
+  KOKORO_BATCH_SIZE can be set for this machine
+
+Inputs/Outputs:
+- Input: the most recent scripts in output/scripts/ (or --text), --batch-sizes, --threads
+- Output: report on stdout
+
+Side effects:
+- Loads the Kokoro model (downloads it on first run)
+
+Run: python scripts/bench_kokoro_batch.py [--batch-sizes 2 4 8] [--threads 8]
+DOC:END
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import tts_kokoro
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "output", "scripts")
+
+
+def load_text(path=None, count=2, max_chars=3000):
+    """Text to render: --text, or the `count` most recent scripts cut to max_chars at a paragraph break."""
+    paths = [path] if path else sorted(glob.glob(os.path.join(SCRIPTS_DIR, "script_*.txt")))[-count:]
+    parts = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            text = tts_kokoro._strip_voice_tags(f.read())
+        if len(text) > max_chars:
+            cut = text.rfind("\n\n", 0, max_chars)
+            text = text[:cut if cut > 0 else max_chars]
+        parts.append(text)
+    return "\n\n".join(parts)
+
+
+def time_loop(pipeline, text, voice):
+    start = time.perf_counter()
+    samples = sum(len(audio) for _, _, audio in pipeline(text, voice=voice, split_pattern=r'\n+')
+                  if audio is not None)
+    return time.perf_counter() - start, samples
+
+
+def time_batched(pipeline, text, voice, batch_size):
+    from modules import g2p_cache, kokoro_batch
+    g2p_cache.ENABLED = False  # both sides pay for G2P; this measures inference
+    start = time.perf_counter()
+    segments = g2p_cache.phonemize(pipeline, text)
+    samples = sum(len(audio) for audio in kokoro_batch.render(pipeline, segments, voice, batch_size=batch_size))
+    return time.perf_counter() - start, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Kokoro's pipeline loop with batched inference")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--voice", default="am_michael")
+    parser.add_argument("--text", help="Text file to render (default: recent output/scripts/)")
+    parser.add_argument("--count", type=int, default=2, help="Scripts in the corpus")
+    parser.add_argument("--max-chars", type=int, default=3000, help="Characters per script")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (default: torch's own)")
+    args = parser.parse_args()
+
+    text = load_text(args.text, args.count, args.max_chars)
+    if not text.strip():
+        print("No text to render (output/scripts/ is empty; pass --text)")
+        sys.exit(1)
+    if args.threads:
+        tts_kokoro.set_torch_threads(args.threads)
+    pipeline = tts_kokoro.init_pipeline(args.voice[0])
+    if not pipeline:
+        sys.exit(1)
+
+    import torch
+    print(f"{len(text)} chars, voice {args.voice}, {torch.get_num_threads()} torch thread(s)")
+    time_loop(pipeline, "Good morning.", args.voice)  # warm up (voice load, first-call allocations)
+
+    base, samples = time_loop(pipeline, text, args.voice)
+    seconds = samples / tts_kokoro.SAMPLE_RATE
+    print(f"  loop:      {base:6.1f} s for {seconds:.0f} s of audio — {seconds / base:.2f}x real time")
+    best = (1, base)
+    for batch_size in args.batch_sizes:
+        elapsed, samples = time_batched(pipeline, text, args.voice, batch_size)
+        seconds = samples / tts_kokoro.SAMPLE_RATE
+        print(f"  batch {batch_size:<3} {elapsed:6.1f} s for {seconds:.0f} s of audio — "
+              f"{seconds / elapsed:.2f}x real time, {base / elapsed:.2f}x the loop")
+        if elapsed < best[1]:
+            best = (batch_size, elapsed)
+    print(f"Fastest: KOKORO_BATCH_SIZE={best[0]}")
+
+
+if __name__ == "__main__":
+    main()
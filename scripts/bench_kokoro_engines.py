@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+DOC:START
+Side-by-side benchmark of Kokoro's inference engines: torch vs ONNX Runtime.
+
+Purpose:
+- Renders the same output/scripts/ corpus (bench_tts.py's corpus, chunked
+  the same way) with KOKORO_ENGINE=torch, onnx and onnx with the int8 model
+- Each engine runs in its own subprocess, so startup (imports + model and
+  voice load) and peak RSS are its own; caches, the TTS server and the
+  process pool are off
+- Reports startup seconds, RTF, time to first audio and peak RSS, and
+  whether torch was imported at all; audio length per engine is compared
+  with torch's (same phonemes and durations -> same length)
+
+Inputs/Outputs:
+- Input: --engines, --voice, --scripts, --max-chars, --threads
+- Output: table on stdout; --out writes the results as JSON
+
+Side effects:
+- Loads the Kokoro model in each engine (the ONNX ones need
+  `python -m modules.kokoro_onnx export [--int8]` first)
+
+Run: python scripts/bench_kokoro_engines.py [--engines torch onnx onnx-int8] [--voice bf_emma]
+DOC:END
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import bench_tts
+
+REPO_ROOT = bench_tts.REPO_ROOT
+
+# name -> environment for the worker
+ENGINES = {
+    "torch": {"KOKORO_ENGINE": "torch"},
+    "onnx": {"KOKORO_ENGINE": "onnx", "KOKORO_ONNX_INT8": "0"},
+    "onnx-int8": {"KOKORO_ENGINE": "onnx", "KOKORO_ONNX_INT8": "1"},
+}
+
+
+def run_worker(name, corpus, voices, threads=None):
+    """Start the engine, render the corpus (script i in voices[i % len(voices)]); returns the result dict."""
+    sys.path.insert(0, REPO_ROOT)
+    start = time.perf_counter()
+    from modules import segment, stream, tts_kokoro
+
+    result = {"engine": name, "available": False}
+    if threads:
+        tts_kokoro.set_torch_threads(threads)
+    tts_kokoro.preload(voices)
+    onnx = all(tts_kokoro._onnx_engine(v) is not None for v in voices)
+    if name != "torch" and not onnx:
+        result["error"] = "ONNX model or voices not exported (python -m modules.kokoro_onnx export --int8 --voices ...)"
+        return result
+    if name == "torch" and not all(v[0] in tts_kokoro.PIPELINES for v in voices):
+        result["error"] = "Kokoro pipeline failed to load"
+        return result
+    result["startup_seconds"] = time.perf_counter() - start
+
+    chunk_seconds, audio_seconds, first_audio = [], 0.0, None
+    render_start = time.perf_counter()
+    for n, script in enumerate(corpus):
+        voice = voices[n % len(voices)]
+        for chunk in segment.pack(script["text"], stream.MAX_PARAGRAPH_CHARS):
+            chunk_start = time.perf_counter()
+            rendered = tts_kokoro.synthesize(chunk, voice=voice)
+            if rendered is None:
+                result["error"] = f"render failed in {script['name']}"
+                return result
+            chunk_seconds.append(time.perf_counter() - chunk_start)
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+            audio, sample_rate = rendered
+            audio_seconds += len(audio) / sample_rate
+    render_seconds = time.perf_counter() - render_start
+
+    result.update({
+        "available": True,
+        "render_seconds": render_seconds,
+        "audio_seconds": audio_seconds,
+        "rtf": render_seconds / audio_seconds if audio_seconds else None,
+        "first_audio_seconds": first_audio,
+        "chunks": len(chunk_seconds),
+        "chunk_p95": bench_tts._percentile(chunk_seconds, 95),
+        "peak_rss_mb": bench_tts._peak_rss_mb(),
+        "torch_imported": "torch" in sys.modules,
+    })
+    return result
+
+
+def spawn_worker(name, corpus_path, voices, threads):
+    """Run one engine in a fresh interpreter; returns its result dict."""
+    env = {
+        **os.environ, **ENGINES[name],
+        # Cached sentences or phonemes would measure the disk; the pool and server aren't the engine
+        "AUDIO_CACHE": "0", "G2P_CACHE": "0", "TTS_SERVER": "0", "KOKORO_PROCESSES": "0", "KOKORO_BATCH_SIZE": "1",
+    }
+    if threads:
+        env["KOKORO_ONNX_THREADS"] = str(threads)
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", name, "--corpus-file", corpus_path,
+           "--voice", *voices]
+    if threads:
+        cmd += ["--threads", str(threads)]
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, json.JSONDecodeError):
+        tail = (proc.stderr.strip().splitlines() or ["(no output)"])[-1]
+        return {"engine": name, "available": False, "error": f"worker crashed: {tail}"}
+
+
+def print_table(results):
+    print(f"{'engine':<10} {'start s':>8} {'rtf':>6} {'ttfa s':>7} {'p95 s':>7} {'rss MB':>7} {'audio s':>8}  torch")
+    base = next((r for r in results if r["engine"] == "torch" and r.get("available")), None)
+    for r in results:
+        if not r.get("available"):
+            print(f"{r['engine']:<10} skipped: {r.get('error', 'unavailable')}")
+            continue
+        print(f"{r['engine']:<10} {r['startup_seconds']:>8.2f} {r['rtf']:>6.3f} {r['first_audio_seconds']:>7.2f} "
+              f"{r['chunk_p95']:>7.2f} {r['peak_rss_mb']:>7.0f} {r['audio_seconds']:>8.1f}  "
+              f"{'yes' if r['torch_imported'] else 'no'}")
+    for r in results:
+        if base and r is not base and r.get("available"):
+            drift = abs(r["audio_seconds"] / base["audio_seconds"] - 1)
+            if drift > 0.01:
+                print(f"WARNING: {r['engine']} audio is {drift:.1%} off torch's length — phonemes or voices differ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Kokoro on torch and ONNX Runtime")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--voice", nargs="+", default=["bf_emma"], help="Kokoro voice(s), rotated per script")
+    parser.add_argument("--scripts", type=int, default=3, help="Most recent scripts to use")
+    parser.add_argument("--max-chars", type=int, default=2000, help="Per-script length cap (cut at a paragraph)")
+    parser.add_argument("--threads", type=int, help="Intra-op threads for both engines (default: their own)")
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.corpus_file, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+        print(json.dumps(run_worker(args.worker, corpus, args.voice, args.threads)))
+        return
+
+    corpus = bench_tts.load_corpus(None, args.scripts, args.max_chars)
+    if not corpus:
+        print(f"ERROR: no scripts in {bench_tts.SCRIPTS_DIR}")
+        sys.exit(1)
+    print(f"Corpus: {', '.join(c['name'] for c in corpus)} ({sum(len(c['text']) for c in corpus)} chars)")
+
+    os.makedirs(bench_tts.BENCH_DIR, exist_ok=True)
+    corpus_path = os.path.join(bench_tts.BENCH_DIR, ".engines_corpus.json")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f)
+    results = []
+    for name in args.engines:
+        print(f"Running {name}...")
+        results.append(spawn_worker(name, corpus_path, args.voice, args.threads))
+    os.remove(corpus_path)
+
+    print_table(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"corpus": [c["name"] for c in corpus], "voices": args.voice, "engines": results}, f, indent=2)
+        print(f"Results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
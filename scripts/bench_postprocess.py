@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+DOC:START
+Benchmark for the audio post-processing stage (modules/postprocess.py).
+
+Purpose:
+- Builds a synthetic show (default 5 minutes at 24 kHz): speech-like bursts in
+  chunks at deliberately uneven levels, with short and overlong pauses
+- Times postprocess.process() (crossfade join, LUFS normalization, silence capping)
+- Reports the speed-up over real time and the chunk loudness spread before vs. the result
+- Fails if the stage is slower than --min-speed x real time
+
+Inputs/Outputs:
+- Input: --minutes, --sample-rate, --chunks, --runs, --min-speed
+- Output: report on stdout; exit 1 under the speed floor
+
+Side effects:
+- None
+
+Run: python scripts/bench_postprocess.py [--minutes 5] [--min-speed 100]
+DOC:END
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import postprocess
+
+
+def synthetic_show(minutes, sample_rate, chunks, seed=0):
+    """Chunks of band-limited noise 'sentences' (0.8–4 s) separated by 0.2–3 s pauses, each chunk at its own level."""
+    rng = np.random.default_rng(seed)
+    per_chunk = int(minutes * 60 * sample_rate / chunks)
+    pieces = []
+    for _ in range(chunks):
+        audio = np.zeros(per_chunk, dtype=np.float32)
+        position = 0
+        while position < per_chunk:
+            length = int(rng.uniform(0.8, 4.0) * sample_rate)
+            burst = rng.standard_normal(length).astype(np.float32)
+            burst = np.convolve(burst, np.ones(8, dtype=np.float32) / 8, mode="same")  # soften the top end
+            envelope = np.abs(np.sin(np.linspace(0, rng.uniform(4, 12) * np.pi, length, dtype=np.float32)))
+            segment = (burst * envelope)[:per_chunk - position]
+            audio[position:position + len(segment)] = segment
+            position += length + int(rng.uniform(0.2, 3.0) * sample_rate)
+        pieces.append(audio * np.float32(10 ** (rng.uniform(-30, -12) / 20)))
+    return pieces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the post-processing stage on a synthetic show")
+    parser.add_argument("--minutes", type=float, default=5.0, help="Show length")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--chunks", type=int, default=20, help="Chunks to join (one crossfade per boundary)")
+    parser.add_argument("--runs", type=int, default=3, help="Repeats; the fastest counts")
+    parser.add_argument("--min-speed", type=float, default=100.0, help="Fail below this many x real time")
+    args = parser.parse_args()
+
+    pieces = synthetic_show(args.minutes, args.sample_rate, args.chunks)
+    duration = sum(len(p) for p in pieces) / args.sample_rate
+    levels = [postprocess.integrated_loudness(p, args.sample_rate) for p in pieces]
+
+    postprocess.process(pieces[:2], args.sample_rate)  # warm up (scipy import, allocations)
+    best = None
+    for _ in range(max(1, args.runs)):
+        start = time.perf_counter()
+        audio, _ = postprocess.process(pieces, args.sample_rate)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    after = postprocess.integrated_loudness(audio, args.sample_rate)
+    speed = duration / best if best > 0 else float("inf")
+    print(f"{duration / 60:.1f} min show, {args.chunks} chunks @ {args.sample_rate} Hz")
+    print(f"  post-process: {best * 1000:.0f} ms (best of {args.runs}) — {speed:.0f}x real time")
+    print(f"  loudness: chunks at {min(levels):.1f}..{max(levels):.1f} LUFS -> show at {after:.1f} LUFS "
+          f"(target {postprocess.TARGET_LUFS:.0f})")
+    print(f"  silence capping: {duration - len(audio) / args.sample_rate:.1f} s removed")
+
+    if speed < args.min_speed:
+        print(f"FAIL: {speed:.0f}x is under the {args.min_speed:.0f}x floor")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+DOC:START
+TTS throughput benchmark: the same script corpus through every local backend.
+
+Purpose:
+- Renders a fixed corpus from output/scripts/*.txt (the same files every run,
+  pinned by the baseline) through Kokoro, Sesame and Voicebox, chunked the way
+  main.py chunks them, with the audio cache off
+- Voicebox talks to a local stand-in server (same REST API, synthetic audio,
+  configurable speed) unless --real-voicebox is given
+- Each backend runs in its own subprocess so peak RSS is its own
+- Records RTF (render seconds per audio second, as in the metrics table),
+  time-to-first-audio, model load time, peak RSS and the per-chunk latency
+  distribution to a JSON results file
+- Compares against a stored baseline and fails on regressions
+
+Inputs/Outputs:
+- Input: --backends, --voice (one or more Kokoro voices), --scripts, --max-chars, --baseline, --tolerance
+- Output: output/bench/tts_<timestamp>.json; exit 1 on a regression
+
+Side effects:
+- Loads TTS models; --save-baseline overwrites the baseline file
+
+Run: python scripts/bench_tts.py [--backends kokoro voicebox] [--save-baseline]
+DOC:END
+"""
+
+import io
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import threading
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "output", "scripts")
+BENCH_DIR = os.path.join(REPO_ROOT, "output", "bench")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "tts_baseline.json")
+
+BACKENDS = ("kokoro", "sesame", "voicebox")
+
+# Lower is better for all of these; a value more than --tolerance above baseline is a regression
+COMPARED = ("rtf", "first_audio_seconds", "chunk_p95", "peak_rss_mb")
+
+
+# --- corpus -----------------------------------------------------------------
+
+def _trim(text, max_chars):
+    """Cut text at the last paragraph break before max_chars (whole text if it fits)."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n\n", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars]
+
+
+def load_corpus(names=None, count=3, max_chars=2000):
+    """
+    [{"name", "text"}] from output/scripts/. With names (from a baseline) those
+    exact files are used; otherwise the `count` most recent scripts.
+    """
+    if not names:
+        paths = sorted(glob.glob(os.path.join(SCRIPTS_DIR, "script_*.txt")))[-count:]
+        names = [os.path.basename(p) for p in paths]
+    corpus = []
+    for name in names:
+        path = os.path.join(SCRIPTS_DIR, name)
+        if not os.path.exists(path):
+            print(f"WARNING: corpus script {name} is missing")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            corpus.append({"name": name, "text": _trim(f.read(), max_chars)})
+    return corpus
+
+
+def corpus_digest(corpus):
+    return hashlib.sha1("\0".join(c["text"] for c in corpus).encode("utf-8")).hexdigest()[:12]
+
+
+# --- stand-in Voicebox server -------------------------------------------------
+
+def start_standin_voicebox(rtf, chars_per_second=15.0, sample_rate=24000):
+    """
+    Serve Voicebox's /health, /generate and /audio/<id> on a free local port.
+
+    Audio is quiet noise, as long as the text would take to read
+    (chars_per_second); /generate sleeps rtf x that duration to stand in for
+    the model. Returns the base URL.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import numpy as np
+    import soundfile as sf
+
+    generations = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._send(200, b'{"status": "ok"}', "application/json")
+            if self.path.startswith("/audio/"):
+                with lock:
+                    body = generations.pop(self.path[len("/audio/"):], None)
+                if body is None:
+                    return self._send(404, b"{}", "application/json")
+                return self._send(200, body, "audio/wav")
+            self._send(404, b"{}", "application/json")
+
+        def do_POST(self):
+            if self.path != "/generate":
+                return self._send(404, b"{}", "application/json")
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            duration = max(0.5, len(payload.get("text", "")) / chars_per_second)
+            time.sleep(duration * rtf)
+            audio = np.random.default_rng(len(payload["text"])).standard_normal(int(duration * sample_rate))
+            buf = io.BytesIO()
+            sf.write(buf, (audio * 0.05).astype(np.float32), sample_rate, format="WAV")
+            with lock:
+                generation_id = f"gen{len(generations)}_{time.monotonic_ns()}"
+                generations[generation_id] = buf.getvalue()
+            body = json.dumps({"id": generation_id, "duration": duration}).encode("utf-8")
+            self._send(200, body, "application/json")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- worker (one backend, own process) ---------------------------------------------
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, -(-pct * len(ordered) // 100) - 1)]
+
+
+def _load_backend(name, voices):
+    """
+    (load(), synth(text, voice)) for a backend; load() returns False if the model/server isn't usable.
+
+    Kokoro loads every voice in voices (one shared model, a pipeline per
+    language); the other backends ignore the voice.
+    """
+    if name == "kokoro":
+        from modules import tts_kokoro
+
+        def load():
+            tts_kokoro.preload(voices)
+            return all(v[0] in tts_kokoro.PIPELINES for v in voices)
+        return load, lambda text, voice: tts_kokoro.synthesize(text, voice=voice)
+    if name == "sesame":
+        from modules import tts_sesame
+        return tts_sesame.init_model, lambda text, voice: tts_sesame.synthesize(text)
+    if name == "voicebox":
+        from modules import tts_voicebox
+        return (lambda: tts_voicebox._resolve_server() is not None, lambda text, voice: tts_voicebox.synthesize(text))
+    raise ValueError(f"Unknown backend '{name}'")
+
+
+def run_worker(name, corpus, voices):
+    """Render the corpus with one backend, script i in voices[i % len(voices)]. Returns the result dict."""
+    sys.path.insert(0, REPO_ROOT)
+    from modules import segment, stream, tts_registry
+
+    result = {"backend": name, "available": False}
+    start = time.perf_counter()
+    try:
+        load, synth = _load_backend(name, voices)
+        ready = load()
+    except ImportError as e:
+        result["error"] = f"not installed: {e}"
+        return result
+    if not ready:
+        result["error"] = "model or server unavailable"
+        return result
+    result["load_seconds"] = time.perf_counter() - start
+
+    # Same chunking as main.py (Sesame isn't in the registry; it splits further itself)
+    max_chars = (tts_registry.pack_chars(name, stream.MAX_PARAGRAPH_CHARS)
+                 if name in tts_registry.BACKENDS else stream.MAX_PARAGRAPH_CHARS)
+    chunk_seconds, audio_seconds, first_audio = [], 0.0, None
+    render_start = time.perf_counter()
+    for n, script in enumerate(corpus):
+        voice = voices[n % len(voices)]
+        for chunk in segment.pack(script["text"], max_chars):
+            chunk_start = time.perf_counter()
+            rendered = synth(chunk, voice)
+            if rendered is None:
+                result["error"] = f"render failed in {script['name']}"
+                return result
+            chunk_seconds.append(time.perf_counter() - chunk_start)
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+            audio, sample_rate = rendered
+            audio_seconds += len(audio) / sample_rate
+    render_seconds = time.perf_counter() - render_start
+
+    result.update({
+        "available": True,
+        "render_seconds": render_seconds,
+        "audio_seconds": audio_seconds,
+        "rtf": render_seconds / audio_seconds if audio_seconds else None,
+        "first_audio_seconds": first_audio,
+        "chunks": len(chunk_seconds),
+        "chunk_p50": _percentile(chunk_seconds, 50),
+        "chunk_p95": _percentile(chunk_seconds, 95),
+        "chunk_max": max(chunk_seconds),
+        "chunk_seconds": [round(s, 4) for s in chunk_seconds],
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+    return result
+
+
+def spawn_worker(name, corpus_path, voices, env):
+    """Run one backend in a fresh interpreter; returns its result dict."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", name, "--corpus-file", corpus_path, "--voice", *voices],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, json.JSONDecodeError):
+        tail = (proc.stderr.strip().splitlines() or ["(no output)"])[-1]
+        return {"backend": name, "available": False, "error": f"worker crashed: {tail}"}
+
+
+# --- comparison -----------------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """List of regression strings: a compared metric more than tolerance above the baseline."""
+    if baseline.get("corpus_digest") != results["corpus_digest"]:
+        print("WARNING: corpus differs from the baseline's — comparison is approximate")
+    if baseline.get("kokoro_voices", ["bf_emma"]) != results["kokoro_voices"]:
+        print("WARNING: Kokoro voices differ from the baseline's — its RSS and RTF aren't comparable")
+    base = {r["backend"]: r for r in baseline.get("backends", []) if r.get("available")}
+    regressions = []
+    for r in results["backends"]:
+        if not r.get("available") or r["backend"] not in base:
+            continue
+        for key in COMPARED:
+            old, new = base[r["backend"]].get(key), r.get(key)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{r['backend']} {key}: {old:.3f} -> {new:.3f} (+{(new / old - 1):.0%})")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'backend':<10} {'rtf':>6} {'ttfa s':>7} {'load s':>7} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'rss MB':>7}")
+    for r in results["backends"]:
+        if not r.get("available"):
+            print(f"{r['backend']:<10} skipped: {r.get('error', 'unavailable')}")
+            continue
+        print(f"{r['backend']:<10} {r['rtf']:>6.3f} {r['first_audio_seconds']:>7.2f} {r['load_seconds']:>7.2f} "
+              f"{r['chunk_p50']:>7.2f} {r['chunk_p95']:>7.2f} {r['chunk_max']:>7.2f} {r['peak_rss_mb']:>7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS backends on the archived script corpus")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--scripts", type=int, default=3, help="Most recent scripts to use (without a baseline)")
+    parser.add_argument("--max-chars", type=int, default=2000, help="Per-script length cap (cut at a paragraph)")
+    parser.add_argument("--voice", nargs="+", default=["bf_emma"],
+                        help="Kokoro voice(s); several rotate per script like a multi-host week (peak RSS)")
+    parser.add_argument("--real-voicebox", action="store_true", help="Use VOICEBOX_URL instead of the stand-in server")
+    parser.add_argument("--standin-rtf", type=float, default=0.3, help="Stand-in Voicebox render time per audio second")
+    parser.add_argument("--out", help="Results file (default output/bench/tts_<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before flagging (0.15 = 15%%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.corpus_file, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+        print(json.dumps(run_worker(args.worker, corpus, args.voice)))
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    corpus = load_corpus(baseline["corpus"] if baseline else None, args.scripts, args.max_chars)
+    if not corpus:
+        print(f"ERROR: no scripts in {SCRIPTS_DIR}")
+        sys.exit(1)
+    print(f"Corpus: {', '.join(c['name'] for c in corpus)} ({sum(len(c['text']) for c in corpus)} chars)")
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    corpus_path = os.path.join(BENCH_DIR, ".corpus.json")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f)
+
+    # Cached sentences would measure the disk, not the engine
+    env = {**os.environ, "AUDIO_CACHE": "0", "TTS_SERVER": "0"}
+    if "voicebox" in args.backends and not args.real_voicebox:
+        env["VOICEBOX_URL"] = start_standin_voicebox(args.standin_rtf)
+        env.setdefault("VOICEBOX_PROFILE_ID", "standin")
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "corpus": [c["name"] for c in corpus],
+        "corpus_digest": corpus_digest(corpus),
+        "voicebox": "real" if args.real_voicebox else f"stand-in (rtf {args.standin_rtf})",
+        "kokoro_voices": args.voice,
+        "backends": [],
+    }
+    for name in args.backends:
+        print(f"Running {name}...")
+        results["backends"].append(spawn_worker(name, corpus_path, args.voice, env))
+    os.remove(corpus_path)
+
+    print_table(results)
+    out = args.out or os.path.join(BENCH_DIR, f"tts_{datetime.datetime.now():%Y-%m-%d_%H-%M}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results: {out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return
+    if not baseline:
+        print("No baseline yet (run with --save-baseline to store one)")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"REGRESSIONS vs {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()